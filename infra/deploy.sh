@@ -26,6 +26,12 @@ else
   git checkout "$COMMIT_SHA"
 fi
 
+# Waitress request threads and the password hasher sized against them: hashing and queued logins hold at most
+# half of the threads, so data requests are never starved
+WAITRESS_THREADS=8
+PASSWORD_HASH_WORKERS=2
+PASSWORD_HASH_QUEUE_SIZE=2
+
 # Create .env file with MOTHERDUCK_TOKEN
 echo "Creating .env file..."
 cat << EOF > "$APP_DIR/.env"
@@ -52,7 +58,9 @@ Group=ubuntu
 WorkingDirectory=$USER_HOME/embrapa-viticulture-api/src
 Environment="PATH=$USER_HOME/embrapa-viticulture-api/src/venv/bin"
 Environment="PYTHONPATH=$USER_HOME/embrapa-viticulture-api"
-ExecStart=$USER_HOME/embrapa-viticulture-api/src/venv/bin/waitress-serve --host=0.0.0.0 --port=5000 app:app
+Environment="PASSWORD_HASH_WORKERS=$PASSWORD_HASH_WORKERS"
+Environment="PASSWORD_HASH_QUEUE_SIZE=$PASSWORD_HASH_QUEUE_SIZE"
+ExecStart=$USER_HOME/embrapa-viticulture-api/src/venv/bin/waitress-serve --host=0.0.0.0 --port=5000 --threads=$WAITRESS_THREADS app:app
 Restart=always
 RestartSec=10
 StandardOutput=journal
@@ -1,20 +1,27 @@
 import os
 
 from flask import Flask, send_from_directory, redirect
-from flask_jwt_extended import JWTManager
 from flask_swagger_ui import get_swaggerui_blueprint
 from loguru import logger
 
 from src.logger_serialize import serialize
 from src.config.auth import AuthConfig
+from src.config.warmer import WarmerConfig
+from src.routes.api_aggregation import ApiAggregationRoutes
+from src.routes.api_batch import ApiBatchRoutes
 from src.routes.api_default import ApiDefaultRoutes
 from src.routes.api_exporting import ApiExportingRoutes
 from src.routes.api_import import ApiImportRoutes
 from src.routes.api_processing import ApiProcessingRoutes
+from src.routes.api_warmer import ApiWarmerRoutes
 from src.routes.auth import ApiAuthRoutes
 from src.service.auth import AuthService
+from src.service.password_hasher import PasswordHasherService
+from src.service.user_repository import UserRepository
 from src.service.duck_db import DuckDBService
+from src.service.token_verifier import CachingJWTManager, TokenVerifierService
 from src.service.extractor import EMBRAPAExtractorService
+from src.service.warmer import CacheWarmerService
 from dotenv import load_dotenv
 
 
@@ -27,9 +34,12 @@ class App:
         self.app = Flask(__name__)
         self._duckdb = DuckDBService()
         self._extractor = EMBRAPAExtractorService(self._duckdb)
+        self._warmer = CacheWarmerService(self._extractor)
+        self._token_verifier = TokenVerifierService()
         self._configure_logging()
         self._configure_app()
         self._register_blueprints()
+        self._start_warmer()
 
     @staticmethod
     def _configure_logging():
@@ -38,13 +48,14 @@ class App:
 
     def _configure_app(self):
         self.app.config.from_object(AuthConfig)
-        JWTManager(self.app)
+        CachingJWTManager(self.app, self._token_verifier)
+        self.app.before_request(self._token_verifier.limit_request)
 
     def _register_blueprints(self):
         swagger_ui_blueprint = get_swaggerui_blueprint(self.SWAGGER_URL, self.API_URL)
         self.app.register_blueprint(swagger_ui_blueprint, url_prefix=self.SWAGGER_URL)
 
-        auth_routes = ApiAuthRoutes(AuthService(self._duckdb))
+        auth_routes = ApiAuthRoutes(AuthService(UserRepository(self._duckdb), PasswordHasherService()))
         self.app.register_blueprint(auth_routes.api_bp, url_prefix=auth_routes.get_url_prefix())
 
         default_routes = ApiDefaultRoutes(self._extractor)
@@ -59,6 +70,19 @@ class App:
         processing_routes = ApiProcessingRoutes(self._extractor)
         self.app.register_blueprint(processing_routes.api_bp, url_prefix=processing_routes.get_url_prefix())
 
+        batch_routes = ApiBatchRoutes(self._extractor)
+        self.app.register_blueprint(batch_routes.api_bp, url_prefix=batch_routes.get_url_prefix())
+
+        aggregation_routes = ApiAggregationRoutes(self._extractor)
+        self.app.register_blueprint(aggregation_routes.api_bp, url_prefix=aggregation_routes.get_url_prefix())
+
+        warmer_routes = ApiWarmerRoutes(self._warmer)
+        self.app.register_blueprint(warmer_routes.api_bp, url_prefix=warmer_routes.get_url_prefix())
+
+    def _start_warmer(self):
+        if WarmerConfig.WARMER_ENABLED:
+            self._warmer.start()
+
     def create_app(self):
         @self.app.route('/static/swagger.yml')
         def send_swagger():
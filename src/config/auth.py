@@ -4,3 +4,13 @@ import os
 class AuthConfig(object):
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret_key')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev_jwt_secret_key')
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', 1024))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))
+    USER_NEGATIVE_CACHE_TTL = int(os.getenv('USER_NEGATIVE_CACHE_TTL', 30))
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 1))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 1))
+    PASSWORD_HASH_WAIT_TIMEOUT = float(os.getenv('PASSWORD_HASH_WAIT_TIMEOUT', 0))
+    TOKEN_CACHE_MAX_ENTRIES = int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', 4096))
+    TOKEN_RATE_LIMIT = float(os.getenv('TOKEN_RATE_LIMIT', 50))
+    TOKEN_RATE_BURST = int(os.getenv('TOKEN_RATE_BURST', 100))
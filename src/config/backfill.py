@@ -0,0 +1,7 @@
+import os
+
+
+class BackfillConfig(object):
+    BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY', 8))
+    BACKFILL_HOST_RATE_LIMIT = float(os.getenv('BACKFILL_HOST_RATE_LIMIT', 4))
+    BACKFILL_BATCH_SIZE = int(os.getenv('BACKFILL_BATCH_SIZE', 20))
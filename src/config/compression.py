@@ -0,0 +1,8 @@
+import os
+
+
+class CompressionConfig(object):
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))
+    ZSTD_LEVEL = int(os.getenv('ZSTD_LEVEL', 3))
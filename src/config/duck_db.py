@@ -0,0 +1,6 @@
+import os
+
+
+class DuckDBConfig(object):
+    DUCKDB_REMOTE_DATABASE = os.getenv('DUCKDB_REMOTE_DATABASE', 'md:winemaking')
+    DUCKDB_LOCAL_DATABASE = os.getenv('DUCKDB_LOCAL_DATABASE', '')
@@ -0,0 +1,10 @@
+import os
+
+
+class ExtractorConfig(object):
+    STALE_WHILE_REVALIDATE = os.getenv('STALE_WHILE_REVALIDATE', 'false').lower() == 'true'
+    MAX_STALENESS = int(os.getenv('MAX_STALENESS', 86400))
+    REFRESH_WORKERS = int(os.getenv('REFRESH_WORKERS', 2))
+    YEAR_RANGE_MAX_SCRAPES = int(os.getenv('YEAR_RANGE_MAX_SCRAPES', 2))
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 2048))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
@@ -0,0 +1,10 @@
+import os
+
+
+class HttpClientConfig(object):
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 3))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+    HTTP_BACKOFF_JITTER = float(os.getenv('HTTP_BACKOFF_JITTER', 0.5))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
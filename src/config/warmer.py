@@ -0,0 +1,8 @@
+import os
+
+
+class WarmerConfig(object):
+    WARMER_ENABLED = os.getenv('WARMER_ENABLED', 'false').lower() == 'true'
+    WARMER_INTERVAL = int(os.getenv('WARMER_INTERVAL', 1800))
+    WARMER_WORKERS = int(os.getenv('WARMER_WORKERS', 4))
+    WARMER_RATE_LIMIT = float(os.getenv('WARMER_RATE_LIMIT', 2))
@@ -0,0 +1,39 @@
+from typing import Literal
+
+from pydantic import BaseModel, conint, model_validator
+
+from src.model.year_request import MIN_YEAR, MAX_YEAR
+
+MAX_AGGREGATION_LIMIT = 1000
+
+
+class AggregationRequest(BaseModel):
+    resource: str
+    sub_resource: str | None = None
+    year: conint(ge=MIN_YEAR, le=MAX_YEAR) | None = None
+    start_year: conint(ge=MIN_YEAR, le=MAX_YEAR) | None = None
+    end_year: conint(ge=MIN_YEAR, le=MAX_YEAR) | None = None
+    metric: Literal['value', 'quantity'] = 'value'
+    product: str | None = None
+    country: str | None = None
+    limit: conint(ge=1, le=MAX_AGGREGATION_LIMIT) = 10
+
+    @model_validator(mode='after')
+    def check_year_range(self) -> 'AggregationRequest':
+        if self.start_year is not None and self.end_year is not None and self.start_year > self.end_year:
+            raise ValueError('start_year must be less than or equal to end_year')
+        return self
+
+    def get_year_range(self) -> tuple[int, int]:
+        return self.start_year or MIN_YEAR, self.end_year or MAX_YEAR
+
+    def get_label_filter(self) -> tuple[str, str] | None:
+        """Returns the (alias, pattern) of the product or country filter, if any"""
+        if self.country is not None:
+            return 'country', self.country
+        if self.product is not None:
+            return 'product', self.product
+        return None
+
+    def get_cache_key(self) -> tuple:
+        return tuple(sorted(self.model_dump(exclude_none=True).items()))
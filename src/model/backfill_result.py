@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class BackfillResult(BaseModel):
+    resource: str
+    sub_resource: str | None = None
+    year: int | None = None
+    table_name: str
+    rows: int = 0
+    error: str | None = None
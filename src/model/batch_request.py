@@ -0,0 +1,18 @@
+from pydantic import BaseModel, conlist
+
+MAX_BATCH_SIZE = 32
+
+
+class BatchItemRequest(BaseModel):
+    resource: str
+    sub_resource: str | None = None
+    year: int | None = None
+    query: dict[str, str | int | float | bool] | None = None
+
+    def get_query(self) -> dict:
+        """Returns the query parameters of the item, without format and stream since batch items are always JSON"""
+        return {key: value for key, value in (self.query or {}).items() if key not in ('format', 'stream')}
+
+
+class BatchRequest(BaseModel):
+    requests: conlist(BatchItemRequest, min_length=1, max_length=MAX_BATCH_SIZE)
@@ -0,0 +1,59 @@
+from pydantic import BaseModel, conint, confloat, model_validator
+
+from src.model.response_format import ResponseFormat
+from src.model.year_request import MIN_YEAR, MAX_YEAR
+
+MAX_LIMIT = 10000
+
+
+class QueryRequest(BaseModel):
+    start_year: conint(ge=MIN_YEAR, le=MAX_YEAR) | None = None
+    end_year: conint(ge=MIN_YEAR, le=MAX_YEAR) | None = None
+    fields: str | None = None
+    product: str | None = None
+    country: str | None = None
+    min_quantity: confloat(ge=0) | None = None
+    max_quantity: confloat(ge=0) | None = None
+    min_value: confloat(ge=0) | None = None
+    max_value: confloat(ge=0) | None = None
+    sort: str | None = None
+    limit: conint(ge=1, le=MAX_LIMIT) | None = None
+    offset: conint(ge=0) | None = None
+    format: ResponseFormat | None = None
+    stream: bool | None = None
+
+    @model_validator(mode='after')
+    def check_year_range(self) -> 'QueryRequest':
+        if self.start_year is not None and self.end_year is not None and self.start_year > self.end_year:
+            raise ValueError('start_year must be less than or equal to end_year')
+        return self
+
+    def has_year_range(self) -> bool:
+        return self.start_year is not None or self.end_year is not None
+
+    def get_year_range(self) -> tuple[int, int]:
+        return self.start_year or MIN_YEAR, self.end_year or MAX_YEAR
+
+    def has_pushdown(self) -> bool:
+        """Returns whether the request needs projection, filtering, sorting or pagination in duckdb"""
+        return bool(self.model_dump(exclude_none=True, exclude={'start_year', 'end_year', 'format', 'stream'}))
+
+    def get_format(self) -> ResponseFormat:
+        return self.format or ResponseFormat.JSON
+
+    def is_streamed(self) -> bool:
+        """Returns whether the rows should be streamed in chunks, which is always the case for NDJSON"""
+        return bool(self.stream) or self.format == ResponseFormat.NDJSON
+
+    def get_fields(self) -> list[str]:
+        return self._split(self.fields)
+
+    def get_sort(self) -> list[str]:
+        return self._split(self.sort)
+
+    def get_cache_key(self) -> tuple:
+        return tuple(sorted(self.model_dump(exclude_none=True).items()))
+
+    @staticmethod
+    def _split(value: str | None) -> list[str]:
+        return [item.strip() for item in value.split(',') if item.strip()] if value else []
@@ -0,0 +1,36 @@
+from enum import Enum
+
+
+class ResponseFormat(str, Enum):
+    JSON = 'json'
+    NDJSON = 'ndjson'
+    ARROW = 'arrow'
+    PARQUET = 'parquet'
+    CSV = 'csv'
+
+    @property
+    def mimetype(self) -> str:
+        return _MIMETYPES[self]
+
+    def is_json(self) -> bool:
+        """Returns whether rows are rendered as JSON objects, either in an array or one per line"""
+        return self in (ResponseFormat.JSON, ResponseFormat.NDJSON)
+
+    @classmethod
+    def from_mimetype(cls, mimetype: str | None) -> 'ResponseFormat':
+        """Returns the format served for a mimetype, defaulting to JSON"""
+        return next((response_format for response_format, known in _MIMETYPES.items() if known == mimetype),
+                    cls.JSON)
+
+    @classmethod
+    def get_mimetypes(cls) -> list[str]:
+        return list(_MIMETYPES.values())
+
+
+_MIMETYPES = {
+    ResponseFormat.JSON: 'application/json',
+    ResponseFormat.NDJSON: 'application/x-ndjson',
+    ResponseFormat.ARROW: 'application/vnd.apache.arrow.stream',
+    ResponseFormat.PARQUET: 'application/vnd.apache.parquet',
+    ResponseFormat.CSV: 'text/csv'
+}
@@ -1,5 +1,8 @@
 from pydantic import BaseModel, conint
 
+MIN_YEAR = 1970
+MAX_YEAR = 2024
+
 
 class YearRequest(BaseModel):
-    year: conint(ge=1970, le=2024) | None = None
+    year: conint(ge=MIN_YEAR, le=MAX_YEAR) | None = None
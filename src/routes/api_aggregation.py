@@ -0,0 +1,28 @@
+from flask import request
+from flask_jwt_extended import jwt_required
+
+from src.routes.api_routes import BaseApiRoutes
+
+
+class ApiAggregationRoutes(BaseApiRoutes):
+    def get_url_prefix(self):
+        return '/api/aggregations'
+
+    def get_blueprint_name(self):
+        return 'api_aggregation'
+
+    def register_routes(self):
+        @self.api_bp.route('/top', methods=['GET'])
+        @jwt_required()
+        def get_top():
+            return self._extractor.extract_aggregation('top', request.args.to_dict())
+
+        @self.api_bp.route('/share', methods=['GET'])
+        @jwt_required()
+        def get_share():
+            return self._extractor.extract_aggregation('share', request.args.to_dict())
+
+        @self.api_bp.route('/growth', methods=['GET'])
+        @jwt_required()
+        def get_growth():
+            return self._extractor.extract_aggregation('growth', request.args.to_dict())
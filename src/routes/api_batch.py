@@ -0,0 +1,21 @@
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required
+
+from src.routes.api_routes import BaseApiRoutes
+
+
+class ApiBatchRoutes(BaseApiRoutes):
+    def get_url_prefix(self):
+        return '/api'
+
+    def get_blueprint_name(self):
+        return 'api_batch'
+
+    def register_routes(self):
+        @self.api_bp.route('/batch', methods=['POST'])
+        @jwt_required()
+        def post_batch():
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return jsonify({'error': 'Body must be a JSON object with a requests list'}), 400
+            return self._extractor.extract_batch(data.get('requests'))
@@ -15,9 +15,11 @@ class ApiDefaultRoutes(BaseApiRoutes):
         @self.api_bp.route('/production', methods=['GET'])
         @jwt_required()
         def get_production():
-            return self._extractor.extract_data(resource='production', year=self._get_year_param(request))
+            return self._extractor.extract_data(resource='production', year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
 
         @self.api_bp.route('/commercialization', methods=['GET'])
         @jwt_required()
         def get_commercialization():
-            return self._extractor.extract_data(resource='commercialization', year=self._get_year_param(request))
+            return self._extractor.extract_data(resource='commercialization', year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
@@ -16,22 +16,26 @@ class ApiExportingRoutes(BaseApiRoutes):
         @jwt_required()
         def get_table_wines():
             return self._extractor.extract_data(resource='export', sub_resource='table_wines',
-                                                year=self._get_year_param(request))
+                                                year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
 
         @self.api_bp.route('/sparkling', methods=['GET'])
         @jwt_required()
         def get_sparkling():
             return self._extractor.extract_data(resource='export', sub_resource='sparkling',
-                                                year=self._get_year_param(request))
+                                                year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
 
         @self.api_bp.route('/fresh_grapes', methods=['GET'])
         @jwt_required()
         def get_fresh_grapes():
             return self._extractor.extract_data(resource='export', sub_resource='fresh_grapes',
-                                                year=self._get_year_param(request))
+                                                year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
 
         @self.api_bp.route('/grape_juice', methods=['GET'])
         @jwt_required()
         def get_grape_juice():
             return self._extractor.extract_data(resource='export', sub_resource='grape_juice',
-                                                year=self._get_year_param(request))
+                                                year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
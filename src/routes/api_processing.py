@@ -16,22 +16,26 @@ class ApiProcessingRoutes(BaseApiRoutes):
         @jwt_required()
         def get_vines():
             return self._extractor.extract_data(resource='processing', sub_resource='vines',
-                                                year=self._get_year_param(request))
+                                                year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
 
         @self.api_bp.route('/hybrid_americans', methods=['GET'])
         @jwt_required()
         def get_hybrid_americans():
             return self._extractor.extract_data(resource='processing', sub_resource='hybrid_americans',
-                                                year=self._get_year_param(request))
+                                                year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
 
         @self.api_bp.route('/table_grapes', methods=['GET'])
         @jwt_required()
         def get_table_grapes():
             return self._extractor.extract_data(resource='processing', sub_resource='table_grapes',
-                                                year=self._get_year_param(request))
+                                                year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
 
         @self.api_bp.route('/unclassified', methods=['GET'])
         @jwt_required()
         def get_unclassified():
             return self._extractor.extract_data(resource='processing', sub_resource='unclassified',
-                                                year=self._get_year_param(request))
+                                                year=self._get_year_param(request),
+                                                query=self._get_query_params(request))
@@ -1,6 +1,7 @@
 from flask import Blueprint, Request
 from abc import ABC, abstractmethod
 
+from src.model.response_format import ResponseFormat
 from src.service.extractor import EMBRAPAExtractorService
 
 
@@ -29,3 +30,17 @@ class BaseApiRoutes(ABC):
     def _get_year_param(request: Request) -> int | None:
         """Helper method to get the year parameter from the request"""
         return request.args.get('year')
+
+    @staticmethod
+    def _get_query_params(request: Request) -> dict:
+        """
+        Helper method to get the query parameters, other than year, from the request. Without a `format`
+        parameter, the response format is negotiated from the Accept header.
+        """
+        query_params = {key: value for key, value in request.args.items() if key != 'year'}
+        if 'format' not in query_params:
+            response_format = ResponseFormat.from_mimetype(
+                request.accept_mimetypes.best_match(ResponseFormat.get_mimetypes()))
+            if response_format != ResponseFormat.JSON:
+                query_params['format'] = response_format.value
+        return query_params
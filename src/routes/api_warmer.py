@@ -0,0 +1,23 @@
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+
+from src.routes.api_routes import BaseApiRoutes
+from src.service.warmer import CacheWarmerService
+
+
+class ApiWarmerRoutes(BaseApiRoutes):
+    def __init__(self, warmer: CacheWarmerService):
+        self._warmer = warmer
+        super().__init__(None)
+
+    def get_url_prefix(self):
+        return '/api/warmer'
+
+    def get_blueprint_name(self):
+        return 'api_warmer'
+
+    def register_routes(self):
+        @self.api_bp.route('/status', methods=['GET'])
+        @jwt_required()
+        def get_status():
+            return jsonify(self._warmer.get_status())
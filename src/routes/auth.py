@@ -1,4 +1,5 @@
 from flask import request, jsonify
+from flask_jwt_extended import jwt_required
 from src.routes.api_routes import BaseApiRoutes
 from src.service.auth import AuthService
 
@@ -26,3 +27,8 @@ class ApiAuthRoutes(BaseApiRoutes):
             data = request.json
             response, status = self._auth_service.authenticate_user(data.get('username'), data.get('password'))
             return jsonify(response), status
+
+        @self.api_bp.route('/metrics', methods=['GET'])
+        @jwt_required()
+        def metrics():
+            return jsonify(self._auth_service.get_hasher_metrics())
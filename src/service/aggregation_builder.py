@@ -0,0 +1,168 @@
+from src.model.aggregation_request import AggregationRequest
+from src.service.query_builder import InvalidQueryError, QueryBuilder
+
+
+class AggregationBuilder(object):
+    """
+    Compiles AggregationRequests into parameterized GROUP BY, window and ranking queries over a stored table.
+    Rows are labelled by country, or by product on tables without countries, and the `Total` row of the
+    source page is left out so it is not counted twice. Product tables list each category subtotal before the
+    products adding up to it, so only their category rows (level 1) are aggregated, along with the rows of flat
+    pages, which have no level. A `product` filter of `share` or `growth` matches the products (level 2) instead.
+    """
+    KINDS = ('top', 'share', 'growth')
+    SUMMARY_METRICS = ('quantity', 'value')
+    _LABELS = ('country', 'product')
+    _TOTAL_LABEL = 'Total'
+    _LEVEL_COLUMN = 'level'
+    _CATEGORY_COLUMN = 'category'
+    _CATEGORY_LEVEL = 1
+    _PRODUCT_LEVEL = 2
+    _PRODUCT_KEYS = ('category', 'product', 'level')
+
+    def __init__(self, query_builder: QueryBuilder = None):
+        self._query_builder = query_builder or QueryBuilder()
+
+    def build(self, kind: str, table_name: str, columns: list[str], aggregation: AggregationRequest,
+              conditions: list[str] = None, params: list = None) -> tuple[str, list]:
+        """Returns the SQL and its parameters, `conditions` and `params` being ANDed before the row filters"""
+        if kind not in self.KINDS:
+            raise InvalidQueryError(f"Aggregation '{kind}' is not available, expected one of {list(self.KINDS)}")
+        label_alias, label = self._resolve_label(columns)
+        metric = self._quote(self._query_builder.resolve_column(aggregation.metric, columns))
+        row_condition, row_params = self._get_row_filter(label_alias, label, columns,
+                                                         self._get_row_level(kind, label_alias, aggregation))
+        conditions = list(conditions or []) + [row_condition]
+        params = list(params or []) + row_params
+        builders = {'top': self._build_top, 'share': self._build_share, 'growth': self._build_growth}
+        return builders[kind](table_name, columns, aggregation, label_alias, label, metric, conditions, params)
+
+    def build_summary(self, source_table: str, columns: list[str], year: str = 'year') -> str | None:
+        """
+        Returns the SELECT summing quantity and value per `year` and label of the source table, or None when the
+        table has no country or product column. Product rows are keyed on their category and level too, so the
+        same product under two categories is not merged and category subtotals stay apart from their products.
+        Product tables without the level column have no summary. Missing metrics are NULL.
+        """
+        try:
+            label_alias, label = self._resolve_label(columns)
+            if label_alias == 'product':
+                self._get_row_filter(label_alias, label, columns)
+        except InvalidQueryError:
+            return None
+        keys = [f'{label} AS {label_alias}']
+        if label_alias == 'product':
+            keys = [f'{self._quote(column)} AS {column}' for column in self._PRODUCT_KEYS if column in columns]
+        metrics = []
+        for metric in self.SUMMARY_METRICS:
+            try:
+                metrics.append(f'SUM({self._quote(self._query_builder.resolve_column(metric, columns))})::DOUBLE '
+                               f'AS {metric}')
+            except InvalidQueryError:
+                metrics.append(f'NULL::DOUBLE AS {metric}')
+        return (f'SELECT {year} AS year, {", ".join(keys)}, {", ".join(metrics)} FROM {source_table} '
+                f"WHERE {label} IS DISTINCT FROM '{self._TOTAL_LABEL}' GROUP BY ALL")
+
+    def _build_top(self, table_name: str, columns: list[str], aggregation: AggregationRequest, label_alias: str,
+                   label: str, metric: str, conditions: list[str], params: list) -> tuple[str, list]:
+        """Ranks the labels of the table by the metric, highest first"""
+        conditions.append(f'{metric} IS NOT NULL')
+        sql = (f'SELECT {label} AS {label_alias}, {metric} AS {aggregation.metric}, '
+               f'RANK() OVER (ORDER BY {metric} DESC) AS rank FROM {table_name} '
+               f'WHERE {" AND ".join(conditions)} ORDER BY rank, {label_alias} LIMIT ?')
+        return sql, params + [aggregation.limit]
+
+    def _build_share(self, table_name: str, columns: list[str], aggregation: AggregationRequest, label_alias: str,
+                     label: str, metric: str, conditions: list[str], params: list) -> tuple[str, list]:
+        """
+        Returns the fraction of the table total of each label. The product or country filter is applied after
+        the total is computed, so a filtered label keeps its share of the whole table.
+        """
+        conditions.append(f'{metric} IS NOT NULL')
+        label_filter = self._get_label_filter(columns, aggregation)
+        if label_alias == 'product' and label_filter is not None:
+            return self._build_product_share(table_name, columns, aggregation, label, metric, label_filter,
+                                             conditions, params)
+        sql = (f'SELECT {label} AS {label_alias}, {metric} AS {aggregation.metric}, '
+               f'{metric} / NULLIF(SUM({metric}) OVER (), 0) AS share FROM {table_name} '
+               f'WHERE {" AND ".join(conditions)}')
+        if label_filter is not None:
+            sql += f' QUALIFY {label_filter} ILIKE ?'
+            params.append(aggregation.get_label_filter()[1])
+        sql += f' ORDER BY share DESC, {label_alias} LIMIT ?'
+        return sql, params + [aggregation.limit]
+
+    def _build_product_share(self, table_name: str, columns: list[str], aggregation: AggregationRequest, label: str,
+                             metric: str, label_filter: str, conditions: list[str], params: list) -> tuple[str, list]:
+        """
+        Returns the fraction of the table total, summed over the category rows, of each filtered product, and
+        its fraction of its category subtotal. Products are matched among the level 2 rows, or the rows of
+        flat pages, after both totals are computed over every row.
+        """
+        level = self._quote(self._LEVEL_COLUMN)
+        category = self._quote(self._query_builder.resolve_column(self._CATEGORY_COLUMN, columns))
+        sql = (f'SELECT {label} AS product, {category} AS category, {metric} AS {aggregation.metric}, '
+               f'{metric} / NULLIF(SUM({metric}) FILTER (WHERE COALESCE({level}, ?) = ?) OVER (), 0) AS share, '
+               f'{metric} / NULLIF(SUM({metric}) FILTER (WHERE {level} = ?) OVER (PARTITION BY {category}), 0) '
+               f'AS category_share FROM {table_name} WHERE {" AND ".join(conditions)} '
+               f'QUALIFY COALESCE({level}, ?) = ? AND {label_filter} ILIKE ? ORDER BY share DESC, product LIMIT ?')
+        return sql, ([self._CATEGORY_LEVEL] * 3 + params +
+                     [self._PRODUCT_LEVEL, self._PRODUCT_LEVEL, aggregation.get_label_filter()[1], aggregation.limit])
+
+    def _build_growth(self, table_name: str, columns: list[str], aggregation: AggregationRequest, label_alias: str,
+                      label: str, metric: str, conditions: list[str], params: list) -> tuple[str, list]:
+        """Sums the metric per year, of the filtered product or country if any, with its change from the prior year"""
+        label_filter = self._get_label_filter(columns, aggregation)
+        if label_filter is not None:
+            conditions.append(f'{label_filter} ILIKE ?')
+            params.append(aggregation.get_label_filter()[1])
+        total, previous_total = f'SUM({metric})', f'LAG(SUM({metric})) OVER (ORDER BY year)'
+        sql = (f'SELECT year, {total} AS {aggregation.metric}, {previous_total} AS previous_{aggregation.metric}, '
+               f'{total} / NULLIF({previous_total}, 0) - 1 AS growth FROM {table_name} '
+               f'WHERE {" AND ".join(conditions)} GROUP BY year ORDER BY year')
+        return sql, params
+
+    def _resolve_label(self, columns: list[str]) -> tuple[str, str]:
+        for alias in self._LABELS:
+            try:
+                return alias, self._quote(self._query_builder.resolve_column(alias, columns))
+            except InvalidQueryError:
+                continue
+        raise InvalidQueryError(f'None of the columns {columns} holds countries or products')
+
+    def _get_row_level(self, kind: str, label_alias: str, aggregation: AggregationRequest) -> int | None:
+        """
+        Returns the level of the product rows to aggregate: the products matched by a `product` filter of growth,
+        every row for share, which picks them after computing the totals, and the category rows otherwise
+        """
+        if label_alias != 'product' or kind == 'top' or aggregation.get_label_filter() is None:
+            return self._CATEGORY_LEVEL
+        return None if kind == 'share' else self._PRODUCT_LEVEL
+
+    def _get_row_filter(self, label_alias: str, label: str, columns: list[str],
+                        level: int | None = _CATEGORY_LEVEL) -> tuple[str, list]:
+        """
+        Returns the condition, and its parameters, keeping the rows to aggregate: every row but Total, and on
+        product tables the rows of `level`, or of any level when it is None, rows without a level belonging to
+        flat pages
+        """
+        total_condition = f'{label} IS DISTINCT FROM ?'
+        if label_alias != 'product':
+            return total_condition, [self._TOTAL_LABEL]
+        if self._LEVEL_COLUMN not in columns:
+            raise InvalidQueryError(f'Product table without a {self._LEVEL_COLUMN} column telling category subtotals '
+                                    f'from their products cannot be aggregated, expected it in {columns}')
+        if level is None:
+            return total_condition, [self._TOTAL_LABEL]
+        return (f'{total_condition} AND COALESCE({self._quote(self._LEVEL_COLUMN)}, ?) = ?',
+                [self._TOTAL_LABEL, level, level])
+
+    def _get_label_filter(self, columns: list[str], aggregation: AggregationRequest) -> str | None:
+        label_filter = aggregation.get_label_filter()
+        if label_filter is None:
+            return None
+        return self._quote(self._query_builder.resolve_column(label_filter[0], columns))
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        return '"' + identifier.replace('"', '""') + '"'
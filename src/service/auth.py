@@ -1,36 +1,57 @@
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
 import datetime
-from src.service.duck_db import DuckDBService
+from loguru import logger
+from src.service.password_hasher import PasswordHasherBusyError, PasswordHasherService
+from src.service.user_repository import UserRepository
 
 
 class AuthService:
-    def __init__(self, duckdb_service: DuckDBService):
-        self._duckdb = duckdb_service
+    BUSY_RESPONSE = {'error': 'Too many authentication requests, try again later'}, 503
+
+    def __init__(self, user_repository: UserRepository, password_hasher: PasswordHasherService):
+        self._users = user_repository
+        self._hasher = password_hasher
 
     def register_user(self, username: str, password: str) -> tuple[dict[str, str], int]:
         if not username or not password:
             return {'error': 'Username and password are required'}, 400
 
-        if self._duckdb.user_exists(username):
+        if self._users.exists(username):
             return {'error': 'User already exists'}, 400
 
-        hashed_password = generate_password_hash(password)
-        self._duckdb.insert_user(username, hashed_password)
+        try:
+            hashed_password = self._hasher.hash(password)
+        except PasswordHasherBusyError:
+            return self.BUSY_RESPONSE
+        if not self._users.insert(username, hashed_password):
+            return {'error': 'User could not be registered'}, 500
         return {'message': 'User registered successfully'}, 201
 
     def authenticate_user(self, username: str, password: str) -> tuple[dict[str, str], int]:
         if not username or not password:
             return {'error': 'Username and password are required'}, 400
 
-        users = self._duckdb.fetch_data('users')
-        if users is None or username not in users['username'].values:
-            return {'error': 'Invalid username or password'}, 401
-
-        user = users[users['username'] == username].iloc[0]
-        if not check_password_hash(user['password'], password):
-            return {'error': 'Invalid username or password'}, 401
+        user = self._users.get_user(username)
+        try:
+            if user is None or not self._hasher.check(user['password'], password):
+                return {'error': 'Invalid username or password'}, 401
+        except PasswordHasherBusyError:
+            return self.BUSY_RESPONSE
+        self._rehash_password(username, password, user['password'])
 
         expires = datetime.timedelta(hours=1)
         access_token = create_access_token(identity=username, expires_delta=expires)
         return {'access_token': access_token}, 200
+
+    def get_hasher_metrics(self) -> dict:
+        return self._hasher.get_metrics()
+
+    def _rehash_password(self, username: str, password: str, password_hash: str) -> None:
+        """Upgrades a hash made with an outdated method or cost, skipped while the hasher is busy"""
+        if not self._hasher.needs_rehash(password_hash):
+            return
+        try:
+            self._users.update_password(username, self._hasher.hash(password))
+            logger.info(f'Password of user {username} rehashed')
+        except PasswordHasherBusyError:
+            logger.info(f'Rehash of user {username} password skipped, password hasher is busy')
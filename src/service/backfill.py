@@ -0,0 +1,105 @@
+import asyncio
+from typing import AsyncIterator, Iterable
+from urllib.parse import urlparse
+
+import pandas as pd
+from loguru import logger
+
+from src.config.backfill import BackfillConfig
+from src.model.backfill_result import BackfillResult
+from src.model.year_request import YearRequest
+from src.service.duck_db import DuckDBService
+from src.service.extractor import EMBRAPAExtractorService
+from src.service.rate_limiter import AsyncRateLimiter
+from src.service.scrapper import EMBRAPAScrapperService
+
+BackfillJob = tuple[str, str | None, int | None]
+
+
+class AsyncScrapeEngine(object):
+    """
+    Bulk scrape engine for multi-year backfills. Jobs are scraped concurrently under a semaphore and a
+    per-host rate limit, and the resulting tables are written to duckdb in batched transactions.
+    """
+
+    def __init__(self, duck_db: DuckDBService, scrapper: EMBRAPAScrapperService = None,
+                 concurrency: int = BackfillConfig.BACKFILL_CONCURRENCY,
+                 host_rate_limit: float = BackfillConfig.BACKFILL_HOST_RATE_LIMIT,
+                 batch_size: int = BackfillConfig.BACKFILL_BATCH_SIZE):
+        self._duck_db = duck_db
+        self._scrapper = scrapper or EMBRAPAScrapperService()
+        self._concurrency = concurrency
+        self._host_rate_limit = host_rate_limit
+        self._batch_size = batch_size
+        self._host_limiters: dict[str, AsyncRateLimiter] = {}
+
+    async def run(self, jobs: Iterable[BackfillJob]) -> AsyncIterator[BackfillResult]:
+        """
+        Scrapes every distinct (resource, sub_resource, year) job, yielding each result once it is persisted.
+        Repeated jobs are run once, so each table is written once per backfill.
+        """
+        semaphore = asyncio.Semaphore(self._concurrency)
+        tasks = [asyncio.create_task(self._scrape(semaphore, *job)) for job in dict.fromkeys(jobs)]
+        batch: dict[str, tuple[BackfillResult, pd.DataFrame]] = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result, data = await next_done
+                if data is None:
+                    yield result
+                    continue
+                batch[result.table_name] = (result, data)
+                if len(batch) >= self._batch_size:
+                    for persisted in await self._flush(batch):
+                        yield persisted
+                    batch = {}
+            for persisted in await self._flush(batch):
+                yield persisted
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def backfill(self, jobs: Iterable[BackfillJob]) -> list[BackfillResult]:
+        """Blocking entry point that runs the whole backfill and returns every result"""
+        async def collect():
+            return [result async for result in self.run(jobs)]
+
+        return asyncio.run(collect())
+
+    async def _scrape(self, semaphore: asyncio.Semaphore, resource: str, sub_resource: str | None,
+                      year: int | None) -> tuple[BackfillResult, pd.DataFrame | None]:
+        validated_year = YearRequest(year=year).year
+        year_param = str(validated_year) if validated_year else None
+        result = BackfillResult(resource=resource, sub_resource=sub_resource, year=validated_year,
+                                table_name=EMBRAPAExtractorService.get_table_name(resource, sub_resource,
+                                                                                  year_param))
+        async with semaphore:
+            try:
+                url = self._scrapper.get_url(year=year_param, resource=resource, sub_resource=sub_resource)
+                await self._get_host_limiter(url).acquire()
+                data = await asyncio.to_thread(self._scrapper.scrape_and_parse_tables, year=year_param,
+                                               resource=resource, sub_resource=sub_resource)
+                result.rows = len(data)
+                return result, data
+            except Exception as e:
+                logger.error(f'Error backfilling table {result.table_name}: {e}')
+                result.error = str(e)
+                return result, None
+
+    async def _flush(self, batch: dict[str, tuple[BackfillResult, pd.DataFrame]]) -> list[BackfillResult]:
+        if not batch:
+            return []
+        tables = [(EMBRAPAExtractorService.get_table_name(result.resource, result.sub_resource, None), result.year,
+                   data) for result, data in batch.values()]
+        written = set(await asyncio.to_thread(self._duck_db.create_dataframe_tables, tables))
+        results = []
+        for table_name, (result, _) in batch.items():
+            if table_name not in written:
+                result.error = 'Error writing table to duckdb'
+            results.append(result)
+        return results
+
+    def _get_host_limiter(self, url: str) -> AsyncRateLimiter:
+        host = urlparse(url).netloc
+        if host not in self._host_limiters:
+            self._host_limiters[host] = AsyncRateLimiter(self._host_rate_limit)
+        return self._host_limiters[host]
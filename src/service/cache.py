@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class LRUTTLCache(object):
+    """
+    Thread-safe in-memory cache with LRU eviction and per-entry time to live. With `max_bytes`, least recently
+    used entries are also evicted once the sizes given by `size_of` add up to more than it; values mutated
+    after `put` are measured again with `resize`.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int = 0,
+                 size_of: Callable[[Any], int] | None = None):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._max_bytes = max_bytes if size_of is not None else 0
+        self._size_of = size_of
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: float = None) -> None:
+        ttl = self._ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            self._measure(key, value)
+            self._evict()
+
+    def resize(self, key: Hashable) -> None:
+        """Measures again the size of an entry whose value grew in place, evicting entries when over `max_bytes`"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._max_bytes:
+                return
+            self._measure(key, entry[1])
+            self._evict()
+
+    def invalidate(self, table_name: str) -> None:
+        """Removes every entry whose key starts with the given table name"""
+        with self._lock:
+            stale_keys = [key for key in self._entries if self._table_of(key) == table_name]
+            for key in stale_keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def get_total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _measure(self, key: Hashable, value: Any) -> None:
+        if not self._max_bytes:
+            return
+        size = self._size_of(value)
+        self._total_bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self._max_entries or
+                                 (self._max_bytes and self._total_bytes > self._max_bytes)):
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        del self._entries[key]
+        self._total_bytes -= self._sizes.pop(key, 0)
+
+    @staticmethod
+    def _table_of(key: Hashable) -> Hashable:
+        return key[0] if isinstance(key, tuple) else key
@@ -0,0 +1,40 @@
+import gzip
+
+import brotli
+import zstandard
+from werkzeug.datastructures import Accept
+
+from src.config.compression import CompressionConfig
+
+
+class ResponseCompressor(object):
+    """Negotiates a content coding from Accept-Encoding and compresses response bodies with it"""
+    IDENTITY = 'identity'
+    ENCODINGS = ('zstd', 'br', 'gzip')
+
+    def __init__(self, min_size: int = CompressionConfig.COMPRESSION_MIN_SIZE,
+                 gzip_level: int = CompressionConfig.GZIP_LEVEL,
+                 brotli_quality: int = CompressionConfig.BROTLI_QUALITY,
+                 zstd_level: int = CompressionConfig.ZSTD_LEVEL):
+        self._min_size = min_size
+        self._gzip_level = gzip_level
+        self._brotli_quality = brotli_quality
+        self._zstd_level = zstd_level
+
+    def negotiate(self, accept_encodings: Accept, size: int) -> str:
+        """
+        Returns the preferred coding accepted by the client, in server order on ties, or identity for bodies
+        too small to be worth compressing
+        """
+        if size < self._min_size:
+            return self.IDENTITY
+        return accept_encodings.best_match(self.ENCODINGS) or self.IDENTITY
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'zstd':
+            return zstandard.ZstdCompressor(level=self._zstd_level).compress(body)
+        if encoding == 'br':
+            return brotli.compress(body, quality=self._brotli_quality)
+        if encoding == 'gzip':
+            return gzip.compress(body, compresslevel=self._gzip_level)
+        return body
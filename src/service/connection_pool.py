@@ -0,0 +1,38 @@
+import threading
+
+import duckdb
+
+
+class DuckDBConnectionPool(object):
+    """
+    Hands out one duckdb cursor per thread, so concurrent readers never share a connection, and serializes
+    every write through the single writer connection guarded by `write_lock`
+    """
+
+    def __init__(self, database: str):
+        self.connection = duckdb.connect(database)
+        self.write_lock = threading.RLock()
+        self._local = threading.local()
+        self._cursors: list[duckdb.DuckDBPyConnection] = []
+        self._cursors_lock = threading.Lock()
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """Returns the cursor of the calling thread, created on its first use"""
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self.connection.cursor()
+            self._local.cursor = cursor
+            with self._cursors_lock:
+                self._cursors.append(cursor)
+        return cursor
+
+    def new_cursor(self) -> duckdb.DuckDBPyConnection:
+        """Returns a cursor owned by the caller, for results consumed after other queries of the same thread"""
+        return self.connection.cursor()
+
+    def close(self) -> None:
+        with self._cursors_lock:
+            for cursor in self._cursors:
+                cursor.close()
+            self._cursors.clear()
+        self.connection.close()
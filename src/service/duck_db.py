@@ -1,90 +1,756 @@
-import duckdb
+import hashlib
+from typing import Callable, Iterator
+
 from loguru import logger
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from pandas import DataFrame
 
+from src.config.duck_db import DuckDBConfig
+from src.model.aggregation_request import AggregationRequest
+from src.model.query_request import QueryRequest
+from src.model.response_format import ResponseFormat
+from src.service.aggregation_builder import AggregationBuilder
+from src.service.connection_pool import DuckDBConnectionPool
+from src.service.query_builder import InvalidQueryError, QueryBuilder
+from src.service.schema_normalizer import SchemaNormalizer
+
 
 class DuckDBService(object):
-    _DB_DATETIME_ID = 0
+    """
+    Table storage on duckdb. When a local database is configured, it serves every read and the remote
+    database (MotherDuck) is attached to it: tables refreshed remotely are copied on startup and every write
+    goes to both, remote first. Reads run on a cursor of the calling thread, writes on the single writer
+    connection of the pool, one at a time.
+    """
+    REMOTE_CATALOG = 'remote'
+    _SYSTEM_TABLES = ('users', 'table_metadata')
+    _USER_ID_SEQUENCE = 'users_id_seq'
+    _YEAR_TABLE_SUFFIX = '_years'
+    _SUMMARY_TABLE_SUFFIX = '_summary'
 
-    def __init__(self):
-        self._con = duckdb.connect('md:winemaking')
-        self._duckdb_tables = self._con.execute("SHOW TABLES").fetchdf()['name'].tolist()
+    def __init__(self, local_database: str = DuckDBConfig.DUCKDB_LOCAL_DATABASE,
+                 remote_database: str = DuckDBConfig.DUCKDB_REMOTE_DATABASE):
+        self._pool = DuckDBConnectionPool(local_database or remote_database)
+        self._con = self._pool.connection
+        self._remote_attached = bool(local_database) and self._attach_remote(remote_database)
+        self._table_listeners: list[Callable[[str], None]] = []
         self._user_column_definitions = {
             "id": "INTEGER",
             "username": "VARCHAR",
             "password": "VARCHAR",
             "created_at": "TIMESTAMP"
         }
-        self._db_datetime_column_definitions = {
-            "id": "INTEGER PRIMARY KEY",
-            "datetime": "TIMESTAMP"
+        self._table_metadata_column_definitions = {
+            "table_name": "VARCHAR PRIMARY KEY",
+            "refreshed_at": "TIMESTAMP",
+            "storage_table": "VARCHAR",
+            "year": "INTEGER",
+            "content_hash": "VARCHAR",
+            "version": "INTEGER",
+            "modified_at": "TIMESTAMP"
         }
+        self._table_refreshed_at: dict[str, pd.Timestamp] = {}
+        self._table_content_hashes: dict[str, str] = {}
+        self._table_versions: dict[str, int] = {}
+        self._table_modified_at: dict[str, pd.Timestamp] = {}
+        self._year_partitions: dict[str, tuple[str, int]] = {}
+        self._table_columns: dict[str, list[str]] = {}
+        self._query_builder = QueryBuilder()
+        self._aggregation_builder = AggregationBuilder(self._query_builder)
         self._create_user_table()
-        self._create_datetime_table()
+        self._create_table_metadata_table()
+        if self._remote_attached:
+            self._sync_from_remote()
+        with self._pool.write_lock:
+            self._rename_scraped_columns()
+            self._create_missing_summaries()
+        self._duckdb_tables = self._pool.cursor().execute("SHOW TABLES").fetchdf()['name'].tolist()
+        self._load_table_metadata()
 
-    def fetch_data(self, table_name: str) -> DataFrame:
+    def fetch_data(self, table_name: str, query: QueryRequest = None) -> DataFrame:
+        """
+        Fetches a table. Projection, filters, sorting and pagination of `query` are compiled into the SQL
+        so that only the requested rows and columns leave duckdb.
+        """
         try:
             logger.info(f'Fetching data {table_name} from duckdb')
-            return self._con.execute(f'SELECT * FROM {table_name}').fetchdf()
+            sql, params = self._build_table_query(table_name, query)
+            return self._execute(sql, params).fetchdf()
+        except InvalidQueryError:
+            raise
         except Exception as e:
             logger.error(f'Error fetching table {table_name} from duckdb {e}')
             return pd.DataFrame()
 
-    def create_dataframe_table(self, table_name: str, data_frame: DataFrame) -> None:
+    def fetch_serialized(self, table_name: str, query: QueryRequest = None,
+                         response_format: ResponseFormat = ResponseFormat.JSON) -> tuple[bytes, int] | None:
+        """
+        Same rows as `fetch_data`, serialized by duckdb into `response_format`. Returns the body and its row
+        count, or None when the read fails.
+        """
         try:
-            if table_name not in self._duckdb_tables:
-                logger.info(f'Creating table {table_name} in duckdb')
-                self._con.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM data_frame")
-                self._con.execute(
-                    f'UPDATE db_datetime SET datetime = CURRENT_TIMESTAMP WHERE id = {self._DB_DATETIME_ID}')
-                self._duckdb_tables.append(table_name)
+            logger.info(f'Fetching data {table_name} from duckdb as {response_format.value}')
+            sql, params = self._build_table_query(table_name, query)
+            return self._serialize(sql, params, response_format)
+        except InvalidQueryError:
+            raise
         except Exception as e:
-            logger.error(f'Error creating table {table_name} in duckdb {e}')
+            logger.error(f'Error fetching table {table_name} from duckdb as {response_format.value} {e}')
+            return None
 
-    def get_tables(self) -> list[str]:
-        return self._duckdb_tables
+    def stream_serialized(self, table_name: str, query: QueryRequest = None,
+                          response_format: ResponseFormat = ResponseFormat.JSON,
+                          batch_size: int = 2048) -> Iterator[bytes] | None:
+        """
+        Streams the rows of `fetch_serialized` as JSON array or NDJSON chunks of `batch_size` rows, so memory
+        does not grow with the table. Returns None when the read fails.
+        """
+        try:
+            logger.info(f'Streaming data {table_name} from duckdb as {response_format.value}')
+            sql, params = self._build_table_query(table_name, query)
+            return self._stream_json(sql, params, response_format, batch_size)
+        except InvalidQueryError:
+            raise
+        except Exception as e:
+            logger.error(f'Error streaming table {table_name} from duckdb {e}')
+            return None
 
-    def user_exists(self, username: str) -> bool:
+    def fetch_year_range(self, table_name: str, start_year: int, end_year: int,
+                         query: QueryRequest = None) -> DataFrame:
+        """Fetches the rows of every loaded year of `table_name` between `start_year` and `end_year`"""
+        storage_table = self.get_year_table_name(table_name)
         try:
-            users = self.fetch_data('users')
-            return users is not None and username in users['username'].values
+            logger.info(f'Fetching years {start_year}-{end_year} of {storage_table} from duckdb')
+            sql, params = self._build_year_range_query(storage_table, start_year, end_year, query)
+            return self._execute(sql, params).fetchdf()
+        except InvalidQueryError:
+            raise
         except Exception as e:
-            logger.error(f'Error checking if user exists: {e}')
-            return False
+            logger.error(f'Error fetching years {start_year}-{end_year} of {storage_table} from duckdb {e}')
+            return pd.DataFrame()
 
-    def insert_user(self, username: str, hashed_password: str) -> None:
+    def fetch_year_range_serialized(self, table_name: str, start_year: int, end_year: int,
+                                    query: QueryRequest = None,
+                                    response_format: ResponseFormat = ResponseFormat.JSON) -> tuple[bytes, int] | None:
+        """Same rows as `fetch_year_range`, serialized like `fetch_serialized`"""
+        storage_table = self.get_year_table_name(table_name)
         try:
-            self._con.execute(
-                "INSERT INTO users (username, password, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
-                (username, hashed_password)
-            )
-            logger.info(f'User {username} inserted successfully')
+            logger.info(f'Fetching years {start_year}-{end_year} of {storage_table} from duckdb as '
+                        f'{response_format.value}')
+            sql, params = self._build_year_range_query(storage_table, start_year, end_year, query)
+            return self._serialize(sql, params, response_format)
+        except InvalidQueryError:
+            raise
+        except Exception as e:
+            logger.error(f'Error fetching years {start_year}-{end_year} of {storage_table} from duckdb as '
+                         f'{response_format.value} {e}')
+            return None
+
+    def stream_year_range_serialized(self, table_name: str, start_year: int, end_year: int,
+                                     query: QueryRequest = None,
+                                     response_format: ResponseFormat = ResponseFormat.JSON,
+                                     batch_size: int = 2048) -> Iterator[bytes] | None:
+        """Streams the rows of `fetch_year_range` like `stream_serialized`"""
+        storage_table = self.get_year_table_name(table_name)
+        try:
+            logger.info(f'Streaming years {start_year}-{end_year} of {storage_table} from duckdb')
+            sql, params = self._build_year_range_query(storage_table, start_year, end_year, query)
+            return self._stream_json(sql, params, response_format, batch_size)
+        except InvalidQueryError:
+            raise
         except Exception as e:
-            logger.error(f'Error inserting user {username}: {e}')
+            logger.error(f'Error streaming years {start_year}-{end_year} of {storage_table} from duckdb {e}')
+            return None
+
+    def fetch_aggregation(self, kind: str, table_name: str,
+                          aggregation: AggregationRequest) -> tuple[bytes, int] | None:
+        """
+        Runs a `top`, `share` or `growth` aggregation inside duckdb and returns its rows as JSON with their
+        count, or None when the read fails. Growth reads the summary table of `table_name` over the requested
+        range, the other aggregations read `table_name` itself.
+        """
+        try:
+            logger.info(f'Fetching {kind} aggregation of {table_name} from duckdb')
+            if kind == 'growth':
+                storage_table = self.get_summary_table_name(table_name)
+                if storage_table not in self._duckdb_tables:
+                    storage_table = self.get_year_table_name(table_name)
+                conditions, params = ['year BETWEEN ? AND ?'], list(aggregation.get_year_range())
+            else:
+                storage_table, conditions, params = table_name, [], []
+                if table_name in self._year_partitions:
+                    storage_table, year = self._year_partitions[table_name]
+                    conditions, params = ['year = ?'], [year]
+            sql, params = self._aggregation_builder.build(kind, storage_table, self._get_columns(storage_table),
+                                                          aggregation, conditions, params)
+            return self._to_json(sql, params, ResponseFormat.JSON)
+        except InvalidQueryError:
+            raise
+        except Exception as e:
+            logger.error(f'Error fetching {kind} aggregation of {table_name} from duckdb {e}')
+            return None
+
+    def serialize_data_frame(self, data_frame: DataFrame,
+                             response_format: ResponseFormat = ResponseFormat.JSON) -> tuple[bytes, int]:
+        """Serializes a data frame that is not stored in duckdb (yet) like `fetch_serialized`"""
+        if data_frame.columns.empty:
+            return (self._join_json_rows([], response_format), 0) if response_format.is_json() \
+                else self._serialize_arrow(pa.table({}), response_format)
+        if response_format.is_json():
+            rows = self._pool.cursor().execute('SELECT to_json(t)::VARCHAR AS row_json FROM data_frame t').fetchnumpy()
+            return self._join_json_rows(rows['row_json'], response_format), len(data_frame)
+        return self._serialize_arrow(self._pool.cursor().execute('SELECT * FROM data_frame').arrow(), response_format)
+
+    def create_dataframe_table(self, table_name: str, data_frame: DataFrame, year: int = None) -> None:
+        """
+        Creates `table_name` from the data frame. When `year` is given, the rows are stored as that year's
+        partition of the consolidated `{table_name}_years` table instead.
+        """
+        self.create_dataframe_tables([(table_name, year, data_frame)])
+
+    def create_dataframe_tables(self, tables: list[tuple[str, int | None, DataFrame]]) -> list[str]:
+        """
+        Creates or refreshes several (table_name, year, data_frame) tables in a single transaction per tier,
+        returning the names of the tables stored. Tables whose content hash did not change only get their
+        refresh time updated: their rows are not rewritten, their version and modification time are kept and
+        listeners are not notified. Years still stored in a legacy per-year table are always written to their
+        partition, and the legacy table is dropped.
+        """
+        if not tables:
+            return []
+        with self._pool.write_lock:
+            names = [self._get_logical_name(table_name, year) for table_name, year, _ in tables]
+            refreshed_at = pd.Timestamp.now()
+            try:
+                writes = []
+                for name, (table_name, year, data_frame) in zip(names, tables):
+                    content_hash = self._get_content_hash(data_frame)
+                    changed = self._is_content_changed(name, content_hash)
+                    version = self._table_versions.get(name, 0) + changed
+                    modified_at = refreshed_at if changed else self._table_modified_at.get(name, refreshed_at)
+                    write = changed or (year is not None and name not in self._year_partitions)
+                    writes.append((table_name, year, data_frame, content_hash, version, modified_at, write))
+                written_names = [name for name, write in zip(names, writes) if write[-1]]
+                logger.info(f'Writing tables {written_names} in duckdb, '
+                            f'{len(names) - len(written_names)} unchanged tables only refreshed')
+                summary_tables = set()
+                for catalog in self._get_catalogs():
+                    self._con.execute('BEGIN TRANSACTION')
+                    for table_name, year, data_frame, content_hash, version, modified_at, write in writes:
+                        if not write:
+                            self._write_year_table_metadata(table_name, year, refreshed_at, content_hash, version,
+                                                            modified_at, catalog)
+                        elif self._write_table(table_name, year, data_frame, refreshed_at, content_hash, version,
+                                               modified_at, catalog):
+                            summary_tables.add(self.get_summary_table_name(table_name))
+                    self._con.execute('COMMIT')
+            except Exception as e:
+                logger.error(f'Error writing tables {names} in duckdb {e}')
+                self._rollback()
+                return []
+
+            for table_name, year, _, content_hash, version, modified_at, write in writes:
+                if write:
+                    self._register_table(table_name, year, refreshed_at, content_hash, version, modified_at)
+                else:
+                    self._table_refreshed_at[self._get_logical_name(table_name, year)] = refreshed_at
+            for summary_table in summary_tables:
+                self._table_columns.pop(summary_table, None)
+                if summary_table not in self._duckdb_tables:
+                    self._duckdb_tables.append(summary_table)
+            return names
+
+    @staticmethod
+    def get_year_table_name(table_name: str) -> str:
+        """Returns the consolidated table holding every year of `table_name`"""
+        return f'{table_name}{DuckDBService._YEAR_TABLE_SUFFIX}'
+
+    @staticmethod
+    def get_summary_table_name(table_name: str) -> str:
+        """Returns the table holding quantity and value per year and country or product of `table_name`"""
+        return f'{table_name}{DuckDBService._SUMMARY_TABLE_SUFFIX}'
+
+    def add_table_listener(self, listener: Callable[[str], None]) -> None:
+        """Registers a callback invoked with the table name whenever a table is (re)written"""
+        self._table_listeners.append(listener)
+
+    def get_tables(self) -> list[str]:
+        return self._duckdb_tables
+
+    def get_table_version(self, table_name: str) -> int:
+        """Returns how many times the content of `table_name` changed since it was first stored"""
+        return self._table_versions.get(table_name, 0)
+
+    def get_table_modified_at(self, table_name: str) -> pd.Timestamp | None:
+        """Returns when the content of the table last changed, served from memory without touching duckdb"""
+        return self._table_modified_at.get(table_name)
+
+    def get_table_refreshed_at(self, table_name: str) -> pd.Timestamp | None:
+        """Returns when the table was last written, served from memory without touching duckdb"""
+        return self._table_refreshed_at.get(table_name)
+
+    def get_table_content_hash(self, table_name: str) -> str | None:
+        """Returns the hash of the rows last written to the table, served from memory without touching duckdb"""
+        return self._table_content_hashes.get(table_name)
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def fetch_user(self, username: str) -> dict | None:
+        """
+        Looks a single user up through the unique username index. Errors are raised, so callers can tell a
+        missing user from a failed lookup.
+        """
+        row = self._pool.cursor().execute(
+            'SELECT id, username, password FROM users WHERE username = ?', [username]).fetchone()
+        return None if row is None else {'id': row[0], 'username': row[1], 'password': row[2]}
+
+    def insert_user(self, username: str, hashed_password: str) -> bool:
+        """
+        Inserts the user into every tier under the same id, taken from the sequence of the first one. Returns
+        False when the insert fails, e.g. because the username is taken.
+        """
+        with self._pool.write_lock:
+            try:
+                catalogs = self._get_catalogs()
+                user_id = self._con.execute(
+                    f"SELECT nextval('{self._qualify(self._USER_ID_SEQUENCE, catalogs[0])}')").fetchone()[0]
+                self._con.execute('BEGIN TRANSACTION')
+                for catalog in catalogs:
+                    self._con.execute(
+                        f"INSERT INTO {self._qualify('users', catalog)} (id, username, password, created_at) "
+                        f"VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+                        (user_id, username, hashed_password)
+                    )
+                self._con.execute('COMMIT')
+                logger.info(f'User {username} inserted successfully')
+                return True
+            except Exception as e:
+                logger.error(f'Error inserting user {username}: {e}')
+                self._rollback()
+                return False
+
+    def update_user_password(self, username: str, hashed_password: str) -> bool:
+        """Replaces the password hash of the user in every tier, returning False when the update fails"""
+        with self._pool.write_lock:
+            try:
+                self._con.execute('BEGIN TRANSACTION')
+                for catalog in self._get_catalogs():
+                    self._con.execute(f"UPDATE {self._qualify('users', catalog)} SET password = ? WHERE username = ?",
+                                      (hashed_password, username))
+                self._con.execute('COMMIT')
+                return True
+            except Exception as e:
+                logger.error(f'Error updating password of user {username}: {e}')
+                self._rollback()
+                return False
 
     def _create_user_table(self) -> None:
         try:
             columns_definition = self._get_columns_definition(self._user_column_definitions)
-            create_user_table_query = f'CREATE TABLE IF NOT EXISTS users ({columns_definition})'
-            self._con.execute(create_user_table_query)
+            for catalog in self._get_catalogs():
+                create_user_table_query = f'CREATE TABLE IF NOT EXISTS {self._qualify("users", catalog)} ' \
+                                          f'({columns_definition})'
+                self._con.execute(create_user_table_query)
+                self._create_user_keys(catalog)
             logger.info(f'Table users created successfully with columns: {self._user_column_definitions}')
         except Exception as e:
             logger.error(f'Error creating table users: {e}')
 
-    def _create_datetime_table(self) -> None:
+    def _create_user_keys(self, catalog: str | None) -> None:
+        """
+        Backs `id` with a sequence and a primary key and makes `username` unique and indexed. Users created
+        before the keys existed get their missing ids from the sequence.
+        """
+        users = self._qualify('users', catalog)
+        sequence = self._qualify(self._USER_ID_SEQUENCE, catalog)
+        try:
+            next_id = self._con.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {users}').fetchone()[0]
+            self._con.execute(f'CREATE SEQUENCE IF NOT EXISTS {sequence} START {next_id}')
+            self._con.execute(f"UPDATE {users} SET id = nextval('{sequence}') WHERE id IS NULL")
+            self._con.execute(f"ALTER TABLE {users} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+            has_primary_key = self._con.execute(
+                "SELECT count(*) FROM duckdb_constraints() WHERE database_name = COALESCE(?, current_database()) "
+                "AND table_name = 'users' AND constraint_type = 'PRIMARY KEY'", [catalog]).fetchone()[0]
+            if not has_primary_key:
+                self._con.execute(f'ALTER TABLE {users} ADD PRIMARY KEY (id)')
+            self._con.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS users_username_idx ON {users} (username)')
+        except Exception as e:
+            logger.warning(f'Error creating keys of table {users}: {e}')
+
+    def _create_table_metadata_table(self) -> None:
         try:
-            columns_definition = self._get_columns_definition(self._db_datetime_column_definitions)
-            create_datetime_table_query = \
-                f'CREATE TABLE IF NOT EXISTS db_datetime ({columns_definition})'
-            self._con.execute(create_datetime_table_query)
+            columns_definition = self._get_columns_definition(self._table_metadata_column_definitions)
+            for catalog in self._get_catalogs():
+                table_metadata = self._qualify('table_metadata', catalog)
+                self._con.execute(f'CREATE TABLE IF NOT EXISTS {table_metadata} ({columns_definition})')
+                self._con.execute(f'ALTER TABLE {table_metadata} ADD COLUMN IF NOT EXISTS content_hash VARCHAR')
+                self._con.execute(f'ALTER TABLE {table_metadata} ADD COLUMN IF NOT EXISTS version INTEGER')
+                self._con.execute(f'ALTER TABLE {table_metadata} ADD COLUMN IF NOT EXISTS modified_at TIMESTAMP')
+            logger.info(
+                f'Table table_metadata created successfully with columns: {self._table_metadata_column_definitions}')
+        except Exception as e:
+            logger.error(f'Error creating table table_metadata: {e}')
+
+    def _load_table_metadata(self) -> None:
+        try:
+            rows = self._pool.cursor().execute(
+                'SELECT table_name, refreshed_at, storage_table, year, content_hash, version, '
+                'COALESCE(modified_at, refreshed_at) FROM table_metadata'
+            ).fetchall()
+            for table_name, refreshed_at, storage_table, year, content_hash, version, modified_at in rows:
+                self._table_refreshed_at[table_name] = pd.Timestamp(refreshed_at)
+                self._table_modified_at[table_name] = pd.Timestamp(modified_at)
+                self._table_versions[table_name] = version or 0
+                if content_hash is not None:
+                    self._table_content_hashes[table_name] = content_hash
+                if storage_table is not None and storage_table in self._duckdb_tables:
+                    self._year_partitions[table_name] = (storage_table, year)
+                    self._duckdb_tables.append(table_name)
+        except Exception as e:
+            logger.error(f'Error loading table_metadata: {e}')
+
+    def _is_content_changed(self, table_name: str, content_hash: str) -> bool:
+        return table_name not in self._duckdb_tables or self._table_content_hashes.get(table_name) != content_hash
+
+    def _write_table(self, table_name: str, year: int | None, data_frame: DataFrame, refreshed_at: pd.Timestamp,
+                     content_hash: str, version: int, modified_at: pd.Timestamp, catalog: str = None) -> bool:
+        """
+        Writes the table, returning whether the summary table of a year partition was written too. A year
+        partition replaces the legacy per-year table of that year, which is dropped.
+        """
+        if year is None:
             self._con.execute(
-                f'INSERT INTO db_datetime (id, datetime) VALUES ({self._DB_DATETIME_ID}, CURRENT_TIMESTAMP) '
-                f'ON CONFLICT (id) DO NOTHING'
-            )
-            logger.info(f'Table db_datetime created successfully with columns: {self._db_datetime_column_definitions}')
+                f"CREATE OR REPLACE TABLE {self._qualify(table_name, catalog)} AS SELECT * FROM data_frame")
+            self._write_year_table_metadata(table_name, year, refreshed_at, content_hash, version, modified_at,
+                                            catalog)
+            return False
+
+        storage_table = self.get_year_table_name(table_name)
+        qualified_storage_table = self._qualify(storage_table, catalog)
+        self._con.execute(f'CREATE TABLE IF NOT EXISTS {qualified_storage_table} AS '
+                          f'SELECT 0::INTEGER AS year, * FROM data_frame LIMIT 0')
+        stored_columns = [row[0] for row in self._con.execute(f'DESCRIBE {qualified_storage_table}').fetchall()]
+        for column, column_type, *_ in self._con.execute('DESCRIBE SELECT * FROM data_frame').fetchall():
+            if column not in stored_columns:
+                logger.info(f'Adding column {column} to {qualified_storage_table}')
+                self._con.execute(
+                    f'ALTER TABLE {qualified_storage_table} ADD COLUMN {self._quote(column)} {column_type}')
+        self._con.execute(f'DELETE FROM {qualified_storage_table} WHERE year = ?', (year,))
+        self._con.execute(
+            f'INSERT INTO {qualified_storage_table} BY NAME SELECT ?::INTEGER AS year, * FROM data_frame', (year,))
+        self._con.execute(f'DROP TABLE IF EXISTS {self._qualify(self._get_logical_name(table_name, year), catalog)}')
+        self._write_year_table_metadata(table_name, year, refreshed_at, content_hash, version, modified_at, catalog)
+        return self._write_summary(table_name, year, data_frame, catalog)
+
+    def _write_year_table_metadata(self, table_name: str, year: int | None, refreshed_at: pd.Timestamp,
+                                   content_hash: str, version: int, modified_at: pd.Timestamp,
+                                   catalog: str = None) -> None:
+        if year is None:
+            self._write_table_metadata(table_name, refreshed_at, content_hash, version, modified_at, catalog=catalog)
+        else:
+            self._write_table_metadata(self._get_logical_name(table_name, year), refreshed_at, content_hash, version,
+                                       modified_at, self.get_year_table_name(table_name), year, catalog)
+
+    def _write_summary(self, table_name: str, year: int, data_frame: DataFrame, catalog: str = None) -> bool:
+        """Replaces the year in the summary table of `table_name`, so trend queries never scan every year"""
+        sql = self._aggregation_builder.build_summary('data_frame', list(data_frame.columns), '?::INTEGER')
+        if sql is None:
+            return False
+        summary_table = self._qualify(self.get_summary_table_name(table_name), catalog)
+        self._con.execute(f'CREATE TABLE IF NOT EXISTS {summary_table} AS {sql} LIMIT 0', (year,))
+        self._con.execute(f'DELETE FROM {summary_table} WHERE year = ?', (year,))
+        self._con.execute(f'INSERT INTO {summary_table} BY NAME {sql}', (year,))
+        return True
+
+    def _rename_scraped_columns(self) -> None:
+        """Renames the Portuguese headers of tables stored before ingest normalization to their canonical names"""
+        try:
+            for catalog in self._get_catalogs():
+                for table_name, columns in self._get_catalog_columns(catalog).items():
+                    for column in columns:
+                        canonical_name = SchemaNormalizer.get_canonical_name(column)
+                        if canonical_name is None or canonical_name in columns:
+                            continue
+                        logger.info(f'Renaming column {column} of {table_name} to {canonical_name}')
+                        self._con.execute(f'ALTER TABLE {self._qualify(table_name, catalog)} '
+                                          f'RENAME COLUMN {self._quote(column)} TO {canonical_name}')
+                        columns.append(canonical_name)
+        except Exception as e:
+            logger.error(f'Error renaming scraped columns: {e}')
+
+    def _create_missing_summaries(self) -> None:
+        """
+        Builds the summary tables of year tables stored before summaries were maintained, and rebuilds the ones
+        whose columns no longer match the summary of their year table
+        """
+        try:
+            for catalog in self._get_catalogs():
+                table_columns = self._get_catalog_columns(catalog)
+                for year_table in [table for table in table_columns if table.endswith(self._YEAR_TABLE_SUFFIX)]:
+                    table_name = year_table[:-len(self._YEAR_TABLE_SUFFIX)]
+                    qualified_year_table = self._qualify(year_table, catalog)
+                    summary_table = self._qualify(self.get_summary_table_name(table_name), catalog)
+                    sql = self._aggregation_builder.build_summary(qualified_year_table, table_columns[year_table])
+                    summary_columns = table_columns.get(self.get_summary_table_name(table_name))
+                    if summary_columns is not None:
+                        expected_columns = [row[0] for row in self._con.execute(f'DESCRIBE {sql}').fetchall()] \
+                            if sql is not None else None
+                        if summary_columns == expected_columns:
+                            continue
+                        logger.info(f'Dropping outdated summary table {summary_table}')
+                        self._con.execute(f'DROP TABLE {summary_table}')
+                    if sql is not None:
+                        logger.info(f'Creating summary table {summary_table}')
+                        self._con.execute(f'CREATE TABLE {summary_table} AS {sql}')
+        except Exception as e:
+            logger.error(f'Error creating summary tables: {e}')
+
+    def _get_catalog_columns(self, catalog: str | None) -> dict[str, list[str]]:
+        """Returns the columns of every table of the catalog, system tables aside"""
+        rows = self._con.execute(
+            'SELECT table_name, column_name FROM duckdb_columns() '
+            'WHERE database_name = COALESCE(?, current_database()) AND NOT list_contains(?, table_name) '
+            'ORDER BY table_name, column_index',
+            [catalog, list(self._SYSTEM_TABLES)]).fetchall()
+        table_columns: dict[str, list[str]] = {}
+        for table_name, column_name in rows:
+            table_columns.setdefault(table_name, []).append(column_name)
+        return table_columns
+
+    def _register_table(self, table_name: str, year: int | None, refreshed_at: pd.Timestamp,
+                        content_hash: str, version: int, modified_at: pd.Timestamp) -> None:
+        logical_name = self._get_logical_name(table_name, year)
+        self._table_columns.pop(logical_name, None)
+        self._table_columns.pop(self.get_year_table_name(table_name), None)
+        self._table_refreshed_at[logical_name] = refreshed_at
+        self._table_content_hashes[logical_name] = content_hash
+        self._table_versions[logical_name] = version
+        self._table_modified_at[logical_name] = modified_at
+        if logical_name not in self._duckdb_tables:
+            self._duckdb_tables.append(logical_name)
+        self._notify_table_listeners(logical_name)
+        if year is not None:
+            storage_table = self.get_year_table_name(table_name)
+            self._year_partitions[logical_name] = (storage_table, year)
+            if storage_table not in self._duckdb_tables:
+                self._duckdb_tables.append(storage_table)
+            self._notify_table_listeners(storage_table)
+
+    def _write_table_metadata(self, table_name: str, refreshed_at: pd.Timestamp, content_hash: str, version: int,
+                              modified_at: pd.Timestamp, storage_table: str = None, year: int = None,
+                              catalog: str = None) -> None:
+        self._con.execute(
+            f'INSERT INTO {self._qualify("table_metadata", catalog)} '
+            '(table_name, refreshed_at, storage_table, year, content_hash, version, modified_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (table_name) DO UPDATE SET refreshed_at = excluded.refreshed_at, '
+            'storage_table = excluded.storage_table, year = excluded.year, content_hash = excluded.content_hash, '
+            'version = excluded.version, modified_at = excluded.modified_at',
+            (table_name, refreshed_at.to_pydatetime(), storage_table, year, content_hash, version,
+             modified_at.to_pydatetime())
+        )
+
+    @staticmethod
+    def _get_content_hash(data_frame: DataFrame) -> str:
+        """Hashes the column names and every row, so unchanged content keeps the same hash across refreshes"""
+        digest = hashlib.sha256(repr(list(data_frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(data_frame, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def _attach_remote(self, remote_database: str) -> bool:
+        try:
+            self._con.execute(f"ATTACH '{remote_database}' AS {self.REMOTE_CATALOG}")
+            logger.info(f'Attached remote database {remote_database}')
+            return True
+        except Exception as e:
+            logger.warning(f'Remote database {remote_database} is unavailable, serving the local database only: {e}')
+            return False
+
+    def _sync_from_remote(self) -> None:
+        """
+        Copies into the local database the remote tables it lacks and those refreshed remotely after their
+        local copy, along with their table_metadata rows and the users missing locally
+        """
+        try:
+            remote_tables = [row[0] for row in self._con.execute(
+                'SELECT table_name FROM duckdb_tables() WHERE database_name = ?', [self.REMOTE_CATALOG]).fetchall()]
+            local_tables = set(self._con.execute('SHOW TABLES').fetchdf()['name'])
+            remote_refreshed_at = self._get_storage_refreshed_at(self.REMOTE_CATALOG)
+            local_refreshed_at = self._get_storage_refreshed_at(None)
+            outdated_tables = [table for table in remote_tables if table not in self._SYSTEM_TABLES and (
+                table not in local_tables or self._is_newer(remote_refreshed_at.get(self._get_source_table(table)),
+                                                            local_refreshed_at.get(self._get_source_table(table))))]
+
+            logger.info(f'Syncing tables {outdated_tables} from remote database')
+            remote_table_metadata = self._qualify('table_metadata', self.REMOTE_CATALOG)
+            self._con.execute('BEGIN TRANSACTION')
+            for table in outdated_tables:
+                self._con.execute(f'CREATE OR REPLACE TABLE {table} AS '
+                                  f'SELECT * FROM {self._qualify(table, self.REMOTE_CATALOG)}')
+            self._con.execute('DELETE FROM table_metadata WHERE list_contains(?, COALESCE(storage_table, table_name))',
+                              [outdated_tables])
+            self._con.execute(f'INSERT INTO table_metadata BY NAME SELECT * FROM {remote_table_metadata} '
+                              f'WHERE list_contains(?, COALESCE(storage_table, table_name))', [outdated_tables])
+            self._con.execute(f'INSERT INTO users BY NAME SELECT * FROM {self._qualify("users", self.REMOTE_CATALOG)} '
+                              f'WHERE username NOT IN (SELECT username FROM users) ON CONFLICT DO NOTHING')
+            self._con.execute('COMMIT')
         except Exception as e:
-            logger.error(f'Error creating table db_datetime: {e}')
+            logger.error(f'Error syncing tables from remote database: {e}')
+            self._rollback()
+
+    def _get_storage_refreshed_at(self, catalog: str | None) -> dict[str, pd.Timestamp]:
+        """Returns when each physical table of the catalog was last written, according to its table_metadata"""
+        rows = self._con.execute(
+            f'SELECT COALESCE(storage_table, table_name), MAX(refreshed_at) '
+            f'FROM {self._qualify("table_metadata", catalog)} GROUP BY 1').fetchall()
+        return {table: pd.Timestamp(refreshed_at) for table, refreshed_at in rows}
+
+    @staticmethod
+    def _is_newer(refreshed_at: pd.Timestamp | None, other_refreshed_at: pd.Timestamp | None) -> bool:
+        return refreshed_at is not None and (other_refreshed_at is None or refreshed_at > other_refreshed_at)
+
+    def _get_source_table(self, table_name: str) -> str:
+        """Returns the table whose refreshes a summary table follows, or the table itself"""
+        if not table_name.endswith(self._SUMMARY_TABLE_SUFFIX):
+            return table_name
+        return self.get_year_table_name(table_name[:-len(self._SUMMARY_TABLE_SUFFIX)])
+
+    def _get_catalogs(self) -> list[str | None]:
+        """Returns the catalogs every write goes to: the remote one first when attached, then the default one"""
+        return [self.REMOTE_CATALOG, None] if self._remote_attached else [None]
+
+    @staticmethod
+    def _qualify(table_name: str, catalog: str | None) -> str:
+        return table_name if catalog is None else f'{catalog}.{table_name}'
+
+    @staticmethod
+    def _get_logical_name(table_name: str, year: int | None) -> str:
+        return table_name if year is None else f'{table_name}_{year}'
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        return '"' + identifier.replace('"', '""') + '"'
+
+    def _rollback(self) -> None:
+        try:
+            self._con.execute('ROLLBACK')
+        except Exception as e:
+            logger.error(f'Error rolling back duckdb transaction: {e}')
+
+    def _build_table_query(self, table_name: str, query: QueryRequest | None) -> tuple[str, list]:
+        storage_table, conditions, params, hidden_columns = table_name, [], [], ()
+        if table_name in self._year_partitions:
+            storage_table, year = self._year_partitions[table_name]
+            conditions, params, hidden_columns = ['year = ?'], [year], ('year',)
+        return self._build_query(storage_table, query, conditions, params, hidden_columns)
+
+    def _build_year_range_query(self, storage_table: str, start_year: int, end_year: int,
+                                query: QueryRequest | None) -> tuple[str, list]:
+        if query is None or not query.get_sort():
+            query = (query or QueryRequest()).model_copy(update={'sort': 'year'})
+        return self._build_query(storage_table, query, ['year BETWEEN ? AND ?'], [start_year, end_year])
+
+    def _build_query(self, table_name: str, query: QueryRequest | None, conditions: list[str], params: list,
+                     hidden_columns: tuple[str, ...] = ()) -> tuple[str, list]:
+        columns = self._get_columns(table_name) if query is not None and query.has_pushdown() else []
+        return self._query_builder.build(table_name, columns, query, conditions, params, hidden_columns)
+
+    def _get_columns(self, table_name: str) -> list[str]:
+        if table_name not in self._table_columns:
+            self._table_columns[table_name] = [
+                row[0] for row in self._pool.cursor().execute(f'DESCRIBE {table_name}').fetchall()]
+        return self._table_columns[table_name]
+
+    def _serialize(self, sql: str, params: list, response_format: ResponseFormat) -> tuple[bytes, int]:
+        if response_format.is_json():
+            return self._to_json(sql, params, response_format)
+        return self._serialize_arrow(self._execute(sql, params).arrow(), response_format)
+
+    def _to_json(self, sql: str, params: list, response_format: ResponseFormat) -> tuple[bytes, int]:
+        """
+        Renders every row as a JSON object inside duckdb and joins them into an array, so no per-row dict
+        or per-cell python object is built. Row order of `sql` is kept.
+        """
+        rows = self._execute(self._get_json_rows_sql(sql), params).fetchnumpy()
+        return self._join_json_rows(rows['row_json'], response_format), len(rows['row_json'])
+
+    def _stream_json(self, sql: str, params: list, response_format: ResponseFormat,
+                     batch_size: int) -> Iterator[bytes]:
+        """
+        Runs the query on its own cursor, since the rows are consumed after this call returns, and hands back
+        a generator over its record batches. Query errors are raised here rather than mid-stream.
+        """
+        cursor = self._pool.new_cursor()
+        try:
+            sql = self._get_json_rows_sql(sql)
+            result = cursor.execute(sql, params) if params else cursor.execute(sql)
+            reader = result.fetch_record_batch(batch_size)
+        except Exception:
+            cursor.close()
+            raise
+        return self._iter_json_batches(cursor, reader, response_format)
+
+    @staticmethod
+    def _iter_json_batches(cursor, reader: pa.RecordBatchReader, response_format: ResponseFormat) -> Iterator[bytes]:
+        ndjson = response_format == ResponseFormat.NDJSON
+        try:
+            if not ndjson:
+                yield b'['
+            first_batch = True
+            for batch in reader:
+                rows = batch.column(0).to_pylist()
+                if not rows:
+                    continue
+                if ndjson:
+                    yield ('\n'.join(rows) + '\n').encode()
+                else:
+                    yield (('' if first_batch else ',') + ','.join(rows)).encode()
+                first_batch = False
+            if not ndjson:
+                yield b']'
+        except Exception as e:
+            logger.error(f'Error streaming rows from duckdb {e}')
+            raise
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _get_json_rows_sql(sql: str) -> str:
+        return f'SELECT to_json(t)::VARCHAR AS row_json FROM ({sql}) t'
+
+    @staticmethod
+    def _join_json_rows(rows, response_format: ResponseFormat = ResponseFormat.JSON) -> bytes:
+        if response_format == ResponseFormat.NDJSON:
+            return ''.join(row + '\n' for row in rows).encode()
+        return ('[' + ','.join(rows) + ']').encode()
+
+    @staticmethod
+    def _serialize_arrow(table: pa.Table, response_format: ResponseFormat) -> tuple[bytes, int]:
+        """Writes an arrow result set as an Arrow IPC stream, Parquet file or CSV"""
+        sink = pa.BufferOutputStream()
+        if response_format == ResponseFormat.ARROW:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        elif response_format == ResponseFormat.PARQUET:
+            pq.write_table(table, sink)
+        else:
+            pa_csv.write_csv(table, sink)
+        return sink.getvalue().to_pybytes(), table.num_rows
+
+    def _execute(self, sql: str, params: list):
+        cursor = self._pool.cursor()
+        return cursor.execute(sql, params) if params else cursor.execute(sql)
+
+    def _notify_table_listeners(self, table_name: str) -> None:
+        for listener in self._table_listeners:
+            try:
+                listener(table_name)
+            except Exception as e:
+                logger.error(f'Error notifying listener about table {table_name}: {e}')
 
     @staticmethod
     def _get_columns_definition(columns_dict: dict) -> str:
@@ -1,38 +1,412 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator
+
 from duckdb.experimental.spark import DataFrame
-from flask import jsonify, Response
+from flask import has_request_context, request, Response
 
 import pandas as pd
 from loguru import logger
 from pydantic import ValidationError
 from requests import RequestException
+from werkzeug.http import is_resource_modified
 
+from src.config.extractor import ExtractorConfig
+from src.model.aggregation_request import AggregationRequest
+from src.model.batch_request import BatchItemRequest, BatchRequest
+from src.model.query_request import QueryRequest
+from src.model.response_format import ResponseFormat
 from src.model.year_request import YearRequest
+from src.service.cache import LRUTTLCache
+from src.service.compression import ResponseCompressor
 from src.service.duck_db import DuckDBService
+from src.service.query_builder import InvalidQueryError
+from src.service.single_flight import SingleFlight
 from src.service.scrapper import EMBRAPAScrapperService
 
 
+class TableScrapeError(Exception):
+    """Raised when a table could not be scraped and loaded and only its stored rows are left"""
+
+
 class EMBRAPAExtractorService(object):
     HALF_HOUR = 1800
     BAD_REQUEST = 400
+    NOT_FOUND = 404
+    RESPONSE_CACHE_MAX_ENTRIES = 256
 
-    def __init__(self, duck_db: DuckDBService):
+    def __init__(self, duck_db: DuckDBService, stale_while_revalidate: bool = ExtractorConfig.STALE_WHILE_REVALIDATE,
+                 max_staleness: int = ExtractorConfig.MAX_STALENESS,
+                 stream_batch_size: int = ExtractorConfig.STREAM_BATCH_SIZE,
+                 year_range_max_scrapes: int = ExtractorConfig.YEAR_RANGE_MAX_SCRAPES,
+                 response_cache_max_bytes: int = ExtractorConfig.RESPONSE_CACHE_MAX_BYTES):
         self._duck_db = duck_db
         self._scrapper = EMBRAPAScrapperService()
+        self._response_cache = LRUTTLCache(self.RESPONSE_CACHE_MAX_ENTRIES, self.HALF_HOUR, response_cache_max_bytes,
+                                           self._get_bodies_size)
+        self._compressor = ResponseCompressor()
+        self._duck_db.add_table_listener(self._response_cache.invalidate)
+        self._scrape_flight = SingleFlight()
+        self._stale_while_revalidate = stale_while_revalidate
+        self._max_staleness = max_staleness
+        self._stream_batch_size = stream_batch_size
+        self._year_range_max_scrapes = year_range_max_scrapes
+        self._scheduled_tables: set[str] = set()
+        self._scheduled_tables_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=ExtractorConfig.REFRESH_WORKERS,
+                                                    thread_name_prefix='table-refresh')
+
+    def extract_data(self, resource: str, sub_resource: str = None, year: int = None,
+                     query: dict = None) -> Response:
+        try:
+            query_request = QueryRequest(**(query or {}))
+            validated_year = None if query_request.has_year_range() else self._get_validated_year(year)
+            table_names = self._get_source_tables(resource, sub_resource, validated_year, query_request)
+            not_modified = self._get_not_modified_response(table_names, query_request)
+            if not_modified is not None:
+                not_modified.vary.add('Accept-Encoding')
+                return self._add_format_vary(not_modified)
+
+            response = self._extract(resource, sub_resource, validated_year, query_request)
+            return self._add_format_vary(self._add_validators(response, table_names, query_request))
+        except ValidationError as e:
+            return Response(e.json(), status=self.BAD_REQUEST)
+        except InvalidQueryError as e:
+            return Response(json.dumps({'error': str(e)}), status=self.BAD_REQUEST, mimetype='application/json')
 
-    def extract_data(self, resource: str, sub_resource: str = None, year: int = None) -> Response:
+    def extract_batch(self, requests: list[dict]) -> Response:
+        """
+        Answers several resource requests in one JSON response holding, in order, each request with its
+        status and its rows, or its error. Items are always JSON and never streamed, and an item failing with
+        an unexpected error is reported with status 500 without failing the others.
+        """
         try:
-            validated_year = self._get_validated_year(year)
-            duck_db_tables = self._duck_db.get_tables()
-            table_name = '_'.join(filter(None, [resource, sub_resource, validated_year]))
-            if table_name in duck_db_tables:
-                data = self._duck_db.fetch_data(table_name)
-                if data is None or self._is_data_expired():
-                    data = self._scrape_and_load_data(resource, sub_resource, table_name, validated_year)
+            batch_request = BatchRequest(requests=requests)
+        except ValidationError as e:
+            return Response(e.json(), status=self.BAD_REQUEST)
+        results = [self._extract_batch_item(item) for item in batch_request.requests]
+        body = b'{"results":[' + b','.join(results) + b']}'
+        return self._build_encoded_response({ResponseCompressor.IDENTITY: body}, QueryRequest())
+
+    def extract_aggregation(self, kind: str, query: dict = None) -> Response:
+        """
+        Answers a `top`, `share` or `growth` aggregation computed inside duckdb, loading the tables it reads
+        like the data endpoints do. Growth reads every year of the requested range.
+        """
+        try:
+            aggregation = AggregationRequest(**(query or {}))
+            resource, sub_resource = aggregation.resource, aggregation.sub_resource
+            if (resource, sub_resource) not in EMBRAPAScrapperService.get_resource_matrix():
+                return Response(json.dumps({'error': 'Unknown resource'}), status=self.NOT_FOUND,
+                                mimetype='application/json')
+            if kind == 'growth':
+                table_name = self.get_table_name(resource, sub_resource, None)
+                cache_table = self._duck_db.get_year_table_name(table_name)
+                source_tables = self._get_range_tables(resource, sub_resource, *aggregation.get_year_range())
             else:
-                data = self._scrape_and_load_data(resource, sub_resource, table_name, validated_year)
-            return jsonify(data.to_dict(orient='records'))
+                year = self._get_validated_year(aggregation.year)
+                table_name = cache_table = self.get_table_name(resource, sub_resource, year)
+                source_tables = [table_name]
+            cache_key = (cache_table, 'aggregation', kind) + aggregation.get_cache_key()
+            cached_bodies = self._response_cache.get(cache_key)
+            if cached_bodies is None:
+                if kind == 'growth':
+                    stale = self._ensure_year_range_loaded(resource, sub_resource, *aggregation.get_year_range())
+                else:
+                    stale = self._ensure_table_loaded(resource, sub_resource, year)
+                result = self._duck_db.fetch_aggregation(kind, table_name, aggregation) or \
+                    self._duck_db.serialize_data_frame(pd.DataFrame(), ResponseFormat.JSON)
+                cached_bodies = self._cache_bodies(result, cache_key, stale, source_tables)
+            return self._build_encoded_response(cached_bodies, QueryRequest(), cache_key)
         except ValidationError as e:
             return Response(e.json(), status=self.BAD_REQUEST)
+        except InvalidQueryError as e:
+            return Response(json.dumps({'error': str(e)}), status=self.BAD_REQUEST, mimetype='application/json')
+
+    def _extract_batch_item(self, item: BatchItemRequest) -> bytes:
+        prefix = b'{"request":' + item.model_dump_json().encode()
+        if (item.resource, item.sub_resource) not in EMBRAPAScrapperService.get_resource_matrix():
+            return prefix + b',"status":404,"error":"Unknown resource"}'
+        try:
+            query_request = QueryRequest(**item.get_query())
+            validated_year = None if query_request.has_year_range() else self._get_validated_year(item.year)
+            bodies = self._get_bodies(item.resource, item.sub_resource, validated_year, query_request)
+            return prefix + b',"status":200,"data":' + bodies[ResponseCompressor.IDENTITY] + b'}'
+        except ValidationError as e:
+            return prefix + b',"status":400,"error":' + e.json().encode() + b'}'
+        except InvalidQueryError as e:
+            return prefix + b',"status":400,"error":' + json.dumps(str(e)).encode() + b'}'
+        except Exception as e:
+            logger.error(f'Error extracting batch item {item.model_dump_json()}: {e}')
+            return prefix + b',"status":500,"error":' + json.dumps(str(e)).encode() + b'}'
+
+    def _extract(self, resource: str, sub_resource: str | None, year: str | None,
+                 query_request: QueryRequest) -> Response:
+        if query_request.is_streamed():
+            if query_request.has_year_range():
+                return self._stream_year_range(resource, sub_resource, query_request)
+            return self._stream_data(resource, sub_resource, year, query_request)
+        return self._build_encoded_response(self._get_bodies(resource, sub_resource, year, query_request),
+                                            query_request, self._get_cache_key(resource, sub_resource, year,
+                                                                               query_request))
+
+    def _get_bodies(self, resource: str, sub_resource: str | None, year: str | None,
+                    query_request: QueryRequest) -> dict[str, bytes]:
+        """Returns the cached bodies of the response, loading and caching its uncompressed body when missing"""
+        if query_request.has_year_range():
+            return self._get_year_range_bodies(resource, sub_resource, query_request)
+
+        table_name = self.get_table_name(resource, sub_resource, year)
+        cache_key = self._get_cache_key(resource, sub_resource, year, query_request)
+        cached_bodies = self._response_cache.get(cache_key)
+        if cached_bodies is not None:
+            return cached_bodies
+
+        result, stale = self._load_data(resource, sub_resource, table_name, year, query_request)
+        return self._cache_bodies(result, cache_key, stale, [table_name])
+
+    def _get_cache_key(self, resource: str, sub_resource: str | None, year: str | None,
+                       query_request: QueryRequest) -> tuple:
+        """Returns the response cache key, led by the table whose refresh invalidates it"""
+        if query_request.has_year_range():
+            table_name = self._duck_db.get_year_table_name(self.get_table_name(resource, sub_resource, None))
+        else:
+            table_name = self.get_table_name(resource, sub_resource, year)
+        return (table_name,) + query_request.get_cache_key()
+
+    @staticmethod
+    def _get_bodies_size(bodies: dict[str, bytes]) -> int:
+        return sum(len(body) for body in bodies.values())
+
+    def _get_source_tables(self, resource: str, sub_resource: str | None, year: str | None,
+                           query_request: QueryRequest) -> list[str]:
+        """Returns the tables a response is built from, one per year for year ranges"""
+        if not query_request.has_year_range():
+            return [self.get_table_name(resource, sub_resource, year)]
+        return self._get_range_tables(resource, sub_resource, *query_request.get_year_range())
+
+    def _get_range_tables(self, resource: str, sub_resource: str | None, start_year: int, end_year: int) -> list[str]:
+        return [self.get_table_name(resource, sub_resource, str(year)) for year in range(start_year, end_year + 1)]
+
+    def _get_remaining_freshness(self, table_names: list[str]) -> float:
+        """Returns the seconds until the first of the tables expires, 0 when one of them was never refreshed"""
+        refreshed_at = [self._duck_db.get_table_refreshed_at(table_name) for table_name in table_names]
+        if not refreshed_at or None in refreshed_at:
+            return 0
+        return max(0.0, self.HALF_HOUR - (pd.Timestamp.now() - min(refreshed_at)).total_seconds())
+
+    def _get_not_modified_response(self, table_names: list[str], query_request: QueryRequest) -> Response | None:
+        """Answers a matching conditional request with a 304 from in-memory table metadata, before touching duckdb"""
+        if not has_request_context() or any(self._is_data_expired(table_name) for table_name in table_names):
+            return None
+        validators = self._get_validators(table_names, query_request)
+        if validators is None:
+            return None
+        etag, last_modified, _ = validators
+        if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            return None
+        return self._set_validators(Response(status=304), validators)
+
+    @staticmethod
+    def _add_format_vary(response: Response) -> Response:
+        """Adds Accept to Vary when the response format was negotiated from it instead of the `format` parameter"""
+        if has_request_context() and 'format' not in request.args:
+            response.vary.add('Accept')
+        return response
+
+    def _add_validators(self, response: Response, table_names: list[str], query_request: QueryRequest) -> Response:
+        validators = self._get_validators(table_names, query_request)
+        if validators is None:
+            return response
+        self._set_validators(response, validators)
+        return response.make_conditional(request) if has_request_context() else response
+
+    def _get_validators(self, table_names: list[str], query_request: QueryRequest) -> tuple[str, object, int] | None:
+        """
+        Returns the ETag, Last-Modified and max-age of a response built from the tables. The ETag combines
+        the content hash of every table with the query, so it only changes when the served rows change. It is
+        sent as a weak ETag since the bytes differ with the negotiated content coding. Last-Modified is the last
+        content change, so refreshes that scraped the same rows do not move it.
+        """
+        content_hashes = [self._duck_db.get_table_content_hash(table_name) for table_name in table_names]
+        if None in content_hashes:
+            return None
+        modified_at = [self._duck_db.get_table_modified_at(table_name) for table_name in table_names]
+        if None in modified_at:
+            return None
+        etag = hashlib.sha256(repr((content_hashes, query_request.get_cache_key())).encode()).hexdigest()[:32]
+        return etag, max(modified_at).to_pydatetime().astimezone(), int(self._get_remaining_freshness(table_names))
+
+    @staticmethod
+    def _set_validators(response: Response, validators: tuple[str, object, int]) -> Response:
+        etag, last_modified, max_age = validators
+        response.set_etag(etag, weak=True)
+        response.last_modified = last_modified
+        response.cache_control.private = True
+        response.cache_control.max_age = max_age
+        return response
+
+    def _load_data(self, resource: str, sub_resource: str | None, table_name: str, year: str | None,
+                   query_request: QueryRequest) -> tuple[tuple[bytes, int], bool]:
+        """
+        Returns the serialized table rows with their count, loading them when needed, and whether they are stale
+        """
+        response_format = query_request.get_format()
+        duck_db_tables = self._duck_db.get_tables()
+        if table_name in duck_db_tables and not self._is_data_expired(table_name):
+            result = self._duck_db.fetch_serialized(table_name, self._get_pushdown(query_request), response_format)
+            if result is not None:
+                return result, False
+        elif table_name in duck_db_tables and self._can_serve_stale(table_name):
+            result = self._duck_db.fetch_serialized(table_name, self._get_pushdown(query_request), response_format)
+            if result is not None and result[1]:
+                self._schedule_refresh(resource, sub_resource, table_name, year)
+                return result, True
+
+        data = self._scrape_and_load_data(resource, sub_resource, table_name, year)
+        if query_request.has_pushdown():
+            result = self._duck_db.fetch_serialized(table_name, query_request, response_format)
+            return result or self._duck_db.serialize_data_frame(pd.DataFrame(), response_format), False
+        return self._duck_db.serialize_data_frame(data, response_format), False
+
+    @staticmethod
+    def _get_pushdown(query_request: QueryRequest) -> QueryRequest | None:
+        return query_request if query_request.has_pushdown() else None
+
+    def _cache_bodies(self, result: tuple[bytes, int], cache_key: tuple, stale: bool,
+                      table_names: list[str]) -> dict[str, bytes]:
+        """Caches the bodies of fresh rows until the first of the tables they were read from expires"""
+        body, rows = result
+        bodies = {ResponseCompressor.IDENTITY: body}
+        ttl = self._get_remaining_freshness(table_names) if rows and not stale else 0
+        if ttl > 0:
+            self._response_cache.put(cache_key, bodies, ttl)
+        return bodies
+
+    def _build_encoded_response(self, bodies: dict[str, bytes], query_request: QueryRequest,
+                                cache_key: tuple | None = None) -> Response:
+        """
+        Answers with the body in the content coding negotiated from Accept-Encoding. Compressed variants are
+        kept in `bodies`, which is the response cache entry under `cache_key` for cached responses, so each
+        coding is only compressed once per table refresh and counts towards the size of the cache.
+        """
+        body = bodies[ResponseCompressor.IDENTITY]
+        encoding = ResponseCompressor.IDENTITY
+        if has_request_context():
+            encoding = self._compressor.negotiate(request.accept_encodings, len(body))
+        if encoding not in bodies:
+            bodies[encoding] = self._compressor.compress(body, encoding)
+            if cache_key is not None:
+                self._response_cache.resize(cache_key)
+        response = Response(bodies[encoding], mimetype=query_request.get_format().mimetype)
+        if encoding != ResponseCompressor.IDENTITY:
+            response.content_encoding = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def _stream_data(self, resource: str, sub_resource: str | None, year: str | None,
+                     query_request: QueryRequest) -> Response:
+        """Streams the table rows in batches instead of building the whole body, bypassing the response cache"""
+        table_name = self.get_table_name(resource, sub_resource, year)
+        self._ensure_table_loaded(resource, sub_resource, year)
+        chunks = self._duck_db.stream_serialized(table_name, self._get_pushdown(query_request),
+                                                 query_request.get_format(), self._stream_batch_size)
+        return self._build_streamed_response(chunks, query_request)
+
+    def _build_streamed_response(self, chunks: Iterator[bytes] | None, query_request: QueryRequest) -> Response:
+        if chunks is None:
+            chunks = [self._duck_db.serialize_data_frame(pd.DataFrame(), query_request.get_format())[0]]
+        return Response(chunks, mimetype=query_request.get_format().mimetype)
+
+    def _get_year_range_bodies(self, resource: str, sub_resource: str | None,
+                               query_request: QueryRequest) -> dict[str, bytes]:
+        table_name = self.get_table_name(resource, sub_resource, None)
+        cache_key = self._get_cache_key(resource, sub_resource, None, query_request)
+        cached_bodies = self._response_cache.get(cache_key)
+        if cached_bodies is not None:
+            return cached_bodies
+
+        start_year, end_year = query_request.get_year_range()
+        stale = self._ensure_year_range_loaded(resource, sub_resource, start_year, end_year)
+        response_format = query_request.get_format()
+        result = self._duck_db.fetch_year_range_serialized(table_name, start_year, end_year,
+                                                           self._get_pushdown(query_request), response_format)
+        result = result or self._duck_db.serialize_data_frame(pd.DataFrame(), response_format)
+        return self._cache_bodies(result, cache_key, stale,
+                                  self._get_range_tables(resource, sub_resource, start_year, end_year))
+
+    def _stream_year_range(self, resource: str, sub_resource: str | None, query_request: QueryRequest) -> Response:
+        start_year, end_year = query_request.get_year_range()
+        self._ensure_year_range_loaded(resource, sub_resource, start_year, end_year)
+        chunks = self._duck_db.stream_year_range_serialized(self.get_table_name(resource, sub_resource, None),
+                                                            start_year, end_year, self._get_pushdown(query_request),
+                                                            query_request.get_format(), self._stream_batch_size)
+        return self._build_streamed_response(chunks, query_request)
+
+    def _ensure_year_range_loaded(self, resource: str, sub_resource: str | None, start_year: int,
+                                  end_year: int) -> bool:
+        """
+        Loads the missing or expired years of the range, returning whether stale or incomplete rows are served
+        meanwhile. At most `year_range_max_scrapes` years are scraped within the request, the others are loaded
+        in background, so a wide range does not hold the request for one upstream scrape per year.
+        """
+        stale, scrapes = False, 0
+        for year in map(str, range(start_year, end_year + 1)):
+            table_name = self.get_table_name(resource, sub_resource, year)
+            needs_scrape = self._needs_scrape(table_name)
+            if needs_scrape and scrapes >= self._year_range_max_scrapes:
+                self._schedule_refresh(resource, sub_resource, table_name, year)
+                stale = True
+                continue
+            scrapes += needs_scrape
+            try:
+                stale = self._ensure_table_loaded(resource, sub_resource, year) or stale
+            except Exception as e:
+                logger.error(f'Error loading resource: {resource}, sub_resource: {sub_resource}, year: {year}: {e}')
+        return stale
+
+    def _needs_scrape(self, table_name: str) -> bool:
+        """Returns whether serving the table requires scraping it first"""
+        if table_name not in self._duck_db.get_tables():
+            return True
+        return self._is_data_expired(table_name) and not self._can_serve_stale(table_name)
+
+    def _ensure_table_loaded(self, resource: str, sub_resource: str | None, year: str | None) -> bool:
+        """Loads the table when missing or expired, returning whether stale rows are being served meanwhile"""
+        table_name = self.get_table_name(resource, sub_resource, year)
+        if table_name in self._duck_db.get_tables():
+            if not self._is_data_expired(table_name):
+                return False
+            if self._can_serve_stale(table_name):
+                self._schedule_refresh(resource, sub_resource, table_name, year)
+                return True
+        self._scrape_and_load_data(resource, sub_resource, table_name, year)
+        return False
+
+    def needs_refresh(self, resource: str, sub_resource: str = None, year: int = None) -> bool:
+        table_name = self.get_table_name(resource, sub_resource, self._get_validated_year(year))
+        return table_name not in self._duck_db.get_tables() or self._is_data_expired(table_name)
+
+    def warm_table(self, resource: str, sub_resource: str = None, year: int = None) -> bool:
+        """
+        Scrapes and loads the table when it is missing or expired, returning whether a scrape happened, and
+        raises TableScrapeError when the scrape failed
+        """
+        if not self.needs_refresh(resource, sub_resource, year):
+            return False
+        validated_year = self._get_validated_year(year)
+        table_name = self.get_table_name(resource, sub_resource, validated_year)
+        _, scraped = self._scrape_and_load(resource, sub_resource, table_name, validated_year)
+        if not scraped:
+            raise TableScrapeError(f'Could not scrape table {table_name}')
+        return True
+
+    @staticmethod
+    def get_table_name(resource: str, sub_resource: str | None, year: str | None) -> str:
+        """Returns the duckdb table name of a resource, sub_resource and year"""
+        return '_'.join(filter(None, [resource, sub_resource, year]))
 
     @staticmethod
     def _get_validated_year(year: int) -> str:
@@ -40,17 +414,54 @@ class EMBRAPAExtractorService(object):
         return str(validated_year) if validated_year else None
 
     def _scrape_and_load_data(self, resource: str, sub_resource: str, table_name: str, year: str) -> DataFrame:
+        return self._scrape_and_load(resource, sub_resource, table_name, year)[0]
+
+    def _scrape_and_load(self, resource: str, sub_resource: str, table_name: str,
+                         year: str) -> tuple[DataFrame, bool]:
+        """Scrapes and loads the table once for concurrent callers, returning its rows and whether the scrape worked"""
+        return self._scrape_flight.do(
+            table_name, lambda: self._do_scrape_and_load_data(resource, sub_resource, table_name, year))
+
+    def _do_scrape_and_load_data(self, resource: str, sub_resource: str, table_name: str,
+                                 year: str) -> tuple[DataFrame, bool]:
         try:
             data = self._scrapper.scrape_and_parse_tables(resource=resource, sub_resource=sub_resource,
                                                           year=year)
-            self._duck_db.create_dataframe_table(table_name, data)
-        except RequestException:
+            if year:
+                self._duck_db.create_dataframe_table(self.get_table_name(resource, sub_resource, None), data,
+                                                     year=int(year))
+            else:
+                self._duck_db.create_dataframe_table(table_name, data)
+        except (RequestException, ValueError) as e:
             logger.error(
-                f'Error while scrapping data for resource: {resource}, sub_resource: {sub_resource}, year: {year}. '
-                f'Fetching from database instead.')
-            data = self._duck_db.fetch_data(table_name)
-        return data
-
-    def _is_data_expired(self):
-        return (pd.Timestamp.now() - pd.to_datetime(
-            self._duck_db.fetch_data('db_datetime').get('datetime')).max()).total_seconds() > self.HALF_HOUR
+                f'Error while scrapping data for resource: {resource}, sub_resource: {sub_resource}, year: {year}: '
+                f'{e}. Fetching from database instead.')
+            return self._duck_db.fetch_data(table_name), False
+        return data, True
+
+    def _schedule_refresh(self, resource: str, sub_resource: str, table_name: str, year: str) -> None:
+        with self._scheduled_tables_lock:
+            if table_name in self._scheduled_tables or self._scrape_flight.in_flight(table_name):
+                return
+            self._scheduled_tables.add(table_name)
+        logger.info(f'Loading table {table_name} in background')
+        future = self._refresh_executor.submit(self._scrape_and_load_data, resource, sub_resource, table_name, year)
+        future.add_done_callback(lambda f: self._on_refresh_done(table_name, f))
+
+    def _on_refresh_done(self, table_name: str, future: Future) -> None:
+        with self._scheduled_tables_lock:
+            self._scheduled_tables.discard(table_name)
+        if future.exception() is not None:
+            logger.error(f'Error refreshing table {table_name} in background: {future.exception()}')
+
+    def _can_serve_stale(self, table_name: str) -> bool:
+        data_age = self._get_data_age(table_name)
+        return self._stale_while_revalidate and data_age is not None and data_age <= self._max_staleness
+
+    def _is_data_expired(self, table_name: str) -> bool:
+        data_age = self._get_data_age(table_name)
+        return data_age is None or data_age > self.HALF_HOUR
+
+    def _get_data_age(self, table_name: str) -> float | None:
+        refreshed_at = self._duck_db.get_table_refreshed_at(table_name)
+        return None if refreshed_at is None else (pd.Timestamp.now() - refreshed_at).total_seconds()
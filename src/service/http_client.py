@@ -0,0 +1,70 @@
+import threading
+from http import HTTPStatus
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config.http_client import HttpClientConfig
+
+
+class HttpClientService(object):
+    """Pooled keep-alive HTTP client with timeouts, jittered retries and conditional GET support"""
+    _RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, connect_timeout: float = HttpClientConfig.HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HttpClientConfig.HTTP_READ_TIMEOUT,
+                 retries: int = HttpClientConfig.HTTP_RETRIES,
+                 backoff_factor: float = HttpClientConfig.HTTP_BACKOFF_FACTOR,
+                 backoff_jitter: float = HttpClientConfig.HTTP_BACKOFF_JITTER,
+                 pool_size: int = HttpClientConfig.HTTP_POOL_SIZE):
+        self._timeout = (connect_timeout, read_timeout)
+        self._session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=backoff_factor, backoff_jitter=backoff_jitter,
+                      status_forcelist=self._RETRY_STATUSES, allowed_methods=('GET', 'HEAD'),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._validators: dict[str, dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, conditional: bool = False) -> requests.Response:
+        """
+        Performs a GET request. When `conditional` is set, the ETag/Last-Modified validators of the
+        previous response for the same URL are sent, and a 304 response is returned as is.
+        """
+        headers = self._get_conditional_headers(url) if conditional else {}
+        response = self._session.get(url, headers=headers, timeout=self._timeout)
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            logger.info(f'Upstream page not modified: {url}')
+            return response
+        response.raise_for_status()
+        self._store_validators(url, response)
+        return response
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _get_conditional_headers(self, url: str) -> dict[str, str]:
+        with self._lock:
+            validators = self._validators.get(url, {})
+        headers = {}
+        if 'etag' in validators:
+            headers['If-None-Match'] = validators['etag']
+        if 'last_modified' in validators:
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def _store_validators(self, url: str, response: requests.Response) -> None:
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['last_modified'] = response.headers['Last-Modified']
+        with self._lock:
+            if validators:
+                self._validators[url] = validators
+            else:
+                self._validators.pop(url, None)
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from src.config.auth import AuthConfig
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when every hashing worker is busy and the queue stays full for the wait timeout"""
+
+
+class PasswordHasherService(object):
+    """
+    Hashes and checks passwords on a bounded pool of workers. Requests beyond the workers plus the queue are
+    rejected, right away by default or after waiting up to `wait_timeout` seconds for a slot, so a burst of
+    logins holds at most that many request threads.
+    """
+
+    def __init__(self, method: str = AuthConfig.PASSWORD_HASH_METHOD, workers: int = AuthConfig.PASSWORD_HASH_WORKERS,
+                 queue_size: int = AuthConfig.PASSWORD_HASH_QUEUE_SIZE,
+                 wait_timeout: float = AuthConfig.PASSWORD_HASH_WAIT_TIMEOUT):
+        self._method = method
+        self._method_prefix = self._get_method_prefix(generate_password_hash('', method))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._workers = workers
+        self._queue_size = queue_size
+        self._wait_timeout = wait_timeout
+        self._metrics_lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self._method)
+
+    def check(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Tells whether the hash was made with another method or cost than the configured one"""
+        return self._get_method_prefix(password_hash) != self._method_prefix
+
+    def get_metrics(self) -> dict:
+        with self._metrics_lock:
+            return {'workers': self._workers, 'queue_size': self._queue_size,
+                    'in_flight': min(self._pending, self._workers),
+                    'queued': max(self._pending - self._workers, 0),
+                    'completed': self._completed, 'rejected': self._rejected}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _run(self, function: Callable, *args):
+        if not self._slots.acquire(timeout=max(self._wait_timeout, 0)):
+            with self._metrics_lock:
+                self._rejected += 1
+            raise PasswordHasherBusyError('Every password hashing worker is busy')
+        with self._metrics_lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(function, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future.result()
+
+    def _release(self, future: Future = None) -> None:
+        with self._metrics_lock:
+            self._pending -= 1
+            if future is not None:
+                self._completed += 1
+        self._slots.release()
+
+    @staticmethod
+    def _get_method_prefix(password_hash: str) -> str:
+        return password_hash.split('$', 1)[0]
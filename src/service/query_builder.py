@@ -0,0 +1,79 @@
+from src.model.query_request import QueryRequest
+
+
+class InvalidQueryError(ValueError):
+    pass
+
+
+class QueryBuilder(object):
+    """Compiles a QueryRequest into a parameterized SELECT over a stored table"""
+    _TEXT_FILTERS = ('product', 'country')
+    _RANGE_FILTERS = {
+        'min_quantity': ('quantity', '>='),
+        'max_quantity': ('quantity', '<='),
+        'min_value': ('value', '>='),
+        'max_value': ('value', '<=')
+    }
+
+    def build(self, table_name: str, columns: list[str], query: QueryRequest = None, conditions: list[str] = None,
+              params: list = None, hidden_columns: tuple[str, ...] = ()) -> tuple[str, list]:
+        """
+        Returns the SQL and its parameters. `conditions` and `params` are ANDed before the request filters and
+        `hidden_columns` are left out of the default projection.
+        """
+        query = query or QueryRequest()
+        conditions = list(conditions or [])
+        params = list(params or [])
+        visible_columns = [column for column in columns if column not in hidden_columns]
+
+        for name in self._TEXT_FILTERS:
+            value = getattr(query, name)
+            if value is not None:
+                conditions.append(f'{self._quote(self.resolve_column(name, visible_columns))} ILIKE ?')
+                params.append(value)
+        for name, (alias, operator) in self._RANGE_FILTERS.items():
+            value = getattr(query, name)
+            if value is not None:
+                conditions.append(f'{self._quote(self.resolve_column(alias, visible_columns))} {operator} ?')
+                params.append(value)
+
+        sql = f'SELECT {self._get_projection(query, visible_columns, hidden_columns)} FROM {table_name}'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        order_by = self._get_order_by(query, visible_columns)
+        if order_by:
+            sql += f' ORDER BY {order_by}'
+        if query.limit is not None:
+            sql += ' LIMIT ?'
+            params.append(query.limit)
+        if query.offset is not None:
+            sql += ' OFFSET ?'
+            params.append(query.offset)
+        return sql, params
+
+    def resolve_column(self, name: str, columns: list[str]) -> str:
+        """Resolves a column name, case-insensitively for the canonical columns product, country, quantity and value"""
+        for candidate in (name, name.lower()):
+            if candidate in columns:
+                return candidate
+        raise InvalidQueryError(f"Column '{name}' is not available, expected one of {columns}")
+
+    def _get_projection(self, query: QueryRequest, visible_columns: list[str], hidden_columns: tuple[str, ...]) -> str:
+        fields = query.get_fields()
+        if fields:
+            return ', '.join(self._quote(self.resolve_column(field, visible_columns)) for field in fields)
+        if hidden_columns:
+            return f'* EXCLUDE ({", ".join(self._quote(column) for column in hidden_columns)})'
+        return '*'
+
+    def _get_order_by(self, query: QueryRequest, visible_columns: list[str]) -> str:
+        order_by = []
+        for item in query.get_sort():
+            descending = item.startswith('-')
+            column = self.resolve_column(item.lstrip('-'), visible_columns)
+            order_by.append(f'{self._quote(column)} {"DESC" if descending else "ASC"}')
+        return ', '.join(order_by)
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        return '"' + identifier.replace('"', '""') + '"'
@@ -0,0 +1,37 @@
+import asyncio
+import threading
+import time
+
+
+class RateLimiter(object):
+    """Spaces out callers so that at most `rate_per_second` acquisitions happen per second"""
+
+    def __init__(self, rate_per_second: float):
+        self._interval = 1 / rate_per_second if rate_per_second > 0 else 0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class AsyncRateLimiter(object):
+    """asyncio counterpart of RateLimiter, suspending the coroutine instead of blocking the thread"""
+
+    def __init__(self, rate_per_second: float):
+        self._interval = 1 / rate_per_second if rate_per_second > 0 else 0
+        self._next_slot = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
@@ -0,0 +1,84 @@
+import pandas as pd
+from loguru import logger
+
+
+class TableSchemaError(ValueError):
+    pass
+
+
+class SchemaNormalizer(object):
+    """
+    Maps scraped vitibrasil tables to the declared schema of their resource: the Portuguese headers, which vary
+    from one page to the next, are renamed to canonical columns and every column is cast to its declared type.
+    Product tables keep the `category` and `level` columns of the parser, level 1 rows being category subtotals
+    and level 2 rows the products they add up. Pages without that hierarchy only list products, so the optional
+    columns are filled with NULL instead of failing the table.
+    """
+    _COLUMN_PREFIXES = {
+        'product': ('Produto', 'Cultivar', 'Sem definição'),
+        'country': ('Países', 'País'),
+        'quantity': ('Quantidade',),
+        'value': ('Valor',),
+        'category': (),
+        'level': ()
+    }
+    _PRODUCT_SCHEMA = {'product': object, 'category': object, 'level': 'Int64', 'quantity': 'Int64'}
+    _TRADE_SCHEMA = {'country': object, 'quantity': 'Int64', 'value': 'Float64'}
+    _OPTIONAL_COLUMNS = ('category', 'level')
+    _SCHEMAS = {
+        'production': _PRODUCT_SCHEMA,
+        'processing': _PRODUCT_SCHEMA,
+        'commercialization': _PRODUCT_SCHEMA,
+        'import': _TRADE_SCHEMA,
+        'export': _TRADE_SCHEMA
+    }
+
+    def normalize(self, resource: str, data_frame: pd.DataFrame) -> pd.DataFrame:
+        """Returns the table with the canonical columns of `resource`, raising TableSchemaError when one is missing"""
+        if data_frame.columns.empty:
+            return data_frame
+        source_columns = {}
+        for column in data_frame.columns:
+            canonical_name = self.get_canonical_name(column)
+            if canonical_name is not None and canonical_name not in source_columns:
+                source_columns[canonical_name] = column
+
+        schema = self._SCHEMAS[resource]
+        missing_columns = [name for name in schema if name not in source_columns and name not in self._OPTIONAL_COLUMNS]
+        if missing_columns:
+            raise TableSchemaError(
+                f'Table of {resource} has no {missing_columns} column, got {list(data_frame.columns)}')
+        dropped_columns = [column for column in data_frame.columns
+                           if column not in [source_columns.get(name) for name in schema]]
+        if dropped_columns:
+            logger.warning(f'Dropping columns {dropped_columns} not declared in the {resource} schema')
+
+        try:
+            return pd.DataFrame({name: self._cast(self._get_column(data_frame, source_columns.get(name)), dtype)
+                                 for name, dtype in schema.items()})
+        except (TypeError, ValueError) as e:
+            raise TableSchemaError(f'Table of {resource} does not match its schema {schema}: {e}') from e
+
+    @staticmethod
+    def _get_column(data_frame: pd.DataFrame, column: str | None) -> pd.Series:
+        """Returns the source column, or a NULL one for an optional column missing from the page"""
+        if column is None:
+            return pd.Series([None] * len(data_frame), index=data_frame.index, dtype=object)
+        return data_frame[column]
+
+    @staticmethod
+    def _cast(column: pd.Series, dtype) -> pd.Series:
+        """Casts the column, refusing to truncate decimals into an integer column"""
+        if dtype == 'Int64' and pd.api.types.is_float_dtype(column.dtype) and (column.dropna() % 1 != 0).any():
+            raise ValueError(f'Column {column.name} holds decimals')
+        return column.astype(dtype)
+
+    @classmethod
+    def get_canonical_name(cls, column: str) -> str | None:
+        """Returns the canonical name of a scraped or canonical column, or None when it is not known"""
+        if column in cls._COLUMN_PREFIXES:
+            return column
+        for name, prefixes in cls._COLUMN_PREFIXES.items():
+            if column.startswith(prefixes):
+                return name
+        return None
@@ -1,10 +1,13 @@
-from io import StringIO
+import threading
+from http import HTTPStatus
 
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from loguru import logger
 
+from src.service.http_client import HttpClientService
+from src.service.schema_normalizer import SchemaNormalizer
+from src.service.table_parser import VitibrasilTableParser
+
 
 class EMBRAPAScrapperService(object):
     _URL = 'http://vitibrasil.cnpuv.embrapa.br/index.php?opcao={}{}{}'
@@ -44,17 +47,40 @@ class EMBRAPAScrapperService(object):
         }
     }
 
-    def scrape_and_parse_tables(self, year: str, resource: str, sub_resource: str = None) -> pd.DataFrame:
-        logger.info(f'Scraping data for resource: {resource}, sub_resource: {sub_resource}, year: {year}')
-        option_map = self._OPTIONS_MAP.get(resource)
+    def __init__(self, http_client: HttpClientService = None):
+        self._http_client = http_client or HttpClientService()
+        self._table_parser = VitibrasilTableParser()
+        self._schema_normalizer = SchemaNormalizer()
+        self._parsed_tables: dict[str, pd.DataFrame] = {}
+        self._parsed_tables_lock = threading.Lock()
+
+    @classmethod
+    def get_resource_matrix(cls) -> list[tuple[str, str | None]]:
+        """Returns every (resource, sub_resource) pair that can be scraped"""
+        return [(resource, sub_resource)
+                for resource, option_map in cls._OPTIONS_MAP.items()
+                for sub_resource in (option_map.get('sub_options') or [None])]
+
+    @classmethod
+    def get_url(cls, year: str, resource: str, sub_resource: str = None) -> str:
+        option_map = cls._OPTIONS_MAP.get(resource)
         option = option_map.get('option')
-        sub_resource = option_map.get('sub_options').get(sub_resource) if sub_resource else None
+        sub_option = option_map.get('sub_options').get(sub_resource) if sub_resource else None
+
+        year_param = cls._YEAR_PARAM.format(year) if year else ''
+        sub_options_param = cls._SUB_OPTIONS_PARAM.format(sub_option) if sub_option else ''
+        return cls._URL.format(option, year_param, sub_options_param)
 
-        year_param = self._YEAR_PARAM.format(year) if year else ''
-        sub_options_param = self._SUB_OPTIONS_PARAM.format(sub_resource) if sub_resource else ''
-        response = requests.get(self._URL.format(option, year_param, sub_options_param))
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', class_='tb_base tb_dados')
+    def scrape_and_parse_tables(self, year: str, resource: str, sub_resource: str = None) -> pd.DataFrame:
+        logger.info(f'Scraping data for resource: {resource}, sub_resource: {sub_resource}, year: {year}')
+        url = self.get_url(year=year, resource=resource, sub_resource=sub_resource)
+        with self._parsed_tables_lock:
+            cached_table = self._parsed_tables.get(url)
+        response = self._http_client.get(url, conditional=cached_table is not None)
+        if response.status_code == HTTPStatus.NOT_MODIFIED and cached_table is not None:
+            return cached_table.copy()
 
-        return pd.read_html(StringIO(str(table)))[0]
+        data = self._schema_normalizer.normalize(resource, self._table_parser.parse(response.content))
+        with self._parsed_tables_lock:
+            self._parsed_tables[url] = data
+        return data.copy()
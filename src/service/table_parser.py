@@ -0,0 +1,80 @@
+import re
+
+import lxml.html
+import pandas as pd
+
+
+class VitibrasilTableParser(object):
+    """
+    Single-pass lxml extractor for the `tb_base tb_dados` table of vitibrasil pages. Pages listing categories
+    (`tb_item` rows) followed by their products (`tb_subitem` rows) get `category` and `level` columns, so
+    category subtotals can be told apart from their products once the rows are stored.
+    """
+    _TABLE_XPATH = "//table[contains(concat(' ', normalize-space(@class), ' '), ' tb_dados ')]"
+    _LEVELS = {'tb_item': 1, 'tb_subitem': 2}
+    _NUMBER_PATTERN = re.compile(r'^-?\d{1,3}(\.\d{3})*(,\d+)?$|^-?\d+(,\d+)?$')
+    _MISSING_VALUES = ('', '-', '*', 'nd')
+
+    def parse(self, content: bytes | str) -> pd.DataFrame:
+        tables = lxml.html.fromstring(content).xpath(self._TABLE_XPATH)
+        if not tables:
+            raise ValueError('No data table found in page')
+        table = tables[0]
+
+        header_cells = table.xpath('./thead/tr[1]/th | ./thead/tr[1]/td')
+        body_rows = table.xpath('./tbody/tr | ./tr')
+        if not header_cells and body_rows:
+            header_cells = body_rows[0].xpath('./th | ./td')
+            body_rows = body_rows[1:]
+        headers = [self._get_text(cell) for cell in header_cells]
+
+        columns: list[list[str]] = [[] for _ in headers]
+        levels: list[int | None] = []
+        for row in body_rows + table.xpath('./tfoot/tr'):
+            cells = row.xpath('./th | ./td')
+            for index, column in enumerate(columns):
+                column.append(self._get_text(cells[index]) if index < len(cells) else '')
+            levels.append(self._get_level(cells))
+
+        data = pd.DataFrame({header: self._to_typed_column(values) for header, values in zip(headers, columns)})
+        if headers and any(level is not None for level in levels):
+            data['category'] = self._get_categories(columns[0], levels)
+            data['level'] = pd.Series(levels, dtype='Int64')
+        return data
+
+    @staticmethod
+    def parse_number(value: str) -> int | float | None:
+        """Converts a Brazilian formatted number such as "1.234.567" or "1.234,5" into a number"""
+        value = value.strip()
+        if value.lower() in VitibrasilTableParser._MISSING_VALUES:
+            return None
+        normalized = value.replace('.', '').replace(',', '.')
+        return float(normalized) if ',' in value else int(normalized)
+
+    def _to_typed_column(self, values: list[str]) -> pd.Series:
+        present = [value for value in values if value.lower() not in self._MISSING_VALUES]
+        if values and not present:
+            return pd.Series([None] * len(values), dtype='Int64')
+        if not all(self._NUMBER_PATTERN.match(value) for value in present):
+            return pd.Series(values, dtype=object)
+        numbers = [self.parse_number(value) for value in values]
+        dtype = 'Float64' if any(',' in value for value in present) else 'Int64'
+        return pd.Series(numbers, dtype=dtype)
+
+    def _get_level(self, cells: list) -> int | None:
+        classes = cells[0].get('class', '').split() if cells else []
+        return next((self._LEVELS[name] for name in classes if name in self._LEVELS), None)
+
+    @staticmethod
+    def _get_categories(labels: list[str], levels: list[int | None]) -> pd.Series:
+        """Returns the category of each row: its own label on category rows and the last category on product rows"""
+        categories, category = [], None
+        for label, level in zip(labels, levels):
+            if level == 1:
+                category = label
+            categories.append(category if level is not None else None)
+        return pd.Series(categories, dtype=object)
+
+    @staticmethod
+    def _get_text(cell) -> str:
+        return ' '.join(cell.text_content().split())
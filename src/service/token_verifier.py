@@ -0,0 +1,103 @@
+import hashlib
+import math
+import threading
+import time
+
+from flask import Response, jsonify, request
+from flask_jwt_extended import JWTManager
+
+from src.config.auth import AuthConfig
+from src.service.cache import LRUTTLCache
+
+
+class TokenVerifierService(object):
+    """
+    Keeps the claims of verified tokens until they expire, so a token reused across many requests has its
+    signature checked once, and rate limits requests per token with a token bucket. Tokens are keyed by their
+    sha256, never stored as is. The limit runs before verification, so buckets of tokens not verified yet are
+    kept apart and a flood of junk tokens cannot evict the buckets of verified ones.
+    """
+    _BUCKET_TTL = 3600
+
+    def __init__(self, max_entries: int = AuthConfig.TOKEN_CACHE_MAX_ENTRIES,
+                 rate_limit: float = AuthConfig.TOKEN_RATE_LIMIT, burst: int = AuthConfig.TOKEN_RATE_BURST):
+        self._claims = LRUTTLCache(max_entries, 0)
+        self._buckets = LRUTTLCache(max_entries, self._BUCKET_TTL)
+        self._unverified_buckets = LRUTTLCache(max_entries, self._BUCKET_TTL)
+        self._buckets_lock = threading.Lock()
+        self._rate_limit = rate_limit
+        self._burst = max(burst, 1)
+
+    def get_claims(self, encoded_token: str) -> dict | None:
+        claims = self._claims.get(self._get_key(encoded_token))
+        return None if claims is None else dict(claims)
+
+    def put_claims(self, encoded_token: str, claims: dict) -> None:
+        """
+        Caches verified claims until their `exp`, moving the token's bucket to the verified ones; tokens that
+        never expire are not cached
+        """
+        expires_at = claims.get('exp')
+        if expires_at is None or expires_at <= time.time():
+            return
+        key = self._get_key(encoded_token)
+        self._claims.put(key, dict(claims), expires_at - time.time())
+        with self._buckets_lock:
+            bucket = self._unverified_buckets.get(key)
+            if bucket is not None:
+                self._buckets.put(key, bucket)
+
+    def acquire(self, encoded_token: str) -> float | None:
+        """Takes a request from the token's bucket, returning the seconds to wait when it is empty"""
+        if self._rate_limit <= 0:
+            return None
+        key = self._get_key(encoded_token)
+        buckets = self._buckets if self._claims.get(key) is not None else self._unverified_buckets
+        now = time.monotonic()
+        with self._buckets_lock:
+            bucket = buckets.get(key)
+            tokens, updated_at = bucket if bucket is not None else (self._burst, now)
+            tokens = min(self._burst, tokens + (now - updated_at) * self._rate_limit)
+            if tokens < 1:
+                buckets.put(key, (tokens, now))
+                return (1 - tokens) / self._rate_limit
+            buckets.put(key, (tokens - 1, now))
+        return None
+
+    def limit_request(self) -> Response | None:
+        """`before_request` hook answering 429 once the bearer token of the request runs out of requests"""
+        authorization = request.headers.get('Authorization', '')
+        if not authorization.startswith('Bearer '):
+            return None
+        retry_after = self.acquire(authorization[len('Bearer '):])
+        if retry_after is None:
+            return None
+        response = jsonify({'error': 'Too many requests for this token'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(math.ceil(retry_after))
+        return response
+
+    @staticmethod
+    def _get_key(encoded_token: str) -> str:
+        return hashlib.sha256(encoded_token.encode()).hexdigest()
+
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager that skips signature verification of tokens already verified by `token_verifier`. It overrides
+    the private `_decode_jwt_from_config` of flask-jwt-extended, which has no public decoding hook, so the
+    package is pinned in requirements.txt and the override must be checked on upgrades.
+    """
+
+    def __init__(self, app, token_verifier: TokenVerifierService):
+        self._token_verifier = token_verifier
+        super().__init__(app)
+
+    def _decode_jwt_from_config(self, encoded_token: str, csrf_value=None, allow_expired: bool = False) -> dict:
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        claims = self._token_verifier.get_claims(encoded_token)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            self._token_verifier.put_claims(encoded_token, claims)
+        return claims
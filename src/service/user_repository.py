@@ -0,0 +1,50 @@
+from loguru import logger
+
+from src.config.auth import AuthConfig
+from src.service.cache import LRUTTLCache
+from src.service.duck_db import DuckDBService
+
+
+class UserRepository(object):
+    """
+    Single-user lookups by username, cached in memory. Unknown usernames are cached too, for a shorter time,
+    so repeated logins with a wrong username do not reach duckdb either.
+    """
+    _MISSING = False
+
+    def __init__(self, duckdb_service: DuckDBService, max_entries: int = AuthConfig.USER_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = AuthConfig.USER_CACHE_TTL,
+                 negative_ttl_seconds: float = AuthConfig.USER_NEGATIVE_CACHE_TTL):
+        self._duckdb = duckdb_service
+        self._cache = LRUTTLCache(max_entries, ttl_seconds)
+        self._negative_ttl_seconds = negative_ttl_seconds
+
+    def get_user(self, username: str) -> dict | None:
+        """Returns the id, username and password hash of the user, or None when it does not exist"""
+        user = self._cache.get(username)
+        if user is not None:
+            return user or None
+        try:
+            user = self._duckdb.fetch_user(username)
+        except Exception as e:
+            logger.error(f'Error fetching user {username}: {e}')
+            return None
+        if user is None:
+            self._cache.put(username, self._MISSING, self._negative_ttl_seconds)
+        else:
+            self._cache.put(username, user)
+        return user
+
+    def exists(self, username: str) -> bool:
+        return self.get_user(username) is not None
+
+    def insert(self, username: str, hashed_password: str) -> bool:
+        """Inserts the user, returning False when it could not be stored"""
+        inserted = self._duckdb.insert_user(username, hashed_password)
+        self._cache.invalidate(username)
+        return inserted
+
+    def update_password(self, username: str, hashed_password: str) -> bool:
+        updated = self._duckdb.update_user_password(username, hashed_password)
+        self._cache.invalidate(username)
+        return updated
@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from loguru import logger
+
+from src.config.warmer import WarmerConfig
+from src.model.year_request import MIN_YEAR, MAX_YEAR
+from src.service.extractor import EMBRAPAExtractorService
+from src.service.rate_limiter import RateLimiter
+from src.service.scrapper import EMBRAPAScrapperService
+
+
+class CacheWarmerService(object):
+    """Walks the whole resource/sub_resource/year matrix so user requests never trigger a cold scrape"""
+
+    def __init__(self, extractor: EMBRAPAExtractorService, interval: int = WarmerConfig.WARMER_INTERVAL,
+                 workers: int = WarmerConfig.WARMER_WORKERS, rate_limit: float = WarmerConfig.WARMER_RATE_LIMIT):
+        self._extractor = extractor
+        self._interval = interval
+        self._workers = workers
+        self._rate_limiter = RateLimiter(rate_limit)
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._run_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._progress = self._new_progress(0)
+        self._last_run: dict | None = None
+
+    @staticmethod
+    def get_jobs() -> list[tuple[str, str | None, int | None]]:
+        """Returns every (resource, sub_resource, year) combination, starting with the current year pages"""
+        years = [None] + list(range(MAX_YEAR, MIN_YEAR - 1, -1))
+        return [(resource, sub_resource, year)
+                for year in years
+                for resource, sub_resource in EMBRAPAScrapperService.get_resource_matrix()]
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_forever, name='cache-warmer', daemon=True)
+        self._thread.start()
+        logger.info(f'Cache warmer started with interval of {self._interval} seconds')
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run_once(self) -> dict:
+        if not self._run_lock.acquire(blocking=False):
+            logger.info('Cache warmer run skipped, another run is in progress')
+            return self.get_status()
+        try:
+            jobs = self.get_jobs()
+            with self._stats_lock:
+                self._progress = self._new_progress(len(jobs))
+            logger.info(f'Cache warmer run started for {len(jobs)} tables')
+            with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='cache-warmer') as executor:
+                for job in jobs:
+                    executor.submit(self._warm, *job)
+            with self._stats_lock:
+                self._progress['state'] = 'idle'
+                self._progress['finished_at'] = pd.Timestamp.now().isoformat()
+                self._last_run = dict(self._progress)
+            logger.info(f'Cache warmer run finished: {self._last_run}')
+            return self.get_status()
+        finally:
+            self._run_lock.release()
+
+    def get_status(self) -> dict:
+        with self._stats_lock:
+            return {'progress': dict(self._progress), 'last_run': dict(self._last_run) if self._last_run else None}
+
+    def _run_forever(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f'Error running cache warmer: {e}')
+            self._stop_event.wait(self._interval)
+
+    def _warm(self, resource: str, sub_resource: str | None, year: int | None) -> None:
+        if self._stop_event.is_set():
+            return
+        try:
+            if not self._extractor.needs_refresh(resource, sub_resource, year):
+                self._record('skipped')
+                return
+            self._rate_limiter.acquire()
+            scraped = self._extractor.warm_table(resource, sub_resource, year)
+            self._record('warmed' if scraped else 'skipped')
+        except Exception as e:
+            logger.error(f'Error warming resource: {resource}, sub_resource: {sub_resource}, year: {year}: {e}')
+            self._record('failed')
+
+    def _record(self, outcome: str) -> None:
+        with self._stats_lock:
+            self._progress[outcome] += 1
+            self._progress['completed'] += 1
+
+    @staticmethod
+    def _new_progress(total: int) -> dict:
+        return {
+            'state': 'running' if total else 'idle',
+            'total': total,
+            'completed': 0,
+            'warmed': 0,
+            'skipped': 0,
+            'failed': 0,
+            'started_at': pd.Timestamp.now().isoformat() if total else None,
+            'finished_at': None
+        }
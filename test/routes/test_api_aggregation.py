@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+from flask import Flask, Response
+import pytest
+from flask_jwt_extended import create_access_token, JWTManager
+
+from src.routes.api_aggregation import ApiAggregationRoutes
+from src.service.extractor import EMBRAPAExtractorService
+
+
+class TestApiAggregationRoutes(object):
+    @pytest.fixture
+    def app(self):
+        """Fixture to create a Flask app instance for testing"""
+        app = Flask(__name__)
+        app.config['JWT_SECRET_KEY'] = 'test-secret'
+
+        JWTManager(app)
+
+        extractor = MagicMock(spec=EMBRAPAExtractorService)
+        api_routes = ApiAggregationRoutes(extractor)
+        app.register_blueprint(api_routes.api_bp, url_prefix=api_routes.get_url_prefix())
+        return app, extractor
+
+    @pytest.mark.parametrize('kind', ['top', 'share', 'growth'])
+    def test_get_aggregation(self, app, kind):
+        """
+        Test the aggregation methods
+        """
+        app_instance, extractor = app
+        extractor.extract_aggregation.return_value = Response('[]', mimetype='application/json')
+
+        with app_instance.app_context():
+            client = app_instance.test_client()
+            access_token = create_access_token(identity='test_user')
+            client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {access_token}'
+
+            response = client.get(f'/api/aggregations/{kind}?resource=export&sub_resource=table_wines&year=2023')
+            assert response.status_code == 200
+            assert response.get_json() == []
+            extractor.extract_aggregation.assert_called_once_with(
+                kind, {'resource': 'export', 'sub_resource': 'table_wines', 'year': '2023'})
+
+    def test_get_aggregation_unauthorized(self, app):
+        """
+        Test if the aggregation endpoints require a JWT
+        """
+        app_instance, _ = app
+
+        response = app_instance.test_client().get('/api/aggregations/top?resource=production')
+        assert response.status_code == 401
+
+    def test_get_url_prefix(self):
+        """
+        Test if the get_url_prefix method returns the correct URL prefix
+        """
+        api_routes = ApiAggregationRoutes(MagicMock(spec=EMBRAPAExtractorService))
+
+        assert api_routes.get_url_prefix() == '/api/aggregations'
+
+    def test_get_blueprint_name(self):
+        """
+        Test if the get_blueprint_name method returns the correct blueprint name
+        """
+        api_routes = ApiAggregationRoutes(MagicMock(spec=EMBRAPAExtractorService))
+
+        assert api_routes.get_blueprint_name() == 'api_aggregation'
@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock
+from flask import Flask, Response
+import pytest
+from flask_jwt_extended import create_access_token, JWTManager
+
+from src.routes.api_batch import ApiBatchRoutes
+from src.service.extractor import EMBRAPAExtractorService
+
+
+class TestApiBatchRoutes(object):
+    @pytest.fixture
+    def app(self):
+        """Fixture to create a Flask app instance for testing"""
+        app = Flask(__name__)
+        app.config['JWT_SECRET_KEY'] = 'test-secret'
+
+        JWTManager(app)
+
+        extractor = MagicMock(spec=EMBRAPAExtractorService)
+        api_routes = ApiBatchRoutes(extractor)
+        app.register_blueprint(api_routes.api_bp, url_prefix=api_routes.get_url_prefix())
+        return app, extractor
+
+    def test_post_batch(self, app):
+        """
+        Test the post_batch method
+        """
+        app_instance, extractor = app
+        extractor.extract_batch.return_value = Response('{"results": []}', mimetype='application/json')
+        requests = [{'resource': 'production', 'year': 2020}, {'resource': 'processing', 'sub_resource': 'vines'}]
+
+        with app_instance.app_context():
+            client = app_instance.test_client()
+            access_token = create_access_token(identity='test_user')
+            client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {access_token}'
+
+            response = client.post('/api/batch', json={'requests': requests})
+            assert response.status_code == 200
+            assert response.get_json() == {'results': []}
+            extractor.extract_batch.assert_called_once_with(requests)
+
+    @pytest.mark.parametrize('body', [[{'resource': 'production'}], 'production'])
+    def test_post_batch_not_an_object(self, app, body):
+        """
+        Test if a body that is not a JSON object is rejected with 400
+        """
+        app_instance, extractor = app
+
+        with app_instance.app_context():
+            client = app_instance.test_client()
+            client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity="test_user")}'
+
+            response = client.post('/api/batch', json=body)
+            assert response.status_code == 400
+            extractor.extract_batch.assert_not_called()
+
+    def test_post_batch_unauthorized(self, app):
+        """
+        Test if the batch endpoint requires a JWT
+        """
+        app_instance, _ = app
+
+        response = app_instance.test_client().post('/api/batch', json={'requests': []})
+        assert response.status_code == 401
+
+    def test_get_url_prefix(self):
+        """
+        Test if the get_url_prefix method returns the correct URL prefix
+        """
+        api_routes = ApiBatchRoutes(MagicMock(spec=EMBRAPAExtractorService))
+
+        assert api_routes.get_url_prefix() == '/api'
+
+    def test_get_blueprint_name(self):
+        """
+        Test if the get_blueprint_name method returns the correct blueprint name
+        """
+        api_routes = ApiBatchRoutes(MagicMock(spec=EMBRAPAExtractorService))
+
+        assert api_routes.get_blueprint_name() == 'api_batch'
@@ -46,7 +46,7 @@ class TestApiDefaultRoutes(object):
             response = client.get('/api/production')
             assert response.status_code == 200
             assert response.get_json() == mock_data
-            extractor_service.extract_data.assert_called_once_with(resource='production', year=None)
+            extractor_service.extract_data.assert_called_once_with(resource='production', year=None, query={})
 
     def test_get_commercialization(self, app):
         """
@@ -64,7 +64,7 @@ class TestApiDefaultRoutes(object):
             response = client.get('/api/commercialization')
             assert response.status_code == 200
             assert response.get_json() == mock_data
-            extractor_service.extract_data.assert_called_once_with(resource='commercialization', year=None)
+            extractor_service.extract_data.assert_called_once_with(resource='commercialization', year=None, query={})
 
     def test_get_url_prefix(self):
         """
@@ -83,3 +83,20 @@ class TestApiDefaultRoutes(object):
         api_routes = ApiDefaultRoutes(extractor_service)
 
         assert api_routes.get_blueprint_name() == 'api_default'
+
+    def test_get_production_year_range(self, app):
+        """
+        Test if year range query parameters are forwarded to the extractor
+        """
+        app_instance, extractor_service = app
+        extractor_service.extract_data.return_value = []
+
+        with app_instance.app_context():
+            client = app_instance.test_client()
+            access_token = create_access_token(identity='test_user')
+            client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {access_token}'
+
+            response = client.get('/api/production?start_year=2015&end_year=2020')
+            assert response.status_code == 200
+            extractor_service.extract_data.assert_called_once_with(
+                resource='production', year=None, query={'start_year': '2015', 'end_year': '2020'})
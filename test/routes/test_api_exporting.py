@@ -47,7 +47,7 @@ class TestApiExportingRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='export', sub_resource='table_wines',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_sparkling(self, app):
         """
@@ -66,7 +66,7 @@ class TestApiExportingRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='export', sub_resource='sparkling',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_fresh_grapes(self, app):
         """
@@ -85,7 +85,7 @@ class TestApiExportingRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='export', sub_resource='fresh_grapes',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_grape_juice(self, app):
         """
@@ -104,7 +104,7 @@ class TestApiExportingRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='export', sub_resource='grape_juice',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_url_prefix(self):
         """
@@ -123,3 +123,22 @@ class TestApiExportingRoutes(object):
         api_routes = ApiExportingRoutes(extractor_service)
 
         assert api_routes.get_blueprint_name() == 'api_exporting'
+
+    def test_get_table_wines_negotiates_format(self, app):
+        """
+        Test if the Accept header selects the response format unless a format parameter is given
+        """
+        app_instance, extractor_service = app
+        extractor_service.extract_data.return_value = {}
+
+        with app_instance.app_context():
+            client = app_instance.test_client()
+            access_token = create_access_token(identity='test_user')
+            client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {access_token}'
+
+            client.get('/api/exporting/table_wines', headers={'Accept': 'application/vnd.apache.arrow.stream'})
+            client.get('/api/exporting/table_wines?format=csv', headers={'Accept': 'application/vnd.apache.parquet'})
+            client.get('/api/exporting/table_wines', headers={'Accept': '*/*'})
+
+            assert [call.kwargs['query'] for call in extractor_service.extract_data.call_args_list] == [
+                {'format': 'arrow'}, {'format': 'csv'}, {}]
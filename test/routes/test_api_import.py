@@ -47,7 +47,7 @@ class TestApiImportRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='import', sub_resource='table_wines',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_sparkling(self, app):
         """
@@ -66,7 +66,7 @@ class TestApiImportRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='import', sub_resource='sparkling',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_fresh_grapes(self, app):
         """
@@ -85,7 +85,7 @@ class TestApiImportRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='import', sub_resource='fresh_grapes',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_raisins(self, app):
         """
@@ -104,7 +104,7 @@ class TestApiImportRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='import', sub_resource='raisins',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_grape_juice(self, app):
         """
@@ -123,7 +123,7 @@ class TestApiImportRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='import', sub_resource='grape_juice',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_url_prefix(self):
         """
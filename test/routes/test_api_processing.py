@@ -47,7 +47,7 @@ class TestApiProcessingRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='processing', sub_resource='vines',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_hybrid_americans(self, app):
         """
@@ -67,7 +67,7 @@ class TestApiProcessingRoutes(object):
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='processing',
                                                                    sub_resource='hybrid_americans',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_table_grapes(self, app):
         """
@@ -86,7 +86,7 @@ class TestApiProcessingRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='processing', sub_resource='table_grapes',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_unclassified(self, app):
         """
@@ -105,7 +105,7 @@ class TestApiProcessingRoutes(object):
             assert response.status_code == 200
             assert response.get_json() == mock_data
             extractor_service.extract_data.assert_called_once_with(resource='processing', sub_resource='unclassified',
-                                                                   year=None)
+                                                                   year=None, query={})
 
     def test_get_url_prefix(self):
         """
@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock
+from flask import Flask
+import pytest
+from flask_jwt_extended import create_access_token, JWTManager
+
+from src.routes.api_warmer import ApiWarmerRoutes
+from src.service.warmer import CacheWarmerService
+
+
+class TestApiWarmerRoutes(object):
+    @pytest.fixture
+    def app(self):
+        """Fixture to create a Flask app instance for testing"""
+        app = Flask(__name__)
+        app.config['JWT_SECRET_KEY'] = 'test-secret'
+
+        JWTManager(app)
+
+        warmer = MagicMock(spec=CacheWarmerService)
+        api_routes = ApiWarmerRoutes(warmer)
+        app.register_blueprint(api_routes.api_bp, url_prefix=api_routes.get_url_prefix())
+        return app, warmer
+
+    def test_get_status(self, app):
+        """
+        Test the get_status method
+        """
+        app_instance, warmer = app
+        mock_status = {'progress': {'state': 'idle'}, 'last_run': None}
+        warmer.get_status.return_value = mock_status
+
+        with app_instance.app_context():
+            client = app_instance.test_client()
+            access_token = create_access_token(identity='test_user')
+            client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {access_token}'
+
+            response = client.get('/api/warmer/status')
+            assert response.status_code == 200
+            assert response.get_json() == mock_status
+            warmer.get_status.assert_called_once()
+
+    def test_get_status_unauthorized(self, app):
+        """
+        Test if the status endpoint requires a JWT
+        """
+        app_instance, _ = app
+
+        response = app_instance.test_client().get('/api/warmer/status')
+        assert response.status_code == 401
+
+    def test_get_url_prefix(self):
+        """
+        Test if the get_url_prefix method returns the correct URL prefix
+        """
+        api_routes = ApiWarmerRoutes(MagicMock(spec=CacheWarmerService))
+
+        assert api_routes.get_url_prefix() == '/api/warmer'
+
+    def test_get_blueprint_name(self):
+        """
+        Test if the get_blueprint_name method returns the correct blueprint name
+        """
+        api_routes = ApiWarmerRoutes(MagicMock(spec=CacheWarmerService))
+
+        assert api_routes.get_blueprint_name() == 'api_warmer'
@@ -78,6 +78,22 @@ class TestAuthRoutes(object):
             assert response.get_json() == mock_response
             auth_service.authenticate_user.assert_called_once_with('wrong_user', 'wrong_pass')
 
+    def test_metrics(self, app):
+        """
+        Test the metrics method
+        """
+        app_instance, auth_service = app
+        metrics = {'workers': 1, 'queue_size': 1, 'in_flight': 0, 'queued': 0, 'completed': 2, 'rejected': 0}
+        auth_service.get_hasher_metrics.return_value = metrics
+
+        with app_instance.app_context():
+            client = app_instance.test_client()
+            headers = {'Authorization': f'Bearer {create_access_token(identity="test_user")}'}
+            response = client.get('/api/auth/metrics', headers=headers)
+
+            assert response.status_code == 200
+            assert response.get_json() == metrics
+
     def test_get_url_prefix(self):
         """
         Test if the get_url_prefix method returns the correct URL prefix
@@ -0,0 +1,94 @@
+import pytest
+
+from src.model.aggregation_request import AggregationRequest
+from src.service.aggregation_builder import AggregationBuilder
+from src.service.query_builder import InvalidQueryError
+
+
+class TestAggregationBuilder(object):
+    _EXPORT_COLUMNS = ['year', 'country', 'quantity', 'value']
+
+    @pytest.fixture
+    def aggregation_builder(self):
+        return AggregationBuilder()
+
+    def test_build_top(self, aggregation_builder):
+        """
+        Checks if the labels are ranked by the metric, leaving the Total row out
+        """
+        aggregation = AggregationRequest(resource='export', sub_resource='table_wines', limit=5)
+
+        sql, params = aggregation_builder.build('top', 'export_table_wines_years', self._EXPORT_COLUMNS,
+                                                aggregation, ['year = ?'], [2023])
+
+        assert sql == ('SELECT "country" AS country, "value" AS value, '
+                       'RANK() OVER (ORDER BY "value" DESC) AS rank FROM export_table_wines_years '
+                       'WHERE year = ? AND "country" IS DISTINCT FROM ? AND "value" IS NOT NULL '
+                       'ORDER BY rank, country LIMIT ?')
+        assert params == [2023, 'Total', 5]
+
+    def test_build_share_filters_after_total(self, aggregation_builder):
+        """
+        Checks if the country filter is applied after the window computing the total
+        """
+        aggregation = AggregationRequest(resource='export', sub_resource='table_wines', metric='quantity',
+                                         country='Para%')
+
+        sql, params = aggregation_builder.build('share', 'export_table_wines', self._EXPORT_COLUMNS, aggregation)
+
+        assert '"quantity" / NULLIF(SUM("quantity") OVER (), 0) AS share' in sql
+        assert 'QUALIFY "country" ILIKE ?' in sql
+        assert params == ['Total', 'Para%', 10]
+
+    def test_build_growth(self, aggregation_builder):
+        """
+        Checks if the metric is summed per year with its change from the prior year
+        """
+        aggregation = AggregationRequest(resource='production', start_year=2020, end_year=2023)
+
+        sql, params = aggregation_builder.build('growth', 'production_years', ['year', 'product', 'level', 'value'],
+                                                aggregation, ['year BETWEEN ? AND ?'], [2020, 2023])
+
+        assert sql == ('SELECT year, SUM("value") AS value, LAG(SUM("value")) OVER (ORDER BY year) '
+                       'AS previous_value, SUM("value") / NULLIF(LAG(SUM("value")) OVER (ORDER BY year), 0) '
+                       '- 1 AS growth FROM production_years WHERE year BETWEEN ? AND ? '
+                       'AND "product" IS DISTINCT FROM ? AND COALESCE("level", ?) = ? GROUP BY year ORDER BY year')
+        assert params == [2020, 2023, 'Total', 1, 1]
+
+    def test_build_summary(self, aggregation_builder):
+        """
+        Checks if product summaries are keyed on category, product and level, and skipped without a level column
+        """
+        sql = aggregation_builder.build_summary('production_years',
+                                                ['year', 'product', 'category', 'level', 'quantity'])
+
+        assert sql == ('SELECT year AS year, "category" AS category, "product" AS product, "level" AS level, '
+                       'SUM("quantity")::DOUBLE AS quantity, NULL::DOUBLE AS value FROM production_years '
+                       "WHERE \"product\" IS DISTINCT FROM 'Total' GROUP BY ALL")
+        assert aggregation_builder.build_summary('production_years', ['year', 'product', 'quantity']) is None
+
+    def test_build_growth_product_filter(self, aggregation_builder):
+        """
+        Checks if a product filter of growth matches the products instead of the category rows
+        """
+        aggregation = AggregationRequest(resource='production', metric='quantity', product='Tinto')
+
+        sql, params = aggregation_builder.build('growth', 'production_years',
+                                                ['year', 'product', 'category', 'level', 'quantity'], aggregation)
+
+        assert 'WHERE "product" IS DISTINCT FROM ? AND COALESCE("level", ?) = ? AND "product" ILIKE ?' in sql
+        assert params == ['Total', 2, 2, 'Tinto']
+
+    @pytest.mark.parametrize('kind, columns', [
+        ('median', ['country', 'value']),
+        ('top', ['country', 'quantity']),
+        ('top', ['crop', 'value']),
+        ('growth', ['year', 'product', 'value'])
+    ])
+    def test_build_invalid(self, aggregation_builder, kind, columns):
+        """
+        Checks if unknown aggregations, metrics or label columns are rejected
+        """
+        with pytest.raises(InvalidQueryError):
+            aggregation_builder.build(kind, 'export_table_wines', columns,
+                                      AggregationRequest(resource='export', sub_resource='table_wines'))
@@ -2,43 +2,57 @@ import datetime
 
 import pytest
 from unittest.mock import patch, Mock
-import pandas as pd
 
 from src.service.auth import AuthService
+from src.service.password_hasher import PasswordHasherBusyError
 
 
 class TestAuthService(object):
     @pytest.fixture
     def auth_service(self):
         """Fixture to create an instance of AuthService with mocked dependencies"""
-        duckdb_mock = Mock()
-        return AuthService(duckdb_mock)
+        user_repository_mock = Mock()
+        password_hasher_mock = Mock()
+        password_hasher_mock.needs_rehash.return_value = False
+        return AuthService(user_repository_mock, password_hasher_mock)
 
     def test_register_user_success(self, auth_service):
         """
         Checks if a user is successfully registered when valid data is provided
         """
-        auth_service._duckdb.user_exists.return_value = False
+        auth_service._users.exists.return_value = False
 
         result, status_code = auth_service.register_user('new_user', 'password123')
 
         assert status_code == 201
         assert result == {'message': 'User registered successfully'}
-        auth_service._duckdb.user_exists.assert_called_once_with('new_user')
-        auth_service._duckdb.insert_user.assert_called_once()
+        auth_service._users.exists.assert_called_once_with('new_user')
+        auth_service._users.insert.assert_called_once_with('new_user', auth_service._hasher.hash.return_value)
+
+    def test_register_user_insert_failure(self, auth_service):
+        """
+        Checks if an error is returned when the user could not be stored
+        """
+        auth_service._users.exists.return_value = False
+        auth_service._users.insert.return_value = False
+
+        result, status_code = auth_service.register_user('new_user', 'password123')
+
+        assert status_code == 500
+        assert result == {'error': 'User could not be registered'}
 
     def test_register_user_existing_user(self, auth_service):
         """
         Checks if an error is returned when the user already exists
         """
-        auth_service._duckdb.user_exists.return_value = True
+        auth_service._users.exists.return_value = True
 
         result, status_code = auth_service.register_user('existing_user', 'password123')
 
         assert status_code == 400
         assert result == {'error': 'User already exists'}
-        auth_service._duckdb.user_exists.assert_called_once_with('existing_user')
-        auth_service._duckdb.insert_user.assert_not_called()
+        auth_service._users.exists.assert_called_once_with('existing_user')
+        auth_service._users.insert.assert_not_called()
 
     def test_register_user_missing_data(self, auth_service):
         """
@@ -48,18 +62,16 @@ class TestAuthService(object):
 
         assert status_code == 400
         assert result == {'error': 'Username and password are required'}
-        auth_service._duckdb.user_exists.assert_not_called()
-        auth_service._duckdb.insert_user.assert_not_called()
+        auth_service._users.exists.assert_not_called()
+        auth_service._users.insert.assert_not_called()
 
     @patch('src.service.auth.create_access_token')
-    @patch('src.service.auth.check_password_hash', return_value=True)
-    def test_authenticate_user_success(self, mock_check_password, mock_create_token, auth_service):
+    def test_authenticate_user_success(self, mock_create_token, auth_service):
         """
         Checks if a valid user receives an access token
         """
-        data = {'username': ['valid_user'], 'password': ['hashed_password']}
-        users_df = pd.DataFrame(data)
-        auth_service._duckdb.fetch_data.return_value = users_df
+        auth_service._users.get_user.return_value = {'id': 1, 'username': 'valid_user', 'password': 'hashed_password'}
+        auth_service._hasher.check.return_value = True
 
         mock_create_token.return_value = 'mocked_token'
 
@@ -67,24 +79,62 @@ class TestAuthService(object):
 
         assert status_code == 200
         assert result == {'access_token': 'mocked_token'}
-        auth_service._duckdb.fetch_data.assert_called_once_with('users')
-        mock_check_password.assert_called_once_with('hashed_password', 'password123')
+        auth_service._users.get_user.assert_called_once_with('valid_user')
+        auth_service._hasher.check.assert_called_once_with('hashed_password', 'password123')
+        auth_service._users.update_password.assert_not_called()
         mock_create_token.assert_called_once_with(identity='valid_user', expires_delta=datetime.timedelta(hours=1))
 
     def test_authenticate_user_invalid_credentials(self, auth_service):
         """
         Checks if an error is returned when invalid credentials are provided
         """
-        data = {'username': ['valid_user'], 'password': ['hashed_password']}
-        users_df = pd.DataFrame(data)
-        auth_service._duckdb.fetch_data.return_value = users_df
+        auth_service._users.get_user.return_value = {'id': 1, 'username': 'valid_user', 'password': 'hashed_password'}
+        auth_service._hasher.check.return_value = False
+
+        result, status_code = auth_service.authenticate_user('valid_user', 'wrong_password')
+
+        assert status_code == 401
+        assert result == {'error': 'Invalid username or password'}
+        auth_service._users.get_user.assert_called_once_with('valid_user')
+
+    def test_authenticate_user_unknown_user(self, auth_service):
+        """
+        Checks if an error is returned when the user does not exist
+        """
+        auth_service._users.get_user.return_value = None
+
+        result, status_code = auth_service.authenticate_user('unknown_user', 'password123')
+
+        assert status_code == 401
+        assert result == {'error': 'Invalid username or password'}
+
+    @patch('src.service.auth.create_access_token', return_value='mocked_token')
+    def test_authenticate_user_rehash(self, mock_create_token, auth_service):
+        """
+        Checks if a hash made with an outdated method is replaced on login
+        """
+        auth_service._users.get_user.return_value = {'id': 1, 'username': 'valid_user', 'password': 'old_hash'}
+        auth_service._hasher.check.return_value = True
+        auth_service._hasher.needs_rehash.return_value = True
+        auth_service._hasher.hash.return_value = 'new_hash'
+
+        result, status_code = auth_service.authenticate_user('valid_user', 'password123')
+
+        assert status_code == 200
+        auth_service._hasher.hash.assert_called_once_with('password123')
+        auth_service._users.update_password.assert_called_once_with('valid_user', 'new_hash')
+
+    def test_authenticate_user_hasher_busy(self, auth_service):
+        """
+        Checks if logins are rejected with 503 while every hashing worker is busy
+        """
+        auth_service._users.get_user.return_value = {'id': 1, 'username': 'valid_user', 'password': 'hashed_password'}
+        auth_service._hasher.check.side_effect = PasswordHasherBusyError()
 
-        with patch('werkzeug.security.check_password_hash', return_value=False):
-            result, status_code = auth_service.authenticate_user('valid_user', 'wrong_password')
+        result, status_code = auth_service.authenticate_user('valid_user', 'password123')
 
-            assert status_code == 401
-            assert result == {'error': 'Invalid username or password'}
-            auth_service._duckdb.fetch_data.assert_called_once_with('users')
+        assert status_code == 503
+        assert result == {'error': 'Too many authentication requests, try again later'}
 
     def test_authenticate_user_missing_data(self, auth_service):
         """
@@ -94,4 +144,4 @@ class TestAuthService(object):
 
         assert status_code == 400
         assert result == {'error': 'Username and password are required'}
-        auth_service._duckdb.fetch_data.assert_not_called()
+        auth_service._users.get_user.assert_not_called()
@@ -0,0 +1,110 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src.service.backfill import AsyncScrapeEngine
+from src.service.duck_db import DuckDBService
+from src.service.scrapper import EMBRAPAScrapperService
+
+
+class TestAsyncScrapeEngine(object):
+    @pytest.fixture
+    def duck_db(self):
+        duck_db = MagicMock(spec=DuckDBService)
+        duck_db.get_tables.return_value = []
+        duck_db.create_dataframe_tables.side_effect = \
+            lambda tables: [f'{table_name}_{year}' if year else table_name for table_name, year, _ in tables]
+        return duck_db
+
+    @pytest.fixture
+    def scrapper(self):
+        scrapper = MagicMock(spec=EMBRAPAScrapperService)
+        scrapper.get_url.side_effect = EMBRAPAScrapperService.get_url
+        scrapper.scrape_and_parse_tables.side_effect = \
+            lambda year, resource, sub_resource: pd.DataFrame({'Produto': ['Tinto'], 'Quantidade (L.)': [int(year)]})
+        return scrapper
+
+    @pytest.fixture
+    def engine(self, duck_db, scrapper):
+        return AsyncScrapeEngine(duck_db, scrapper, concurrency=4, host_rate_limit=0, batch_size=2)
+
+    def test_backfill_scrapes_and_batches_writes(self, engine, duck_db, scrapper):
+        """
+        Checks if every job is scraped and tables are written in batches
+        """
+        jobs = [('production', None, year) for year in range(2019, 2024)]
+
+        results = engine.backfill(jobs)
+
+        assert sorted(result.table_name for result in results) == [f'production_{year}' for year in range(2019, 2024)]
+        assert all(result.error is None and result.rows == 1 for result in results)
+        assert scrapper.scrape_and_parse_tables.call_count == 5
+        batches = [call.args[0] for call in duck_db.create_dataframe_tables.call_args_list]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert all(table_name == 'production' and year in range(2019, 2024)
+                   for batch in batches for table_name, year, _ in batch)
+
+    def test_backfill_reports_scrape_errors(self, engine, scrapper, duck_db):
+        """
+        Checks if a failed scrape is reported without stopping the other jobs
+        """
+        def scrape(year, resource, sub_resource):
+            if year == '2020':
+                raise ValueError('No data table found in page')
+            return pd.DataFrame({'Produto': ['Tinto']})
+
+        scrapper.scrape_and_parse_tables.side_effect = scrape
+
+        results = {result.table_name: result for result in engine.backfill([('production', None, 2020),
+                                                                            ('production', None, 2021)])}
+
+        assert results['production_2020'].error == 'No data table found in page'
+        assert results['production_2021'].error is None
+        duck_db.create_dataframe_tables.assert_called_once()
+
+    def test_backfill_reports_write_errors(self, engine, duck_db):
+        """
+        Checks if a failed write is reported even when the table was stored by an earlier backfill
+        """
+        duck_db.get_tables.return_value = ['production_2020']
+        duck_db.create_dataframe_tables.side_effect = lambda tables: []
+
+        results = engine.backfill([('production', None, 2020)])
+
+        assert [result.error for result in results] == ['Error writing table to duckdb']
+
+    def test_backfill_runs_repeated_jobs_once(self, engine, duck_db, scrapper):
+        """
+        Checks if repeated jobs are scraped and written once, with one result each
+        """
+        results = engine.backfill([('production', None, 2020), ('production', None, 2020), ('production', None, 2021)])
+
+        assert sorted(result.table_name for result in results) == ['production_2020', 'production_2021']
+        assert scrapper.scrape_and_parse_tables.call_count == 2
+        assert [len(call.args[0]) for call in duck_db.create_dataframe_tables.call_args_list] == [2]
+
+    def test_run_streams_results(self, engine):
+        """
+        Checks if run yields results as an async stream
+        """
+        async def collect():
+            return [result async for result in engine.run([('export', 'table_wines', 2022)])]
+
+        results = asyncio.run(collect())
+
+        assert len(results) == 1
+        assert results[0].table_name == 'export_table_wines_2022'
+
+    def test_scrapes_are_rate_limited_per_host(self, duck_db, scrapper):
+        """
+        Checks if every job acquires the rate limiter of the upstream host
+        """
+        engine = AsyncScrapeEngine(duck_db, scrapper, concurrency=2, host_rate_limit=1000, batch_size=10)
+
+        with patch('src.service.backfill.AsyncRateLimiter.acquire') as mock_acquire:
+            engine.backfill([('production', None, 2020), ('commercialization', None, 2020)])
+
+        assert mock_acquire.call_count == 2
+        assert list(engine._host_limiters) == ['vitibrasil.cnpuv.embrapa.br']
@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.service.cache import LRUTTLCache
+
+
+class TestLRUTTLCache(object):
+    @pytest.fixture
+    def cache(self):
+        return LRUTTLCache(max_entries=2, ttl_seconds=60)
+
+    def test_get_missing_key(self, cache):
+        """
+        Checks if None is returned for keys that were never stored
+        """
+        assert cache.get(('production',)) is None
+
+    def test_put_and_get(self, cache):
+        """
+        Checks if stored values are returned while they are fresh
+        """
+        cache.put(('production',), b'[]')
+        assert cache.get(('production',)) == b'[]'
+
+    def test_entry_expires(self, cache):
+        """
+        Checks if entries are dropped once their time to live has elapsed
+        """
+        with patch('src.service.cache.time.monotonic', return_value=100.0):
+            cache.put(('production',), b'[]')
+        with patch('src.service.cache.time.monotonic', return_value=161.0):
+            assert cache.get(('production',)) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, cache):
+        """
+        Checks if the least recently used entry is evicted when the cache is full
+        """
+        cache.put(('a',), 1)
+        cache.put(('b',), 2)
+        cache.get(('a',))
+        cache.put(('c',), 3)
+
+        assert cache.get(('a',)) == 1
+        assert cache.get(('b',)) is None
+        assert cache.get(('c',)) == 3
+
+    def test_invalidate_table(self):
+        """
+        Checks if invalidation removes every entry belonging to a table
+        """
+        cache = LRUTTLCache(max_entries=10, ttl_seconds=60)
+        cache.put(('production', 'json'), 1)
+        cache.put(('production', 'csv'), 2)
+        cache.put(('commercialization', 'json'), 3)
+
+        cache.invalidate('production')
+
+        assert cache.get(('production', 'json')) is None
+        assert cache.get(('production', 'csv')) is None
+        assert cache.get(('commercialization', 'json')) == 3
+
+    def test_max_bytes_eviction(self):
+        """
+        Checks if least recently used entries are evicted once the sizes add up to more than max_bytes
+        """
+        cache = LRUTTLCache(max_entries=10, ttl_seconds=60, max_bytes=10, size_of=len)
+        cache.put(('a',), b'1234')
+        cache.put(('b',), b'1234')
+        cache.get(('a',))
+        cache.put(('c',), b'1234')
+
+        assert cache.get(('a',)) == b'1234'
+        assert cache.get(('b',)) is None
+        assert cache.get(('c',)) == b'1234'
+        assert cache.get_total_bytes() == 8
+
+        cache.put(('d',), b'12345678901')
+        assert cache.get(('d',)) is None
+        assert len(cache) == 0 and cache.get_total_bytes() == 0
+
+    def test_resize(self):
+        """
+        Checks if a value grown in place is measured again and evicts older entries
+        """
+        cache = LRUTTLCache(max_entries=10, ttl_seconds=60, max_bytes=10, size_of=lambda value: sum(map(len, value)))
+        cache.put(('a',), [b'1234'])
+        grown = [b'1234']
+        cache.put(('b',), grown)
+        grown.append(b'123')
+
+        cache.resize(('b',))
+
+        assert cache.get(('a',)) is None
+        assert cache.get(('b',)) == [b'1234', b'123']
+        assert cache.get_total_bytes() == 7
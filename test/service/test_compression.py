@@ -0,0 +1,54 @@
+import gzip
+
+import brotli
+import pytest
+import zstandard
+from werkzeug.http import parse_accept_header
+
+from src.service.compression import ResponseCompressor
+
+
+class TestResponseCompressor(object):
+    @pytest.fixture
+    def compressor(self):
+        """Fixture to create a compressor that compresses bodies of any size"""
+        return ResponseCompressor(min_size=0)
+
+    @pytest.mark.parametrize('accept_encoding, expected', [
+        ('gzip, deflate, br', 'br'),
+        ('gzip, br, zstd', 'zstd'),
+        ('gzip;q=1.0, br;q=0.5', 'gzip'),
+        ('deflate', 'identity'),
+        ('', 'identity')
+    ])
+    def test_negotiate(self, compressor, accept_encoding, expected):
+        """
+        Checks if the preferred accepted coding is chosen, falling back to identity
+        """
+        assert compressor.negotiate(parse_accept_header(accept_encoding), 100) == expected
+
+    def test_negotiate_skips_small_bodies(self):
+        """
+        Checks if bodies below the minimum size are not compressed
+        """
+        compressor = ResponseCompressor(min_size=1024)
+
+        assert compressor.negotiate(parse_accept_header('gzip'), 1023) == 'identity'
+        assert compressor.negotiate(parse_accept_header('gzip'), 1024) == 'gzip'
+
+    @pytest.mark.parametrize('encoding, decompress', [
+        ('gzip', gzip.decompress),
+        ('br', brotli.decompress),
+        ('zstd', lambda body: zstandard.ZstdDecompressor().decompress(body)),
+        ('identity', lambda body: body)
+    ])
+    def test_compress(self, compressor, encoding, decompress):
+        """
+        Checks if every coding round-trips the body
+        """
+        body = b'[' + b','.join(b'{"Produto":"Vinho de mesa","Quantidade (L.)":1}' for _ in range(100)) + b']'
+
+        compressed = compressor.compress(body, encoding)
+
+        assert decompress(compressed) == body
+        assert encoding == 'identity' or len(compressed) < len(body) / 10
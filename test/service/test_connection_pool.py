@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from src.service.connection_pool import DuckDBConnectionPool
+
+
+class TestDuckDBConnectionPool(object):
+    @pytest.fixture
+    def pool(self):
+        """Fixture to create a pool over an in-memory database"""
+        pool = DuckDBConnectionPool(':memory:')
+        yield pool
+        pool.close()
+
+    def test_cursor_per_thread(self, pool):
+        """
+        Checks if a thread reuses its cursor while other threads get their own
+        """
+        cursors = []
+        thread = threading.Thread(target=lambda: cursors.append(pool.cursor()))
+        thread.start()
+        thread.join()
+
+        assert pool.cursor() is pool.cursor()
+        assert cursors[0] is not pool.cursor()
+
+    def test_cursors_share_database(self, pool):
+        """
+        Checks if rows written through the writer connection are read by the cursors of other threads
+        """
+        with pool.write_lock:
+            pool.connection.execute('CREATE TABLE test_table AS SELECT 1 AS a')
+        counts = []
+        thread = threading.Thread(
+            target=lambda: counts.append(pool.cursor().execute('SELECT count(*) FROM test_table').fetchone()[0]))
+        thread.start()
+        thread.join()
+
+        assert counts == [1]
+
+    def test_close(self, pool):
+        """
+        Checks if closing the pool closes the cursors it handed out
+        """
+        cursor = pool.cursor()
+        pool.close()
+
+        with pytest.raises(Exception):
+            cursor.execute('SELECT 1')
@@ -1,24 +1,43 @@
+import io
+import json
+import os
+import duckdb
 import pytest
 import pandas as pd
+import pyarrow as pa
 from unittest.mock import patch, MagicMock
+from src.model.aggregation_request import AggregationRequest
+from src.model.query_request import QueryRequest
+from src.model.response_format import ResponseFormat
 from src.service.duck_db import DuckDBService
+from src.service.query_builder import InvalidQueryError
+from src.service.schema_normalizer import SchemaNormalizer
+from src.service.table_parser import VitibrasilTableParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
 
 
 class TestDuckdbService(object):
     @pytest.fixture
     def mock_connection(self):
         mock_con = MagicMock()
+        mock_con.cursor.return_value = mock_con
         return mock_con
 
     @pytest.fixture
     def duckdb_service(self, mock_connection):
-        with patch('src.service.duck_db.duckdb.connect', return_value=mock_connection):
+        with patch('src.service.connection_pool.duckdb.connect', return_value=mock_connection):
             with patch('os.environ', {'MOTHERDUCK_TOKEN': 'fake_token'}):
                 service = DuckDBService()
                 service._con = mock_connection
                 service._duckdb_tables = []
                 return service
 
+    @pytest.fixture
+    def memory_duckdb_service(self):
+        with patch('src.service.connection_pool.duckdb.connect', return_value=duckdb.connect(':memory:')):
+            yield DuckDBService()
+
     @pytest.fixture
     def sample_df(self):
         data = [{'col1': 1, 'col2': 'a'}, {'col1': 2, 'col2': 'b'}]
@@ -61,29 +80,40 @@ class TestDuckdbService(object):
         # Verify the sequence of calls
         calls = mock_connection.execute.call_args_list
         create_table_call = next(call for call in calls if 'CREATE OR REPLACE TABLE' in str(call))
-        update_datetime_call = next(call for call in calls if 'UPDATE db_datetime' in str(call))
+        table_metadata_call = next(call for call in calls if 'INSERT INTO table_metadata' in str(call))
 
         assert create_table_call is not None
-        assert update_datetime_call is not None
+        assert table_metadata_call[0][1][0] == 'test_table'
+        assert duckdb_service.get_table_refreshed_at('test_table') is not None
 
     def test_create_table_duplicate(self, duckdb_service, sample_df, mock_connection):
         """
-        Checks if table is not duplicated when created multiple times
+        Checks if refreshing a table with unchanged content only updates its refresh time
         """
-        # Reset mock to clear previous calls
+        duckdb_service.create_dataframe_table('test_table', sample_df)
         mock_connection.reset_mock()
 
-        # Set up initial state
-        duckdb_service._duckdb_tables = ['test_table']
-
-        # First call should not create table since it already exists
         duckdb_service.create_dataframe_table('test_table', sample_df)
 
-        # Verify table was not added again
         assert duckdb_service._duckdb_tables.count('test_table') == 1
+        assert duckdb_service.get_table_version('test_table') == 1
+        statements = [call.args[0] for call in mock_connection.execute.call_args_list]
+        assert not any('CREATE OR REPLACE TABLE' in statement for statement in statements)
+        assert any('INSERT INTO table_metadata' in statement for statement in statements)
+
+    def test_create_table_changed_content(self, duckdb_service, sample_df, mock_connection):
+        """
+        Checks if refreshing a table with changed content rewrites it and bumps its version
+        """
+        duckdb_service.create_dataframe_table('test_table', sample_df)
+        mock_connection.reset_mock()
 
-        # Verify no SQL calls were made since table already exists
-        mock_connection.execute.assert_not_called()
+        duckdb_service.create_dataframe_table('test_table', sample_df.assign(col1=[3, 4]))
+
+        assert duckdb_service._duckdb_tables.count('test_table') == 1
+        assert duckdb_service.get_table_version('test_table') == 2
+        statements = [call.args[0] for call in mock_connection.execute.call_args_list]
+        assert any('CREATE OR REPLACE TABLE' in statement for statement in statements)
 
     def test_get_tables_empty(self, duckdb_service):
         """
@@ -110,3 +140,531 @@ class TestDuckdbService(object):
 
         assert len(duckdb_service._duckdb_tables) == initial_tables
         assert 'test_table' not in duckdb_service._duckdb_tables
+
+    def test_create_table_notifies_listeners(self, duckdb_service, sample_df):
+        """
+        Checks if table listeners are notified when a table is written
+        """
+        listener = MagicMock()
+        duckdb_service.add_table_listener(listener)
+
+        duckdb_service.create_dataframe_table('test_table', sample_df)
+
+        listener.assert_called_once_with('test_table')
+
+    def test_get_table_refreshed_at_unknown_table(self, duckdb_service):
+        """
+        Checks if None is returned for tables without freshness metadata
+        """
+        assert duckdb_service.get_table_refreshed_at('unknown_table') is None
+
+    def test_load_table_metadata(self, duckdb_service, mock_connection):
+        """
+        Checks if per-table freshness is loaded into memory from the table_metadata table
+        """
+        refreshed_at = pd.Timestamp('2024-01-01 10:00:00')
+        modified_at = pd.Timestamp('2023-12-01 10:00:00')
+        duckdb_service._duckdb_tables = ['production_years']
+        mock_connection.execute.return_value.fetchall.return_value = [
+            ('production', refreshed_at.to_pydatetime(), None, None, 'abc', 3, modified_at.to_pydatetime()),
+            ('production_2020', refreshed_at.to_pydatetime(), 'production_years', 2020, None, None,
+             refreshed_at.to_pydatetime())
+        ]
+
+        duckdb_service._load_table_metadata()
+
+        assert duckdb_service.get_table_refreshed_at('production') == refreshed_at
+        assert duckdb_service.get_table_refreshed_at('production_2020') == refreshed_at
+        assert 'production_2020' in duckdb_service.get_tables()
+        assert duckdb_service.get_table_content_hash('production') == 'abc'
+        assert duckdb_service.get_table_content_hash('production_2020') is None
+        assert duckdb_service.get_table_version('production') == 3
+        assert duckdb_service.get_table_version('production_2020') == 0
+        assert duckdb_service.get_table_modified_at('production') == modified_at
+        assert duckdb_service.get_table_modified_at('production_2020') == refreshed_at
+        mock_connection.execute.assert_called_with(
+            'SELECT table_name, refreshed_at, storage_table, year, content_hash, version, '
+            'COALESCE(modified_at, refreshed_at) FROM table_metadata')
+
+    def test_create_dataframe_tables_in_transaction(self, duckdb_service, sample_df, mock_connection):
+        """
+        Checks if several tables are written in a single transaction and unchanged ones are not rewritten
+        """
+        duckdb_service.create_dataframe_table('existing_table', sample_df)
+        mock_connection.reset_mock()
+
+        written = duckdb_service.create_dataframe_tables([('existing_table', None, sample_df),
+                                                          ('table_a', None, sample_df),
+                                                          ('table_b', None, sample_df)])
+
+        assert written == ['existing_table', 'table_a', 'table_b']
+        statements = [call.args[0] for call in mock_connection.execute.call_args_list]
+        assert statements[0] == 'BEGIN TRANSACTION'
+        assert statements[-1] == 'COMMIT'
+        assert sum('CREATE OR REPLACE TABLE' in statement for statement in statements) == 2
+        assert duckdb_service.get_table_refreshed_at('table_a') is not None
+
+    def test_create_dataframe_tables_rollback(self, duckdb_service, sample_df, mock_connection):
+        """
+        Checks if the transaction is rolled back and nothing is registered when a write fails
+        """
+        mock_connection.reset_mock()
+
+        def execute(statement, *args):
+            if 'CREATE OR REPLACE TABLE table_b' in statement:
+                raise Exception('Write failed')
+
+        mock_connection.execute.side_effect = execute
+
+        written = duckdb_service.create_dataframe_tables([('table_a', None, sample_df), ('table_b', None, sample_df)])
+
+        assert written == []
+        assert duckdb_service.get_tables() == []
+        assert duckdb_service.get_table_refreshed_at('table_a') is None
+        assert mock_connection.execute.call_args_list[-1].args[0] == 'ROLLBACK'
+
+    def test_create_year_partitions(self, memory_duckdb_service):
+        """
+        Checks if yearly data is stored in one consolidated table and read back per year and per range
+        """
+        for year in (2019, 2020, 2021):
+            data = pd.DataFrame({'product': pd.Series(['Tinto', 'Branco'], dtype=object),
+                                 'quantity': pd.Series([year, year + 1], dtype='Int64')})
+            memory_duckdb_service.create_dataframe_table('production', data, year=year)
+
+        assert {'production_2019', 'production_2020', 'production_2021', 'production_years'} \
+            .issubset(memory_duckdb_service.get_tables())
+        year_data = memory_duckdb_service.fetch_data('production_2020')
+        assert list(year_data.columns) == ['product', 'quantity']
+        assert year_data['quantity'].tolist() == [2020, 2021]
+
+        range_data = memory_duckdb_service.fetch_year_range('production', 2020, 2021)
+        assert list(range_data.columns) == ['year', 'product', 'quantity']
+        assert range_data['year'].tolist() == [2020, 2020, 2021, 2021]
+
+    def test_year_partitions_survive_restart(self, memory_duckdb_service):
+        """
+        Checks if year partitions are registered again from table_metadata on startup
+        """
+        data = pd.DataFrame({'product': pd.Series(['Tinto'], dtype=object)})
+        memory_duckdb_service.create_dataframe_table('production', data, year=2020)
+
+        with patch('src.service.connection_pool.duckdb.connect', return_value=memory_duckdb_service._con):
+            restarted = DuckDBService()
+
+        assert 'production_2020' in restarted.get_tables()
+        assert restarted.fetch_data('production_2020')['product'].tolist() == ['Tinto']
+
+    def test_year_partition_replaces_legacy_table(self, memory_duckdb_service):
+        """
+        Checks if a legacy per-year table is dropped once its year partition is written, keeping its version
+        """
+        data = pd.DataFrame({'product': pd.Series(['Tinto'], dtype=object)})
+        memory_duckdb_service.create_dataframe_table('production_2019', data)
+        modified_at = memory_duckdb_service.get_table_modified_at('production_2019')
+
+        memory_duckdb_service.create_dataframe_table('production', data, year=2019)
+
+        stored_tables = [row[0] for row in memory_duckdb_service._con.execute('SHOW TABLES').fetchall()]
+        assert 'production_2019' not in stored_tables
+        assert 'production_2019' in memory_duckdb_service.get_tables()
+        assert memory_duckdb_service.fetch_data('production_2019')['product'].tolist() == ['Tinto']
+        assert memory_duckdb_service.get_table_version('production_2019') == 1
+        assert memory_duckdb_service.get_table_modified_at('production_2019') == modified_at
+
+    def test_year_partition_notifies_storage_table(self, duckdb_service, sample_df):
+        """
+        Checks if listeners are notified about both the year partition and its consolidated table
+        """
+        listener = MagicMock()
+        duckdb_service.add_table_listener(listener)
+
+        duckdb_service.create_dataframe_table('production', sample_df, year=2020)
+
+        assert [call.args[0] for call in listener.call_args_list] == ['production_2020', 'production_years']
+
+    def test_fetch_data_with_query_pushdown(self, memory_duckdb_service):
+        """
+        Checks if only the requested rows and columns are returned by duckdb
+        """
+        data = pd.DataFrame({'country': pd.Series(['Alemanha', 'Paraguai', 'Rússia'], dtype=object),
+                             'quantity': pd.Series([10, 300, 20], dtype='Int64'),
+                             'value': pd.Series([50, 900, 40], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('export_table_wines', data, year=2023)
+        query = QueryRequest(fields='country,quantity', min_quantity=15, sort='-quantity', limit=1)
+
+        result = memory_duckdb_service.fetch_data('export_table_wines_2023', query)
+
+        assert result.to_dict(orient='records') == [{'country': 'Paraguai', 'quantity': 300}]
+
+        range_result = memory_duckdb_service.fetch_year_range('export_table_wines', 2020, 2024,
+                                                              QueryRequest(fields='year,country', country='R%'))
+        assert range_result.to_dict(orient='records') == [{'year': 2023, 'country': 'Rússia'}]
+
+    def test_fetch_serialized(self, memory_duckdb_service):
+        """
+        Checks if duckdb serializes the rows to a JSON array, keeping order and nulls
+        """
+        data = pd.DataFrame({'product': pd.Series(['Tinto', 'Branco'], dtype=object),
+                             'quantity': pd.Series([10, None], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('production', data, year=2023)
+
+        body, rows = memory_duckdb_service.fetch_serialized('production_2023', QueryRequest(sort='-product'))
+        range_body, _ = memory_duckdb_service.fetch_year_range_serialized('production', 2020, 2024)
+
+        assert rows == 2
+        assert json.loads(body) == [{'product': 'Tinto', 'quantity': 10},
+                                    {'product': 'Branco', 'quantity': None}]
+        assert json.loads(range_body) == [{'year': 2023, 'product': 'Tinto', 'quantity': 10},
+                                          {'year': 2023, 'product': 'Branco', 'quantity': None}]
+        assert memory_duckdb_service.serialize_data_frame(data) == (body, 2)
+        assert memory_duckdb_service.serialize_data_frame(pd.DataFrame()) == (b'[]', 0)
+        assert memory_duckdb_service.fetch_serialized('missing_table') is None
+
+    @pytest.mark.parametrize('response_format, read', [
+        (ResponseFormat.ARROW, lambda body: pa.ipc.open_stream(body).read_pandas()),
+        (ResponseFormat.PARQUET, lambda body: pd.read_parquet(io.BytesIO(body))),
+        (ResponseFormat.CSV, lambda body: pd.read_csv(io.BytesIO(body)))
+    ])
+    def test_fetch_serialized_binary_formats(self, memory_duckdb_service, response_format, read):
+        """
+        Checks if Arrow IPC, Parquet and CSV bodies decode back to the stored rows
+        """
+        data = pd.DataFrame({'country': pd.Series(['Alemanha', 'Paraguai'], dtype=object),
+                             'quantity': pd.Series([10, 300], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('export_table_wines', data, year=2023)
+
+        body, rows = memory_duckdb_service.fetch_serialized('export_table_wines_2023', QueryRequest(sort='country'),
+                                                            response_format)
+
+        assert rows == 2
+        assert read(body).to_dict(orient='records') == [{'country': 'Alemanha', 'quantity': 10},
+                                                        {'country': 'Paraguai', 'quantity': 300}]
+
+    def test_stream_serialized(self, memory_duckdb_service):
+        """
+        Checks if rows are streamed in batches as a JSON array or NDJSON
+        """
+        data = pd.DataFrame({'product': pd.Series(['Tinto', 'Branco', 'Rosado'], dtype=object)})
+        memory_duckdb_service.create_dataframe_table('production', data, year=2023)
+
+        chunks = list(memory_duckdb_service.stream_serialized('production_2023', batch_size=2))
+        ndjson = b''.join(memory_duckdb_service.stream_year_range_serialized(
+            'production', 2020, 2024, QueryRequest(fields='product'), ResponseFormat.NDJSON, batch_size=2))
+        empty = b''.join(memory_duckdb_service.stream_serialized('production_2023', QueryRequest(product='Verde')))
+
+        assert len(chunks) > 2
+        assert json.loads(b''.join(chunks)) == [{'product': 'Tinto'}, {'product': 'Branco'}, {'product': 'Rosado'}]
+        assert [json.loads(line) for line in ndjson.splitlines()] == json.loads(b''.join(chunks))
+        assert empty == b'[]'
+        assert memory_duckdb_service.stream_serialized('missing_table') is None
+
+    def test_content_hash(self, memory_duckdb_service):
+        """
+        Checks if a content hash is stored per table and only changes when the rows change
+        """
+        data = pd.DataFrame({'product': pd.Series(['Tinto', 'Branco'], dtype=object),
+                             'quantity': pd.Series([10, None], dtype='Int64')})
+        changed = data.assign(**{'quantity': pd.Series([10, 5], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('production', data, year=2022)
+        memory_duckdb_service.create_dataframe_table('production', data.copy(), year=2023)
+        memory_duckdb_service.create_dataframe_table('production', changed, year=2024)
+
+        content_hash = memory_duckdb_service.get_table_content_hash('production_2022')
+        stored = memory_duckdb_service._con.execute(
+            "SELECT content_hash FROM table_metadata WHERE table_name = 'production_2022'").fetchone()[0]
+
+        assert content_hash is not None and stored == content_hash
+        assert memory_duckdb_service.get_table_content_hash('production_2023') == content_hash
+        assert memory_duckdb_service.get_table_content_hash('production_2024') != content_hash
+        assert memory_duckdb_service.get_table_content_hash('missing_table') is None
+
+    def test_fetch_aggregation(self, memory_duckdb_service):
+        """
+        Checks if top, share and growth aggregations are computed over the stored years, leaving Total out
+        """
+        data = pd.DataFrame({'country': pd.Series(['Paraguai', 'Rússia', 'Total'], dtype=object),
+                             'value': pd.Series([300, 100, 400], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('export_table_wines', data, year=2022)
+        next_year = data.assign(**{'value': pd.Series([450, 150, 600], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('export_table_wines', next_year, year=2023)
+
+        def fetch(kind, table_name, **params):
+            aggregation = AggregationRequest(resource='export', sub_resource='table_wines', **params)
+            return json.loads(memory_duckdb_service.fetch_aggregation(kind, table_name, aggregation)[0])
+
+        assert fetch('top', 'export_table_wines_2023', limit=1) == [{'country': 'Paraguai', 'value': 450, 'rank': 1}]
+        assert fetch('share', 'export_table_wines_2022', country='rú%') == [
+            {'country': 'Rússia', 'value': 100, 'share': 0.25}]
+        assert fetch('growth', 'export_table_wines', start_year=2022, end_year=2023) == [
+            {'year': 2022, 'value': 400, 'previous_value': None, 'growth': None},
+            {'year': 2023, 'value': 600, 'previous_value': 400, 'growth': 0.5}]
+        with pytest.raises(InvalidQueryError):
+            fetch('top', 'export_table_wines_2023', metric='quantity')
+
+    def test_fetch_aggregation_product_hierarchy(self, memory_duckdb_service):
+        """
+        Checks if aggregations of a saved production page only count category rows, not their products too
+        """
+        with open(os.path.join(FIXTURES_DIR, 'production_2023.html'), 'rb') as fixture:
+            data = SchemaNormalizer().normalize('production', VitibrasilTableParser().parse(fixture.read()))
+        memory_duckdb_service.create_dataframe_table('production', data, year=2023)
+        category_total = 169762429 + 46268556 + 1234
+
+        def fetch(kind, **params):
+            aggregation = AggregationRequest(resource='production', metric='quantity', **params)
+            return json.loads(memory_duckdb_service.fetch_aggregation(kind, 'production_2023', aggregation)[0])
+
+        assert [row['product'] for row in fetch('top')] == ['VINHO DE MESA', 'VINHO FINO DE MESA (VINIFERA)', 'SUCO']
+        share = fetch('share')
+        assert sum(row['quantity'] for row in share) == category_total
+        assert share[0]['share'] == pytest.approx(169762429 / category_total)
+        assert sum(row['share'] for row in share) == pytest.approx(1)
+
+    def test_fetch_aggregation_product_filter(self, memory_duckdb_service):
+        """
+        Checks if a product filter matches the products of a saved production page, with their share of the
+        category total and of their category, and sums them per year for growth
+        """
+        with open(os.path.join(FIXTURES_DIR, 'production_2023.html'), 'rb') as fixture:
+            data = SchemaNormalizer().normalize('production', VitibrasilTableParser().parse(fixture.read()))
+        memory_duckdb_service.create_dataframe_table('production', data, year=2023)
+        category_total = 169762429 + 46268556 + 1234
+
+        def fetch(kind, table_name, **params):
+            aggregation = AggregationRequest(resource='production', metric='quantity', product='tinto', **params)
+            return json.loads(memory_duckdb_service.fetch_aggregation(kind, table_name, aggregation)[0])
+
+        share = fetch('share', 'production_2023')
+        assert [(row['product'], row['category'], row['quantity']) for row in share] == [
+            ('Tinto', 'VINHO DE MESA', 139320884), ('Tinto', 'VINHO FINO DE MESA (VINIFERA)', 7988319)]
+        assert share[0]['share'] == pytest.approx(139320884 / category_total)
+        assert share[0]['category_share'] == pytest.approx(139320884 / 169762429)
+        assert share[1]['category_share'] == pytest.approx(7988319 / 46268556)
+        growth = fetch('growth', 'production', start_year=2023, end_year=2023)
+        assert [row['quantity'] for row in growth] == [139320884 + 7988319]
+
+    def test_fetch_aggregation_flat_product_page(self, memory_duckdb_service):
+        """
+        Checks if product pages without category rows are stored with NULL levels and every product is aggregated
+        """
+        html = '<table class="tb_base tb_dados"><thead><tr><th>Produto</th><th>Quantidade (L.)</th></tr></thead>' \
+               '<tbody><tr><td>Tinto</td><td>30</td></tr><tr><td>Branco</td><td>10</td></tr></tbody>' \
+               '<tfoot><tr><td>Total</td><td>40</td></tr></tfoot></table>'
+        data = SchemaNormalizer().normalize('production', VitibrasilTableParser().parse(html))
+        memory_duckdb_service.create_dataframe_table('production', data, year=2023)
+
+        share = json.loads(memory_duckdb_service.fetch_aggregation(
+            'share', 'production_2023', AggregationRequest(resource='production', metric='quantity'))[0])
+
+        assert [(row['product'], row['share']) for row in share] == [('Tinto', 0.75), ('Branco', 0.25)]
+
+    def test_fetch_aggregation_product_table_without_level(self, memory_duckdb_service):
+        """
+        Checks if product tables stored without the level column are rejected instead of double counted
+        """
+        data = pd.DataFrame({'product': pd.Series(['VINHO DE MESA', 'Tinto'], dtype=object),
+                             'quantity': pd.Series([10, 10], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('production', data, year=2023)
+
+        with pytest.raises(InvalidQueryError):
+            memory_duckdb_service.fetch_aggregation('top', 'production_2023', AggregationRequest(resource='production'))
+
+    def test_summary_table(self, memory_duckdb_service):
+        """
+        Checks if loading a year replaces that year in the summary table, keeping products of different categories
+        and category subtotals apart and leaving Total out
+        """
+        data = pd.DataFrame({'product': pd.Series(['VINHO DE MESA', 'Tinto', 'VINHO FINO', 'Tinto', 'Total'],
+                                                  dtype=object),
+                             'category': pd.Series(['VINHO DE MESA', 'VINHO DE MESA', 'VINHO FINO', 'VINHO FINO', None],
+                                                   dtype=object),
+                             'level': pd.Series([1, 2, 1, 2, None], dtype='Int64'),
+                             'quantity': pd.Series([10, 10, 3, 3, 13], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('production', data, year=2022)
+        memory_duckdb_service.create_dataframe_table('production', data.iloc[:2], year=2023)
+        memory_duckdb_service.create_dataframe_table('production', data)
+
+        summary = memory_duckdb_service._con.execute(
+            'SELECT * FROM production_summary ORDER BY year, category, level').fetchall()
+
+        assert summary == [(2022, 'VINHO DE MESA', 'VINHO DE MESA', 1, 10.0, None),
+                           (2022, 'VINHO DE MESA', 'Tinto', 2, 10.0, None),
+                           (2022, 'VINHO FINO', 'VINHO FINO', 1, 3.0, None),
+                           (2022, 'VINHO FINO', 'Tinto', 2, 3.0, None),
+                           (2023, 'VINHO DE MESA', 'VINHO DE MESA', 1, 10.0, None),
+                           (2023, 'VINHO DE MESA', 'Tinto', 2, 10.0, None)]
+        assert 'production_summary' in memory_duckdb_service.get_tables()
+        growth = json.loads(memory_duckdb_service.fetch_aggregation(
+            'growth', 'production', AggregationRequest(resource='production', metric='quantity', start_year=2022,
+                                                       end_year=2023))[0])
+        assert [row['quantity'] for row in growth] == [13, 10]
+
+    def test_summary_table_from_saved_page(self, memory_duckdb_service):
+        """
+        Checks if growth of a saved production page, served from the summary table, sums its category rows only
+        """
+        with open(os.path.join(FIXTURES_DIR, 'production_2023.html'), 'rb') as fixture:
+            data = SchemaNormalizer().normalize('production', VitibrasilTableParser().parse(fixture.read()))
+        memory_duckdb_service.create_dataframe_table('production', data, year=2023)
+
+        growth = json.loads(memory_duckdb_service.fetch_aggregation(
+            'growth', 'production', AggregationRequest(resource='production', metric='quantity', start_year=2023,
+                                                       end_year=2023))[0])
+
+        assert growth == [{'year': 2023, 'quantity': 169762429 + 46268556 + 1234, 'previous_quantity': None,
+                           'growth': None}]
+
+    def test_outdated_summary_table_rebuilt(self):
+        """
+        Checks if summary tables keyed on the product alone are rebuilt on startup, or dropped when the year
+        table has no level column to rebuild them from
+        """
+        con = duckdb.connect(':memory:')
+        con.execute("CREATE TABLE production_years AS SELECT * FROM (VALUES (2020, 'VINHO', 'VINHO', 1, 5), "
+                    "(2020, 'Tinto', 'VINHO', 2, 5)) t(year, product, category, level, quantity)")
+        con.execute("CREATE TABLE production_summary AS SELECT 2020 AS year, 'Tinto' AS product, 10.0 AS quantity, "
+                    "NULL::DOUBLE AS value")
+        con.execute("CREATE TABLE commercialization_years AS SELECT 2020 AS year, 'Tinto' AS product, 5 AS quantity")
+        con.execute("CREATE TABLE commercialization_summary AS SELECT 2020 AS year, 'Tinto' AS product, "
+                    "5.0 AS quantity, NULL::DOUBLE AS value")
+        with patch('src.service.connection_pool.duckdb.connect', return_value=con):
+            service = DuckDBService()
+
+        summary = con.execute('SELECT year, category, product, level, quantity FROM production_summary ORDER BY level')
+        assert summary.fetchall() == [(2020, 'VINHO', 'VINHO', 1, 5.0), (2020, 'VINHO', 'Tinto', 2, 5.0)]
+        assert 'commercialization_summary' not in service.get_tables()
+
+    def test_summary_table_created_for_existing_years(self):
+        """
+        Checks if year tables stored without a summary table get one on startup
+        """
+        con = duckdb.connect(':memory:')
+        con.execute("CREATE TABLE export_table_wines_years AS SELECT * FROM (VALUES (2020, 'Paraguai', 5, 50), "
+                    "(2020, 'Total', 5, 50)) t(year, \"Países\", \"Quantidade (Kg)\", \"Valor (US$)\")")
+        with patch('src.service.connection_pool.duckdb.connect', return_value=con):
+            service = DuckDBService()
+
+        assert con.execute('SELECT * FROM export_table_wines_summary').fetchall() == [(2020, 'Paraguai', 5.0, 50.0)]
+        assert 'export_table_wines_summary' in service.get_tables()
+
+    def test_scraped_columns_renamed(self):
+        """
+        Checks if tables stored with the Portuguese headers of the source pages get canonical columns on startup
+        """
+        con = duckdb.connect(':memory:')
+        con.execute("CREATE TABLE processing_unclassified AS SELECT * FROM (VALUES ('Tintas', 10, 'x')) "
+                    "t(\"Sem definição\", \"Quantidade (Kg)\", notes)")
+        with patch('src.service.connection_pool.duckdb.connect', return_value=con):
+            service = DuckDBService()
+
+        assert list(service.fetch_data('processing_unclassified').columns) == ['product', 'quantity', 'notes']
+
+    def test_year_table_gains_new_columns(self, memory_duckdb_service):
+        """
+        Checks if columns added to the schema are added to the year table, with nulls on the years stored before
+        """
+        data = pd.DataFrame({'product': pd.Series(['Tinto'], dtype=object),
+                             'quantity': pd.Series([4], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('production', data, year=2022)
+        memory_duckdb_service.create_dataframe_table(
+            'production', data.assign(level=pd.Series([2], dtype='Int64')), year=2023)
+
+        rows = memory_duckdb_service._con.execute('SELECT year, level FROM production_years ORDER BY year').fetchall()
+        assert rows == [(2022, None), (2023, 2)]
+
+    def test_refresh_year_table(self, memory_duckdb_service):
+        """
+        Checks if refreshing a year with the same content keeps its version and rows, while changed content
+        replaces only that year and bumps its version
+        """
+        listener = MagicMock()
+        data = pd.DataFrame({'product': pd.Series(['Tinto', 'Total'], dtype=object),
+                             'quantity': pd.Series([4, 4], dtype='Int64')})
+        memory_duckdb_service.create_dataframe_table('production', data, year=2022)
+        memory_duckdb_service.create_dataframe_table('production', data, year=2023)
+        first_refreshed_at = memory_duckdb_service.get_table_refreshed_at('production_2022')
+        memory_duckdb_service.add_table_listener(listener)
+
+        memory_duckdb_service.create_dataframe_table('production', data, year=2022)
+
+        assert memory_duckdb_service.get_table_version('production_2022') == 1
+        assert memory_duckdb_service.get_table_refreshed_at('production_2022') > first_refreshed_at
+        assert memory_duckdb_service.get_table_modified_at('production_2022') == first_refreshed_at
+        assert memory_duckdb_service._con.execute(
+            "SELECT modified_at FROM table_metadata WHERE table_name = 'production_2022'").fetchone() == \
+            (first_refreshed_at.to_pydatetime(),)
+        listener.assert_not_called()
+
+        memory_duckdb_service.create_dataframe_table('production', data.assign(**{'quantity': [7, 7]}),
+                                                     year=2022)
+
+        rows = memory_duckdb_service._con.execute(
+            'SELECT year, quantity FROM production_years ORDER BY year').fetchall()
+        assert rows == [(2022, 7), (2022, 7), (2023, 4), (2023, 4)]
+        assert memory_duckdb_service.get_table_version('production_2022') == 2
+        assert memory_duckdb_service.get_table_version('production_2023') == 1
+        assert memory_duckdb_service.get_table_modified_at('production_2022') > first_refreshed_at
+        assert memory_duckdb_service._con.execute(
+            "SELECT version FROM table_metadata WHERE table_name = 'production_2022'").fetchone() == (2,)
+        listener.assert_any_call('production_2022')
+
+    def test_user_keys(self, memory_duckdb_service):
+        """
+        Checks if users get sequential ids, usernames are unique and single users are looked up
+        """
+        assert memory_duckdb_service.insert_user('first', 'hash')
+        assert memory_duckdb_service.insert_user('second', 'hash')
+        assert not memory_duckdb_service.insert_user('first', 'other_hash')
+
+        assert memory_duckdb_service.fetch_user('second') == {'id': 2, 'username': 'second', 'password': 'hash'}
+        assert memory_duckdb_service.fetch_user('first')['password'] == 'hash'
+        assert memory_duckdb_service.fetch_user('missing') is None
+
+    def test_user_keys_migrate_existing_users(self):
+        """
+        Checks if users stored before the keys existed get ids and new users continue the sequence
+        """
+        con = duckdb.connect(':memory:')
+        con.execute('CREATE TABLE users (id INTEGER, username VARCHAR, password VARCHAR, created_at TIMESTAMP)')
+        con.execute("INSERT INTO users (username, password) VALUES ('legacy', 'hash')")
+        with patch('src.service.connection_pool.duckdb.connect', return_value=con):
+            service = DuckDBService()
+
+        assert service.insert_user('new', 'hash')
+        assert service.fetch_user('legacy')['id'] == 1
+        assert service.fetch_user('new')['id'] == 2
+
+    def test_local_tier_syncs_and_writes_through(self, tmp_path):
+        """
+        Checks if the local tier copies remote tables on startup and writes go to both tiers, using a second
+        local file as the remote database
+        """
+        local_database, remote_database = str(tmp_path / 'local.duckdb'), str(tmp_path / 'remote.duckdb')
+        data = pd.DataFrame({'product': pd.Series(['Tinto', 'Branco'], dtype=object),
+                             'quantity': pd.Series([10, None], dtype='Int64')})
+        remote_service = DuckDBService(local_database='', remote_database=remote_database)
+        remote_service.create_dataframe_table('production', data)
+        remote_service.create_dataframe_table('production', data, year=2020)
+        remote_service.insert_user('user', 'hash')
+        remote_service.close()
+
+        service = DuckDBService(local_database=local_database, remote_database=remote_database)
+        service.create_dataframe_table('production', data, year=2021)
+        service.close()
+        remote_service = DuckDBService(local_database='', remote_database=remote_database)
+        offline_service = DuckDBService(local_database=local_database,
+                                        remote_database=str(tmp_path / 'offline' / 'remote.duckdb'))
+
+        pd.testing.assert_frame_equal(offline_service.fetch_data('production'), data, check_dtype=False)
+        pd.testing.assert_frame_equal(offline_service.fetch_data('production_2020'), data, check_dtype=False)
+        assert offline_service.fetch_user('user') == {'id': 1, 'username': 'user', 'password': 'hash'}
+        assert offline_service.get_table_content_hash('production_2020') is not None
+        pd.testing.assert_frame_equal(remote_service.fetch_data('production_2021'), data, check_dtype=False)
+        pd.testing.assert_frame_equal(offline_service.fetch_data('production_2021'), data, check_dtype=False)
+        offline_service.close()
+
+        empty_remote_service = DuckDBService(local_database=local_database,
+                                             remote_database=str(tmp_path / 'empty.duckdb'))
+        assert empty_remote_service.fetch_user('user') is not None
+        assert empty_remote_service.get_table_refreshed_at('production_2021') is not None
@@ -1,11 +1,19 @@
+import gzip
+import json
+import time
 from unittest.mock import patch, Mock
 
+import brotli
 import pandas as pd
 import pytest
+import requests
 from flask import Flask
 from pydantic import ValidationError
 
-from src.service.extractor import EMBRAPAExtractorService
+from src.model.response_format import ResponseFormat
+from src.service.extractor import EMBRAPAExtractorService, TableScrapeError
+from src.service.query_builder import InvalidQueryError
+from src.service.schema_normalizer import TableSchemaError
 
 
 class TestEMBRAPAExtractorService(object):
@@ -20,7 +28,11 @@ class TestEMBRAPAExtractorService(object):
         """Fixture to create an instance of EMBRAPAExtractorService with mocked dependencies"""
         duck_db_mock = Mock()
         duck_db_mock.get_tables.return_value = []
-        duck_db_mock.fetch_data.return_value = pd.DataFrame({'datetime': [pd.Timestamp.now()]})
+        duck_db_mock.get_table_refreshed_at.return_value = pd.Timestamp.now()
+        duck_db_mock.get_table_modified_at.return_value = pd.Timestamp.now() - pd.Timedelta(days=1)
+        duck_db_mock.get_table_content_hash.return_value = None
+        duck_db_mock.serialize_data_frame.side_effect = \
+            lambda data, response_format: (data.to_json(orient='records').encode(), len(data))
         return EMBRAPAExtractorService(duck_db_mock)
 
     @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
@@ -29,18 +41,20 @@ class TestEMBRAPAExtractorService(object):
         Checks if data is retrieved from DuckDB when the view exists
         """
         data = [{'col1': 1, 'col2': 'a'}, {'col1': 2, 'col2': 'b'}]
-        mock_df = pd.DataFrame(data)
-        datetime_df = pd.DataFrame({'datetime': [pd.Timestamp.now()]})
 
         extractor_service._duck_db.get_tables.return_value = ['processing_hybrid_americans']
-        extractor_service._duck_db.fetch_data.side_effect = [mock_df, datetime_df]
+        extractor_service._duck_db.fetch_serialized.return_value = (json.dumps(data).encode(), len(data))
 
         with app.app_context():
             response = extractor_service.extract_data('processing', 'hybrid_americans')
 
             assert response.get_json() == data
+            assert response.mimetype == 'application/json'
             assert extractor_service._duck_db.get_tables.call_count == 1
-            assert extractor_service._duck_db.fetch_data.call_count == 2
+            extractor_service._duck_db.fetch_serialized.assert_called_once_with('processing_hybrid_americans', None,
+                                                                              ResponseFormat.JSON)
+            extractor_service._duck_db.fetch_data.assert_not_called()
+            extractor_service._duck_db.get_table_refreshed_at.assert_called_with('processing_hybrid_americans')
             mock_scrape.assert_not_called()
 
     @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
@@ -50,11 +64,9 @@ class TestEMBRAPAExtractorService(object):
         """
         data = [{'col1': 1, 'col2': 'a'}, {'col1': 2, 'col2': 'b'}]
         mock_df = pd.DataFrame(data)
-        datetime_df = pd.DataFrame({'datetime': [pd.Timestamp.now()]})
 
         extractor_service._duck_db.get_tables.return_value = []
         mock_scrape.return_value = mock_df
-        extractor_service._duck_db.fetch_data.return_value = datetime_df
 
         with app.app_context():
             response = extractor_service.extract_data('processing', 'hybrid_americans')
@@ -74,7 +86,7 @@ class TestEMBRAPAExtractorService(object):
         mock_df = pd.DataFrame(data)
 
         extractor_service._duck_db.get_tables.return_value = ['processing_hybrid_americans']
-        extractor_service._duck_db.fetch_data.return_value = None
+        extractor_service._duck_db.fetch_serialized.return_value = None
         mock_scrape.return_value = mock_df
 
         with app.app_context():
@@ -82,7 +94,7 @@ class TestEMBRAPAExtractorService(object):
 
             assert response.get_json() == data
             assert extractor_service._duck_db.get_tables.call_count == 1
-            assert extractor_service._duck_db.fetch_data.call_count == 1
+            assert extractor_service._duck_db.fetch_serialized.call_count == 1
             mock_scrape.assert_called_once_with(resource='processing', sub_resource='hybrid_americans', year=None)
             extractor_service._duck_db.create_dataframe_table.assert_called_once_with('processing_hybrid_americans',
                                                                                       mock_df)
@@ -106,12 +118,53 @@ class TestEMBRAPAExtractorService(object):
         Tests the _is_data_expired method with different datetime scenarios
         """
         old_datetime = pd.Timestamp.now() - pd.Timedelta(minutes=31)
-        extractor_service._duck_db.fetch_data.return_value = pd.DataFrame({'datetime': [old_datetime]})
-        assert extractor_service._is_data_expired() is True
+        extractor_service._duck_db.get_table_refreshed_at.return_value = old_datetime
+        assert extractor_service._is_data_expired('production') is True
 
         recent_datetime = pd.Timestamp.now() - pd.Timedelta(minutes=29)
-        extractor_service._duck_db.fetch_data.return_value = pd.DataFrame({'datetime': [recent_datetime]})
-        assert extractor_service._is_data_expired() is False
+        extractor_service._duck_db.get_table_refreshed_at.return_value = recent_datetime
+        assert extractor_service._is_data_expired('production') is False
+
+        extractor_service._duck_db.get_table_refreshed_at.return_value = None
+        assert extractor_service._is_data_expired('production') is True
+        extractor_service._duck_db.fetch_data.assert_not_called()
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_data_rescrapes_expired_table(self, mock_scrape, app, extractor_service):
+        """
+        Checks if an expired table is scraped again without reading its stale rows first
+        """
+        data = [{'col1': 1, 'col2': 'a'}]
+        mock_scrape.return_value = pd.DataFrame(data)
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.get_table_refreshed_at.return_value = pd.Timestamp.now() - pd.Timedelta(hours=1)
+
+        with app.app_context():
+            response = extractor_service.extract_data('production')
+
+            assert response.get_json() == data
+            extractor_service._duck_db.fetch_serialized.assert_not_called()
+            mock_scrape.assert_called_once_with(resource='production', sub_resource=None, year=None)
+
+    @pytest.mark.parametrize('error', [TableSchemaError('Table of production has no product column'),
+                                       ValueError('No data table found in page')])
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_data_falls_back_on_parse_errors(self, mock_scrape, app, extractor_service, error):
+        """
+        Checks if the stored rows of an expired table are served when the scraped page cannot be parsed
+        """
+        data = [{'product': 'Tinto'}]
+        mock_scrape.side_effect = error
+        extractor_service._duck_db.get_tables.return_value = ['production_2020']
+        extractor_service._duck_db.get_table_refreshed_at.return_value = pd.Timestamp.now() - pd.Timedelta(hours=1)
+        extractor_service._duck_db.fetch_data.return_value = pd.DataFrame(data)
+
+        with app.app_context():
+            response = extractor_service.extract_data('production', year=2020)
+
+            assert response.status_code == 200
+            assert response.get_json() == data
+            extractor_service._duck_db.fetch_data.assert_called_once_with('production_2020')
 
     def test_extract_data_with_invalid_year(self, app, extractor_service):
         """
@@ -121,3 +174,475 @@ class TestEMBRAPAExtractorService(object):
             response = extractor_service.extract_data('processing', 'hybrid_americans', year=1899)
             assert response.status_code == 400
             assert 'year' in response.get_data(as_text=True)
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_data_served_from_response_cache(self, mock_scrape, app, extractor_service):
+        """
+        Checks if a repeated request is answered from the response cache without touching DuckDB
+        """
+        data = [{'col1': 1, 'col2': 'a'}, {'col1': 2, 'col2': 'b'}]
+        extractor_service._duck_db.get_tables.return_value = []
+        mock_scrape.return_value = pd.DataFrame(data)
+
+        with app.app_context():
+            extractor_service.extract_data('production')
+            extractor_service._duck_db.reset_mock()
+            response = extractor_service.extract_data('production')
+
+            assert response.get_json() == data
+            extractor_service._duck_db.get_tables.assert_not_called()
+            extractor_service._duck_db.fetch_serialized.assert_not_called()
+            mock_scrape.assert_called_once()
+
+    def test_response_cache_invalidated_on_table_write(self, extractor_service):
+        """
+        Checks if the extractor registers the response cache invalidation as a table listener
+        """
+        extractor_service._duck_db.add_table_listener.assert_called_once_with(
+            extractor_service._response_cache.invalidate)
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_scrape_and_load_data_is_coalesced(self, mock_scrape, extractor_service):
+        """
+        Checks if scrapes are routed through the single-flight group keyed by table name
+        """
+        mock_df = pd.DataFrame([{'col1': 1}])
+        mock_scrape.return_value = mock_df
+
+        with patch.object(extractor_service._scrape_flight, 'do', wraps=extractor_service._scrape_flight.do) as do:
+            result = extractor_service._scrape_and_load_data('production', None, 'production', None)
+
+        assert result is mock_df
+        assert do.call_args[0][0] == 'production'
+        mock_scrape.assert_called_once()
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_data_serves_stale_and_refreshes_in_background(self, mock_scrape, app, extractor_service):
+        """
+        Checks if stale rows are returned at once while the refresh is scheduled in background
+        """
+        stale_data = [{'col1': 1, 'col2': 'old'}]
+        extractor_service._stale_while_revalidate = True
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.get_table_refreshed_at.return_value = pd.Timestamp.now() - pd.Timedelta(hours=1)
+        extractor_service._duck_db.fetch_serialized.return_value = (json.dumps(stale_data).encode(), len(stale_data))
+        mock_scrape.return_value = pd.DataFrame([{'col1': 1, 'col2': 'new'}])
+
+        with app.app_context():
+            response = extractor_service.extract_data('production')
+
+        assert response.get_json() == stale_data
+        extractor_service._refresh_executor.shutdown(wait=True)
+        mock_scrape.assert_called_once_with(resource='production', sub_resource=None, year=None)
+        assert extractor_service._response_cache.get(('production',)) is None
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_data_blocks_past_max_staleness(self, mock_scrape, app, extractor_service):
+        """
+        Checks if the request blocks on a scrape once data is older than the staleness ceiling
+        """
+        fresh_data = [{'col1': 1, 'col2': 'new'}]
+        extractor_service._stale_while_revalidate = True
+        extractor_service._max_staleness = 3600
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.get_table_refreshed_at.return_value = pd.Timestamp.now() - pd.Timedelta(hours=2)
+        mock_scrape.return_value = pd.DataFrame(fresh_data)
+
+        with app.app_context():
+            response = extractor_service.extract_data('production')
+
+        assert response.get_json() == fresh_data
+        extractor_service._duck_db.fetch_serialized.assert_not_called()
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_warm_table(self, mock_scrape, extractor_service):
+        """
+        Checks if warm_table scrapes missing tables and skips fresh ones
+        """
+        mock_scrape.return_value = pd.DataFrame([{'col1': 1}])
+        extractor_service._duck_db.get_tables.return_value = ['production_2020']
+
+        assert extractor_service.warm_table('production', year=2020) is False
+        assert extractor_service.warm_table('production', year=2021) is True
+        mock_scrape.assert_called_once_with(resource='production', sub_resource=None, year='2021')
+        extractor_service._duck_db.create_dataframe_table.assert_called_once_with('production',
+                                                                                  mock_scrape.return_value,
+                                                                                  year=2021)
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_warm_table_scrape_failure(self, mock_scrape, extractor_service):
+        """
+        Checks if warm_table raises TableScrapeError when upstream fails instead of reporting the stored rows
+        """
+        mock_scrape.side_effect = requests.ConnectionError('Upstream down')
+
+        with pytest.raises(TableScrapeError):
+            extractor_service.warm_table('production', year=2021)
+        extractor_service._duck_db.fetch_data.assert_called_once_with('production_2021')
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_data_serializes_missing_quantities_as_null(self, mock_scrape, app, extractor_service):
+        """
+        Checks if missing typed quantities are returned as JSON nulls
+        """
+        mock_scrape.return_value = pd.DataFrame({'Produto': ['Tinto', 'Branco'],
+                                                 'Quantidade (L.)': pd.Series([10, None], dtype='Int64')})
+
+        with app.app_context():
+            response = extractor_service.extract_data('production')
+
+        assert response.get_json() == [{'Produto': 'Tinto', 'Quantidade (L.)': 10},
+                                       {'Produto': 'Branco', 'Quantidade (L.)': None}]
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_data_year_range(self, mock_scrape, app, extractor_service):
+        """
+        Checks if a year range loads the missing years and is answered with one range query
+        """
+        range_data = [{'year': 2019, 'Produto': 'Tinto'}, {'year': 2020, 'Produto': 'Tinto'}]
+        mock_scrape.return_value = pd.DataFrame({'Produto': ['Tinto']})
+        extractor_service._duck_db.get_tables.return_value = ['production_2019']
+        extractor_service._duck_db.get_year_table_name.return_value = 'production_years'
+        extractor_service._duck_db.fetch_year_range_serialized.return_value = (json.dumps(range_data).encode(),
+                                                                               len(range_data))
+
+        with app.app_context():
+            response = extractor_service.extract_data('production', query={'start_year': '2019', 'end_year': '2020'})
+
+        assert response.get_json() == range_data
+        mock_scrape.assert_called_once_with(resource='production', sub_resource=None, year='2020')
+        extractor_service._duck_db.create_dataframe_table.assert_called_once_with('production',
+                                                                                  mock_scrape.return_value,
+                                                                                  year=2020)
+        extractor_service._duck_db.fetch_year_range_serialized.assert_called_once_with('production', 2019, 2020, None,
+                                                                                ResponseFormat.JSON)
+        extractor_service._duck_db.fetch_serialized.assert_not_called()
+
+    def test_extract_data_invalid_year_range(self, app, extractor_service):
+        """
+        Checks if a reversed year range is rejected with a bad request
+        """
+        with app.app_context():
+            response = extractor_service.extract_data('production', query={'start_year': '2021', 'end_year': '2019'})
+
+        assert response.status_code == 400
+        assert 'start_year' in response.get_data(as_text=True)
+        extractor_service._duck_db.fetch_year_range_serialized.assert_not_called()
+
+    def test_extract_data_pushes_query_down(self, app, extractor_service):
+        """
+        Checks if projection, filters and pagination are forwarded to duckdb and cached per query
+        """
+        data = [{'Produto': 'Tinto'}]
+        extractor_service._duck_db.get_tables.return_value = ['production_2020']
+        extractor_service._duck_db.fetch_serialized.return_value = (json.dumps(data).encode(), len(data))
+        query = {'fields': 'product', 'product': 'Tinto', 'limit': '10'}
+
+        with app.app_context():
+            response = extractor_service.extract_data('production', year=2020, query=query)
+            cached_response = extractor_service.extract_data('production', year=2020, query=query)
+
+        assert response.get_json() == cached_response.get_json() == data
+        table_name, query_request, response_format = extractor_service._duck_db.fetch_serialized.call_args.args
+        assert table_name == 'production_2020'
+        assert query_request.get_fields() == ['product']
+        assert query_request.product == 'Tinto'
+        assert query_request.limit == 10
+        assert response_format == ResponseFormat.JSON
+        extractor_service._duck_db.fetch_serialized.assert_called_once()
+
+    def test_extract_data_invalid_query(self, app, extractor_service):
+        """
+        Checks if a query on an unknown column is rejected with a bad request
+        """
+        extractor_service._duck_db.get_tables.return_value = ['production_2020']
+        extractor_service._duck_db.fetch_serialized.side_effect = InvalidQueryError("Column 'country' is not available")
+
+        with app.app_context():
+            response = extractor_service.extract_data('production', year=2020, query={'country': 'Brasil'})
+
+        assert response.status_code == 400
+        assert response.get_json() == {'error': "Column 'country' is not available"}
+
+    def test_extract_data_in_requested_format(self, app, extractor_service):
+        """
+        Checks if the requested format is forwarded to duckdb, returned with its mimetype and cached apart
+        """
+        extractor_service._duck_db.get_tables.return_value = ['production_2020']
+        extractor_service._duck_db.fetch_serialized.return_value = (b'Produto\n"Tinto"\n', 1)
+
+        with app.app_context():
+            response = extractor_service.extract_data('production', year=2020, query={'format': 'csv'})
+            cached_response = extractor_service.extract_data('production', year=2020, query={'format': 'csv'})
+
+        assert response.mimetype == cached_response.mimetype == 'text/csv'
+        assert response.get_data() == cached_response.get_data() == b'Produto\n"Tinto"\n'
+        extractor_service._duck_db.fetch_serialized.assert_called_once_with('production_2020', None,
+                                                                            ResponseFormat.CSV)
+        assert extractor_service._response_cache.get(('production_2020',)) is None
+
+    def test_extract_data_streams_ndjson(self, app, extractor_service):
+        """
+        Checks if NDJSON is streamed from duckdb in batches and not cached
+        """
+        extractor_service._duck_db.get_tables.return_value = ['production_2020']
+        extractor_service._duck_db.stream_serialized.return_value = iter([b'{"Produto":"Tinto"}\n',
+                                                                          b'{"Produto":"Branco"}\n'])
+
+        with app.app_context():
+            response = extractor_service.extract_data('production', year=2020, query={'format': 'ndjson'})
+
+        assert response.is_streamed
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.get_data() == b'{"Produto":"Tinto"}\n{"Produto":"Branco"}\n'
+        extractor_service._duck_db.stream_serialized.assert_called_once_with('production_2020', None,
+                                                                             ResponseFormat.NDJSON,
+                                                                             extractor_service._stream_batch_size)
+        extractor_service._duck_db.fetch_serialized.assert_not_called()
+        assert len(extractor_service._response_cache) == 0
+
+    def test_extract_data_sends_validators_and_not_modified(self, app, extractor_service):
+        """
+        Checks if responses carry ETag, Last-Modified and Cache-Control, and a matching If-None-Match is
+        answered with 304 without reading duckdb
+        """
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.get_table_content_hash.return_value = 'abc'
+        extractor_service._duck_db.fetch_serialized.return_value = (b'[{"Produto":"Tinto"}]', 1)
+
+        with app.test_request_context('/api/production'):
+            response = extractor_service.extract_data('production')
+        etag, _ = response.get_etag()
+
+        with app.test_request_context('/api/production', headers={'If-None-Match': f'"{etag}"'}):
+            not_modified = extractor_service.extract_data('production')
+        with app.test_request_context('/api/production', headers={'If-None-Match': f'"{etag}"'}):
+            other_query = extractor_service.extract_data('production', query={'limit': '1'})
+
+        assert response.status_code == 200
+        assert response.last_modified is not None
+        assert response.cache_control.private and 0 < response.cache_control.max_age <= 1800
+        assert not_modified.status_code == 304
+        assert not_modified.get_etag() == (etag, True)
+        assert {'Accept', 'Accept-Encoding'} <= set(response.vary) == set(not_modified.vary)
+        assert other_query.status_code == 200
+        assert extractor_service._duck_db.fetch_serialized.call_count == 2
+
+    def test_last_modified_is_content_change(self, app, extractor_service):
+        """
+        Checks if Last-Modified is the last content change of the table, not its last refresh, so an unchanged
+        refresh still answers If-Modified-Since with 304
+        """
+        modified_at = pd.Timestamp('2024-01-01 10:00:00')
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.get_table_content_hash.return_value = 'abc'
+        extractor_service._duck_db.get_table_modified_at.return_value = modified_at
+        extractor_service._duck_db.fetch_serialized.return_value = (b'[{"Produto":"Tinto"}]', 1)
+
+        with app.test_request_context('/api/production'):
+            response = extractor_service.extract_data('production')
+        with app.test_request_context('/api/production',
+                                      headers={'If-Modified-Since': response.headers['Last-Modified']}):
+            not_modified = extractor_service.extract_data('production')
+
+        assert response.last_modified == modified_at.to_pydatetime().astimezone()
+        assert not_modified.status_code == 304
+
+    def test_extract_data_with_format_param_does_not_vary_on_accept(self, app, extractor_service):
+        """
+        Checks if responses whose format is given as a parameter do not vary on the Accept header
+        """
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.fetch_serialized.return_value = (b'Produto\nTinto\n', 1)
+
+        with app.test_request_context('/api/production?format=csv'):
+            response = extractor_service.extract_data('production', query={'format': 'csv'})
+
+        assert 'Accept' not in response.vary
+        assert 'Accept-Encoding' in response.vary
+
+    def test_response_cache_expires_with_table(self, app, extractor_service):
+        """
+        Checks if responses are cached only for the remaining freshness of their table
+        """
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.get_table_refreshed_at.return_value = pd.Timestamp.now() - pd.Timedelta(minutes=29)
+        extractor_service._duck_db.fetch_serialized.return_value = (b'[{"Produto":"Tinto"}]', 1)
+
+        with app.app_context():
+            extractor_service.extract_data('production')
+
+        assert extractor_service._response_cache.get(('production',)) is not None
+        with patch('src.service.cache.time.monotonic', return_value=time.monotonic() + 61):
+            assert extractor_service._response_cache.get(('production',)) is None
+
+    def test_extract_data_without_content_hash_has_no_etag(self, app, extractor_service):
+        """
+        Checks if tables written before content hashes existed are served without validators
+        """
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.fetch_serialized.return_value = (b'[{"Produto":"Tinto"}]', 1)
+
+        with app.test_request_context('/api/production', headers={'If-None-Match': '"abc"'}):
+            response = extractor_service.extract_data('production')
+
+        assert response.status_code == 200
+        assert response.get_etag() == (None, None)
+
+    def test_extract_data_compresses_and_caches_encoded_bodies(self, app, extractor_service):
+        """
+        Checks if the body is compressed with the negotiated coding once and served from the cache afterwards
+        """
+        data = [{'Produto': 'Vinho de mesa', 'Quantidade (L.)': quantity} for quantity in range(200)]
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.fetch_serialized.return_value = (json.dumps(data).encode(), len(data))
+
+        with patch.object(extractor_service._compressor, 'compress', wraps=extractor_service._compressor.compress) \
+                as compress:
+            responses = []
+            for accept_encoding in ('gzip, br', 'gzip, br', 'gzip', ''):
+                with app.test_request_context('/api/production', headers={'Accept-Encoding': accept_encoding}):
+                    responses.append(extractor_service.extract_data('production'))
+
+        assert [response.content_encoding for response in responses] == ['br', 'br', 'gzip', None]
+        assert brotli.decompress(responses[0].get_data()) == json.dumps(data).encode()
+        assert gzip.decompress(responses[2].get_data()) == json.dumps(data).encode()
+        assert responses[3].get_json() == data
+        assert all('Accept-Encoding' in response.vary for response in responses)
+        assert [call.args[1] for call in compress.call_args_list] == ['br', 'gzip']
+        extractor_service._duck_db.fetch_serialized.assert_called_once()
+        assert extractor_service._response_cache.get_total_bytes() == \
+            len(json.dumps(data)) + len(responses[0].get_data()) + len(responses[2].get_data())
+
+    def test_extract_batch(self, app, extractor_service):
+        """
+        Checks if a batch answers every request in order, with per-request errors
+        """
+        data = [{'col1': 1, 'col2': 'a'}]
+        extractor_service._duck_db.get_tables.return_value = ['production_2020', 'export_table_wines']
+        extractor_service._duck_db.fetch_serialized.return_value = (json.dumps(data).encode(), len(data))
+
+        with app.test_request_context():
+            response = extractor_service.extract_batch([
+                {'resource': 'production', 'year': 2020},
+                {'resource': 'export', 'sub_resource': 'table_wines', 'query': {'format': 'csv', 'limit': 1}},
+                {'resource': 'production', 'year': 1900},
+                {'resource': 'unknown'}
+            ])
+
+            results = response.get_json()['results']
+            assert [result['status'] for result in results] == [200, 200, 400, 404]
+            assert results[0]['data'] == data and results[1]['data'] == data
+            assert results[1]['request']['sub_resource'] == 'table_wines'
+            assert results[3]['error'] == 'Unknown resource'
+            assert extractor_service._duck_db.fetch_serialized.call_args_list[1].args[2] == ResponseFormat.JSON
+
+    def test_extract_batch_item_error(self, app, extractor_service):
+        """
+        Checks if an item failing unexpectedly is reported with status 500 while the others are answered
+        """
+        data = [{'col1': 1}]
+        extractor_service._duck_db.get_tables.return_value = ['production_2020', 'production_2021']
+        extractor_service._duck_db.fetch_serialized.side_effect = [(json.dumps(data).encode(), 1),
+                                                                   RuntimeError('Connection lost')]
+
+        with app.test_request_context():
+            response = extractor_service.extract_batch([{'resource': 'production', 'year': 2020},
+                                                        {'resource': 'production', 'year': 2021}])
+
+            results = response.get_json()['results']
+            assert response.status_code == 200
+            assert [result['status'] for result in results] == [200, 500]
+            assert results[1]['error'] == 'Connection lost'
+
+    def test_extract_batch_invalid(self, app, extractor_service):
+        """
+        Checks if an empty or malformed batch is rejected
+        """
+        with app.test_request_context():
+            assert extractor_service.extract_batch([]).status_code == 400
+            assert extractor_service.extract_batch(None).status_code == 400
+            assert extractor_service.extract_batch([{'sub_resource': 'vines'}]).status_code == 400
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_aggregation(self, mock_scrape, app, extractor_service):
+        """
+        Checks if an aggregation is read from duckdb once and then served from the response cache
+        """
+        data = [{'country': 'Paraguai', 'value': 450, 'rank': 1}]
+        extractor_service._duck_db.get_tables.return_value = ['export_table_wines_2023']
+        extractor_service._duck_db.fetch_aggregation.return_value = (json.dumps(data).encode(), len(data))
+        query = {'resource': 'export', 'sub_resource': 'table_wines', 'year': '2023', 'limit': '1'}
+
+        with app.test_request_context():
+            first = extractor_service.extract_aggregation('top', query)
+            second = extractor_service.extract_aggregation('top', query)
+
+            assert first.get_json() == data and second.get_json() == data
+            extractor_service._duck_db.fetch_aggregation.assert_called_once()
+            kind, table_name, aggregation = extractor_service._duck_db.fetch_aggregation.call_args.args
+            assert (kind, table_name, aggregation.limit) == ('top', 'export_table_wines_2023', 1)
+            mock_scrape.assert_not_called()
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_growth_loads_year_range(self, mock_scrape, app, extractor_service):
+        """
+        Checks if growth loads every missing year of the range and reads the consolidated table
+        """
+        mock_scrape.return_value = pd.DataFrame({'Países': ['Paraguai'], 'Valor (US$)': [1]})
+        extractor_service._duck_db.fetch_aggregation.return_value = (b'[]', 0)
+        extractor_service._year_range_max_scrapes = 3
+
+        with app.test_request_context():
+            response = extractor_service.extract_aggregation('growth', {'resource': 'production', 'start_year': '2020',
+                                                                        'end_year': '2022'})
+
+            assert response.get_json() == []
+            assert mock_scrape.call_count == 3
+            extractor_service._duck_db.fetch_aggregation.assert_called_once()
+            assert extractor_service._duck_db.fetch_aggregation.call_args.args[1] == 'production'
+
+    @patch('src.service.extractor.EMBRAPAScrapperService.scrape_and_parse_tables')
+    def test_extract_growth_schedules_years_over_limit(self, mock_scrape, app, extractor_service):
+        """
+        Checks if only the first missing years of a wide range are scraped within the request, the others being
+        loaded in background once while the incomplete response is not cached
+        """
+        mock_scrape.return_value = pd.DataFrame({'Países': ['Paraguai'], 'Valor (US$)': [1]})
+        extractor_service._duck_db.fetch_aggregation.return_value = (b'[]', 0)
+        extractor_service._refresh_executor = Mock()
+        query = {'resource': 'production', 'start_year': '2000', 'end_year': '2024'}
+
+        with app.test_request_context():
+            extractor_service.extract_aggregation('growth', query)
+            extractor_service.extract_aggregation('growth', query)
+
+        assert mock_scrape.call_count == 2 * extractor_service._year_range_max_scrapes
+        scheduled = [call.args[4] for call in extractor_service._refresh_executor.submit.call_args_list]
+        assert scheduled == [str(year) for year in range(2000 + extractor_service._year_range_max_scrapes, 2025)]
+        assert extractor_service._duck_db.fetch_aggregation.call_count == 2
+
+    @pytest.mark.parametrize('query, status_code', [
+        ({'resource': 'unknown'}, 404),
+        ({'resource': 'production', 'metric': 'price'}, 400),
+        ({'resource': 'production', 'year': '1900'}, 400)
+    ])
+    def test_extract_aggregation_invalid(self, app, extractor_service, query, status_code):
+        """
+        Checks if unknown resources and invalid parameters are rejected
+        """
+        with app.test_request_context():
+            assert extractor_service.extract_aggregation('top', query).status_code == status_code
+
+    def test_extract_aggregation_invalid_column(self, app, extractor_service):
+        """
+        Checks if an aggregation over missing columns answers 400
+        """
+        extractor_service._duck_db.get_tables.return_value = ['production']
+        extractor_service._duck_db.fetch_aggregation.side_effect = InvalidQueryError('No value column')
+
+        with app.test_request_context():
+            response = extractor_service.extract_aggregation('top', {'resource': 'production'})
+
+            assert response.status_code == 400
+            assert response.get_json() == {'error': 'No value column'}
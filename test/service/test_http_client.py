@@ -0,0 +1,61 @@
+from unittest.mock import patch, Mock
+
+import pytest
+from requests import HTTPError
+
+from src.service.http_client import HttpClientService
+
+
+class TestHttpClientService(object):
+    @pytest.fixture
+    def http_client(self):
+        return HttpClientService(connect_timeout=1, read_timeout=2, retries=2, pool_size=4)
+
+    def test_session_is_pooled_with_retries(self, http_client):
+        """
+        Checks if the session mounts a pooled adapter with a jittered retry policy
+        """
+        adapter = http_client._session.get_adapter('http://vitibrasil.cnpuv.embrapa.br')
+
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 2
+        assert adapter.max_retries.backoff_jitter == 0.5
+        assert 503 in adapter.max_retries.status_forcelist
+
+    def test_get_uses_timeout(self, http_client):
+        """
+        Checks if requests are sent with the configured timeouts and no conditional headers by default
+        """
+        response = Mock(status_code=200, headers={})
+        with patch.object(http_client._session, 'get', return_value=response) as mock_get:
+            assert http_client.get('http://example.com') is response
+
+        mock_get.assert_called_once_with('http://example.com', headers={}, timeout=(1, 2))
+        response.raise_for_status.assert_called_once()
+
+    def test_conditional_get_sends_validators(self, http_client):
+        """
+        Checks if ETag and Last-Modified validators are replayed and a 304 is returned
+        """
+        first = Mock(status_code=200, headers={'ETag': '"abc"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+        second = Mock(status_code=304, headers={})
+        with patch.object(http_client._session, 'get', side_effect=[first, second]) as mock_get:
+            http_client.get('http://example.com', conditional=True)
+            response = http_client.get('http://example.com', conditional=True)
+
+        assert response is second
+        assert mock_get.call_args_list[1].kwargs['headers'] == {
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'
+        }
+        second.raise_for_status.assert_not_called()
+
+    def test_get_raises_http_errors(self, http_client):
+        """
+        Checks if HTTP errors are propagated to the caller
+        """
+        response = Mock(status_code=500, headers={})
+        response.raise_for_status.side_effect = HTTPError('Server error')
+        with patch.object(http_client._session, 'get', return_value=response):
+            with pytest.raises(HTTPError):
+                http_client.get('http://example.com')
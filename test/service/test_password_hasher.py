@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from src.service.password_hasher import PasswordHasherBusyError, PasswordHasherService
+
+
+class TestPasswordHasherService(object):
+    @pytest.fixture
+    def hasher(self):
+        """Fixture to create a hasher with a cheap method, one worker, no queue and no wait"""
+        hasher = PasswordHasherService(method='pbkdf2:sha256:1', workers=1, queue_size=0, wait_timeout=0)
+        yield hasher
+        hasher.shutdown()
+
+    def test_hash_and_check(self, hasher):
+        """
+        Checks if hashes made by the workers are verified and the metrics count them
+        """
+        password_hash = hasher.hash('password123')
+
+        assert password_hash.startswith('pbkdf2:sha256:1$')
+        assert hasher.check(password_hash, 'password123')
+        assert not hasher.check(password_hash, 'wrong_password')
+        assert hasher.get_metrics() == {'workers': 1, 'queue_size': 0, 'in_flight': 0, 'queued': 0,
+                                        'completed': 3, 'rejected': 0}
+
+    def test_needs_rehash(self, hasher):
+        """
+        Checks if hashes made with another method or cost need a rehash
+        """
+        assert not hasher.needs_rehash(hasher.hash('password123'))
+        assert hasher.needs_rehash(generate_password_hash('password123', 'pbkdf2:sha256:2'))
+
+    def test_busy(self, hasher):
+        """
+        Checks if requests beyond the workers and the queue are rejected right away
+        """
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=hasher._run, args=(block,))
+        thread.start()
+        started.wait(5)
+
+        with pytest.raises(PasswordHasherBusyError):
+            hasher.hash('password123')
+        assert hasher.get_metrics()['in_flight'] == 1
+        assert hasher.get_metrics()['rejected'] == 1
+
+        release.set()
+        thread.join()
+        assert hasher.hash('password123')
+
+    def test_busy_waits_for_a_slot(self):
+        """
+        Checks if a request beyond the workers and the queue waits for a slot freed within the wait timeout
+        """
+        hasher = PasswordHasherService(method='pbkdf2:sha256:1', workers=1, queue_size=0, wait_timeout=5)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=hasher._run, args=(block,))
+        thread.start()
+        started.wait(5)
+        threading.Timer(0.1, release.set).start()
+
+        assert hasher.hash('password123')
+        assert hasher.get_metrics()['rejected'] == 0
+
+        thread.join()
+        hasher.shutdown()
@@ -0,0 +1,61 @@
+import pytest
+
+from src.model.query_request import QueryRequest
+from src.service.query_builder import InvalidQueryError, QueryBuilder
+
+
+class TestQueryBuilder(object):
+    _EXPORT_COLUMNS = ['year', 'country', 'quantity', 'value']
+
+    @pytest.fixture
+    def query_builder(self):
+        return QueryBuilder()
+
+    def test_build_without_query(self, query_builder):
+        """
+        Checks if a plain select is built when no query is given
+        """
+        assert query_builder.build('production', []) == ('SELECT * FROM production', [])
+
+    def test_build_hides_columns(self, query_builder):
+        """
+        Checks if hidden columns are excluded and base conditions kept
+        """
+        sql, params = query_builder.build('production_years', [], None, ['year = ?'], [2020], ('year',))
+
+        assert sql == 'SELECT * EXCLUDE ("year") FROM production_years WHERE year = ?'
+        assert params == [2020]
+
+    def test_build_full_query(self, query_builder):
+        """
+        Checks if projection, filters, sorting and pagination are compiled into parameterized SQL
+        """
+        query = QueryRequest(fields='country,value', country='Para%', min_quantity=10, max_value=500,
+                             sort='-value,country', limit=5, offset=10)
+
+        sql, params = query_builder.build('export_table_wines_years', self._EXPORT_COLUMNS, query,
+                                          ['year = ?'], [2023], ('year',))
+
+        assert sql == ('SELECT "country", "value" FROM export_table_wines_years '
+                       'WHERE year = ? AND "country" ILIKE ? AND "quantity" >= ? AND "value" <= ? '
+                       'ORDER BY "value" DESC, "country" ASC LIMIT ? OFFSET ?')
+        assert params == [2023, 'Para%', 10, 500, 5, 10]
+
+    def test_build_rejects_unknown_column(self, query_builder):
+        """
+        Checks if fields or filters on unavailable columns raise InvalidQueryError
+        """
+        with pytest.raises(InvalidQueryError):
+            query_builder.build('export_table_wines_years', self._EXPORT_COLUMNS, QueryRequest(product='Tinto'))
+
+        with pytest.raises(InvalidQueryError):
+            query_builder.build('export_table_wines_years', self._EXPORT_COLUMNS,
+                                QueryRequest(fields='year'), hidden_columns=('year',))
+
+    def test_resolve_column_quotes_exact_names(self, query_builder):
+        """
+        Checks if exact column names resolve and are safely quoted
+        """
+        sql, _ = query_builder.build('t', ['a"b'], QueryRequest(fields='a"b'))
+
+        assert sql == 'SELECT "a""b" FROM t'
@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+from src.service.rate_limiter import RateLimiter
+
+
+class TestRateLimiter(object):
+    @patch('src.service.rate_limiter.time.sleep')
+    @patch('src.service.rate_limiter.time.monotonic', return_value=100.0)
+    def test_acquire_spaces_calls(self, mock_monotonic, mock_sleep):
+        """
+        Checks if consecutive acquisitions are spaced by the configured interval
+        """
+        limiter = RateLimiter(rate_per_second=2)
+
+        limiter.acquire()
+        limiter.acquire()
+        limiter.acquire()
+
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 1.0]
+
+    @patch('src.service.rate_limiter.time.sleep')
+    def test_acquire_unlimited(self, mock_sleep):
+        """
+        Checks if a non-positive rate disables throttling
+        """
+        limiter = RateLimiter(rate_per_second=0)
+
+        limiter.acquire()
+        limiter.acquire()
+
+        mock_sleep.assert_not_called()
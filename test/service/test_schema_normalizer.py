@@ -0,0 +1,90 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.service.schema_normalizer import SchemaNormalizer, TableSchemaError
+from src.service.table_parser import VitibrasilTableParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestSchemaNormalizer(object):
+    @pytest.fixture
+    def normalizer(self):
+        return SchemaNormalizer()
+
+    @staticmethod
+    def _parse_fixture(name: str) -> pd.DataFrame:
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as fixture:
+            return VitibrasilTableParser().parse(fixture.read())
+
+    @pytest.mark.parametrize('resource, fixture_name, dtypes', [
+        ('production', 'production_2023.html',
+         {'product': 'object', 'category': 'object', 'level': 'Int64', 'quantity': 'Int64'}),
+        ('export', 'export_table_wines_2023.html', {'country': 'object', 'quantity': 'Int64', 'value': 'Float64'})
+    ])
+    def test_normalize_saved_pages(self, normalizer, resource, fixture_name, dtypes):
+        """
+        Checks if saved pages get the canonical columns and types of their resource, keeping every row
+        """
+        data = self._parse_fixture(fixture_name)
+
+        result = normalizer.normalize(resource, data)
+
+        assert {column: str(dtype) for column, dtype in result.dtypes.items()} == dtypes
+        assert len(result) == len(data)
+        assert result.iloc[:, 0].tolist() == data.iloc[:, 0].tolist()
+
+    def test_normalize_drops_undeclared_columns(self, normalizer):
+        """
+        Checks if varying headers are mapped to the same columns and undeclared ones are dropped
+        """
+        data = pd.DataFrame({'Sem definição': ['Tintas'], 'Quantidade (Kg)': pd.Series([10], dtype='Int64'),
+                             'Observação': ['x'], 'category': ['Tintas'], 'level': pd.Series([1], dtype='Int64')})
+
+        result = normalizer.normalize('processing', data)
+
+        assert result.to_dict(orient='records') == [{'product': 'Tintas', 'category': 'Tintas', 'level': 1,
+                                                     'quantity': 10}]
+
+    def test_normalize_flat_product_page(self, normalizer):
+        """
+        Checks if product pages without category rows are normalized with NULL category and level columns
+        """
+        html = '<table class="tb_base tb_dados"><thead><tr><th>Produto</th><th>Quantidade (L.)</th></tr></thead>' \
+               '<tbody><tr><td>Tinto</td><td>1.234</td></tr><tr><td>Branco</td><td>56</td></tr></tbody>' \
+               '<tfoot><tr><td>Total</td><td>1.290</td></tr></tfoot></table>'
+
+        result = normalizer.normalize('production', VitibrasilTableParser().parse(html))
+
+        assert {column: str(dtype) for column, dtype in result.dtypes.items()} == \
+            {'product': 'object', 'category': 'object', 'level': 'Int64', 'quantity': 'Int64'}
+        assert result['product'].tolist() == ['Tinto', 'Branco', 'Total']
+        assert result['quantity'].tolist() == [1234, 56, 1290]
+        assert result['category'].isna().all() and result['level'].isna().all()
+
+    @pytest.mark.parametrize('data', [
+        pd.DataFrame({'Produto': ['Tinto']}),
+        pd.DataFrame({'Produto': ['Tinto'], 'Quantidade (L.)': ['muito']}),
+        pd.DataFrame({'Produto': ['Tinto'], 'Quantidade (L.)': pd.Series([1.5], dtype='Float64')})
+    ])
+    def test_normalize_schema_mismatch(self, normalizer, data):
+        """
+        Checks if TableSchemaError is raised when a declared column is missing or cannot be cast
+        """
+        with pytest.raises(TableSchemaError):
+            normalizer.normalize('production', data)
+
+    @pytest.mark.parametrize('column, expected', [
+        ('Cultivar', 'product'),
+        ('País', 'country'),
+        ('Valor (US$)', 'value'),
+        ('quantity', 'quantity'),
+        ('year', None)
+    ])
+    def test_get_canonical_name(self, column, expected):
+        """
+        Checks if scraped and canonical headers are mapped to their canonical name
+        """
+        assert SchemaNormalizer.get_canonical_name(column) == expected
@@ -2,7 +2,6 @@ from unittest.mock import patch, Mock
 
 import pandas as pd
 import pytest
-from bs4 import BeautifulSoup
 
 from src.service.scrapper import EMBRAPAScrapperService
 
@@ -12,20 +11,20 @@ class TestEMBRAPAScrapperService(object):
     def scrapper_service(self):
         return EMBRAPAScrapperService()
 
-    @patch('src.service.scrapper.requests.get')
-    @patch('src.service.scrapper.pd.read_html')
-    def test_scrape_and_parse_tables_success(self, mock_read_html, mock_get, scrapper_service):
+    @patch('src.service.scrapper.HttpClientService.get')
+    def test_scrape_and_parse_tables_success(self, mock_get, scrapper_service):
         """
         Checks if data is correctly scraped and parsed when valid parameters are provided
         """
         # Mock HTML with table
         html_content = '''
         <html>
+            <head><meta charset="utf-8"></head>
             <body>
                 <table class="tb_base tb_dados">
-                    <tr><td>col1</td><td>col2</td></tr>
-                    <tr><td>1</td><td>a</td></tr>
-                    <tr><td>2</td><td>b</td></tr>
+                    <tr><td>Países</td><td>Quantidade (Kg)</td><td>Valor (US$)</td></tr>
+                    <tr><td>Paraguai</td><td>1.234</td><td>567</td></tr>
+                    <tr><td>Uruguai</td><td>-</td><td>-</td></tr>
                 </table>
             </body>
         </html>
@@ -34,19 +33,16 @@ class TestEMBRAPAScrapperService(object):
         mock_response.content = html_content.encode()
         mock_get.return_value = mock_response
 
-        data = [{'col1': 1, 'col2': 'a'}, {'col1': 2, 'col2': 'b'}]
-        mock_df = pd.DataFrame(data)
-        mock_read_html.return_value = [mock_df]
-
         result = scrapper_service.scrape_and_parse_tables('2023', 'import', 'grape_juice')
 
         assert not result.empty
         assert len(result) == 2
-        assert list(result.columns) == ['col1', 'col2']
+        assert list(result.columns) == ['country', 'quantity', 'value']
+        assert result['quantity'].tolist() == [1234, pd.NA]
+        assert str(result['value'].dtype) == 'Float64'
         mock_get.assert_called_once()
-        mock_read_html.assert_called_once()
 
-    @patch('src.service.scrapper.requests.get')
+    @patch('src.service.scrapper.HttpClientService.get')
     def test_scrape_and_parse_tables_invalid_resource(self, mock_get, scrapper_service):
         """
         Checks if AttributeError is raised when invalid resource is provided
@@ -55,7 +51,7 @@ class TestEMBRAPAScrapperService(object):
             scrapper_service.scrape_and_parse_tables('2023', 'invalid_resource')
         mock_get.assert_not_called()
 
-    @patch('src.service.scrapper.requests.get')
+    @patch('src.service.scrapper.HttpClientService.get')
     def test_scrape_and_parse_tables_request_exception(self, mock_get, scrapper_service):
         """
         Checks if request exception is propagated
@@ -68,21 +64,50 @@ class TestEMBRAPAScrapperService(object):
         assert str(exc_info.value) == 'Connection error'
         mock_get.assert_called_once()
 
-    @patch('src.service.scrapper.requests.get')
-    @patch('src.service.scrapper.pd.read_html')
-    def test_scrape_and_parse_tables_no_table_found(self, mock_read_html, mock_get, scrapper_service):
+    @patch('src.service.scrapper.HttpClientService.get')
+    def test_scrape_and_parse_tables_no_table_found(self, mock_get, scrapper_service):
         """
-        Checks if IndexError is raised when no table is found
+        Checks if ValueError is raised when no table is found
         """
         # Mock HTML without table
         html_content = '<html><body>No table here</body></html>'
         mock_response = Mock()
         mock_response.content = html_content.encode()
         mock_get.return_value = mock_response
-        mock_read_html.return_value = []
 
-        with pytest.raises(IndexError):
+        with pytest.raises(ValueError):
             scrapper_service.scrape_and_parse_tables('2023', 'import', 'grape_juice')
 
         mock_get.assert_called_once()
-        mock_read_html.assert_called_once()
+
+    def test_get_resource_matrix(self):
+        """
+        Checks if every resource and sub_resource pair is listed
+        """
+        matrix = EMBRAPAScrapperService.get_resource_matrix()
+
+        assert len(matrix) == 15
+        assert ('production', None) in matrix
+        assert ('processing', 'vines') in matrix
+        assert ('import', 'raisins') in matrix
+        assert ('export', 'grape_juice') in matrix
+
+    @patch('src.service.scrapper.HttpClientService.get')
+    def test_scrape_and_parse_tables_not_modified(self, mock_get, scrapper_service):
+        """
+        Checks if an unchanged upstream page is answered from the parsed table cache
+        """
+        html_content = '<table class="tb_base tb_dados"><tr><th>Produto</th><th>Quantidade (L.)</th></tr>' \
+                       '<tr><td class="tb_item">Tinto</td><td class="tb_item">1</td></tr></table>'
+        first_response = Mock(status_code=200, content=html_content.encode())
+        not_modified_response = Mock(status_code=304, content=b'')
+        mock_get.side_effect = [first_response, not_modified_response]
+
+        first = scrapper_service.scrape_and_parse_tables('2023', 'production')
+        with patch.object(scrapper_service._table_parser, 'parse') as mock_parse:
+            second = scrapper_service.scrape_and_parse_tables('2023', 'production')
+            mock_parse.assert_not_called()
+
+        pd.testing.assert_frame_equal(first, second)
+        assert mock_get.call_args_list[0].kwargs == {'conditional': False}
+        assert mock_get.call_args_list[1].kwargs == {'conditional': True}
@@ -0,0 +1,58 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.service.single_flight import SingleFlight
+
+
+class TestSingleFlight(object):
+    @pytest.fixture
+    def single_flight(self):
+        return SingleFlight()
+
+    def test_do_returns_result(self, single_flight):
+        """
+        Checks if the result of the function is returned to the caller
+        """
+        assert single_flight.do('production', lambda: 42) == 42
+        assert not single_flight.in_flight('production')
+
+    def test_concurrent_calls_are_coalesced(self, single_flight):
+        """
+        Checks if concurrent callers with the same key share a single execution
+        """
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_scrape():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return 'data'
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(single_flight.do, 'production', slow_scrape)
+            started.wait(timeout=5)
+            followers = [executor.submit(single_flight.do, 'production', slow_scrape) for _ in range(3)]
+            time.sleep(0.2)
+            release.set()
+            results = [leader.result(timeout=5)] + [f.result(timeout=5) for f in followers]
+
+        assert results == ['data'] * 4
+        assert len(calls) == 1
+
+    def test_error_is_propagated_and_key_released(self, single_flight):
+        """
+        Checks if errors are raised to the caller and the key can be retried afterwards
+        """
+        def failing_scrape():
+            raise ValueError('scrape failed')
+
+        with pytest.raises(ValueError):
+            single_flight.do('production', failing_scrape)
+
+        assert not single_flight.in_flight('production')
+        assert single_flight.do('production', lambda: 'retried') == 'retried'
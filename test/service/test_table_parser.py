@@ -0,0 +1,102 @@
+import os
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+from src.service.table_parser import VitibrasilTableParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestVitibrasilTableParser(object):
+    @pytest.fixture
+    def parser(self):
+        return VitibrasilTableParser()
+
+    @staticmethod
+    def _read_fixture(name: str) -> bytes:
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as fixture:
+            return fixture.read()
+
+    @pytest.mark.parametrize('fixture_name', ['production_2023.html', 'export_table_wines_2023.html'])
+    def test_parse_matches_read_html_output(self, parser, fixture_name):
+        """
+        Checks if the parser output matches the previous pd.read_html output on saved pages,
+        with Brazilian formatted quantities converted to numbers
+        """
+        content = self._read_fixture(fixture_name)
+        legacy = pd.read_html(StringIO(content.decode('utf-8')), attrs={'class': 'tb_base tb_dados'})[0]
+
+        result = parser.parse(content)
+
+        assert list(result.columns)[:len(legacy.columns)] == list(legacy.columns)
+        assert len(result) == len(legacy)
+        text_column = legacy.columns[0]
+        assert result[text_column].tolist() == legacy[text_column].tolist()
+        for column in legacy.columns[1:]:
+            expected = [VitibrasilTableParser.parse_number(value) for value in legacy[column]]
+            assert result[column].astype(object).where(result[column].notna(), None).tolist() == expected
+
+    def test_parse_types_quantities(self, parser):
+        """
+        Checks if quantity columns are typed and missing values become nulls
+        """
+        result = parser.parse(self._read_fixture('production_2023.html'))
+
+        assert str(result['Quantidade (L.)'].dtype) == 'Int64'
+        assert result['Quantidade (L.)'].iloc[0] == 169762429
+        assert result['Quantidade (L.)'].iloc[8] == 1234
+        assert pd.isna(result['Quantidade (L.)'].iloc[6])
+        assert result['Produto'].iloc[-1] == 'Total'
+
+    def test_parse_hierarchy(self, parser):
+        """
+        Checks if category and product rows get their category and level, and the Total row none
+        """
+        result = parser.parse(self._read_fixture('production_2023.html'))
+
+        assert result['level'].tolist()[:5] == [1, 2, 2, 2, 1]
+        assert result['category'].iloc[0] == result['category'].iloc[3] == 'VINHO DE MESA'
+        assert result['category'].iloc[5] == 'VINHO FINO DE MESA (VINIFERA)'
+        assert result['category'].iloc[8] == 'SUCO'
+        assert pd.isna(result['level'].iloc[-1]) and result['category'].iloc[-1] is None
+
+    def test_parse_without_hierarchy(self, parser):
+        """
+        Checks if pages without category rows get no category or level column
+        """
+        result = parser.parse(self._read_fixture('export_table_wines_2023.html'))
+
+        assert 'category' not in result.columns and 'level' not in result.columns
+
+    def test_parse_table_without_thead(self, parser):
+        """
+        Checks if the first row is used as header when the table has no thead
+        """
+        html = '<table class="tb_base tb_dados"><tr><td>col1</td><td>col2</td></tr>' \
+               '<tr><td>1</td><td>a</td></tr><tr><td>2</td><td>b</td></tr></table>'
+
+        result = parser.parse(html)
+
+        assert result.to_dict(orient='records') == [{'col1': 1, 'col2': 'a'}, {'col1': 2, 'col2': 'b'}]
+
+    def test_parse_without_table(self, parser):
+        """
+        Checks if ValueError is raised when the page has no data table
+        """
+        with pytest.raises(ValueError):
+            parser.parse('<html><body>No table here</body></html>')
+
+    @pytest.mark.parametrize('value, expected', [
+        ('1.234.567', 1234567),
+        ('546', 546),
+        ('1.234,5', 1234.5),
+        ('-', None),
+        ('', None)
+    ])
+    def test_parse_number(self, value, expected):
+        """
+        Checks if Brazilian formatted numbers are converted
+        """
+        assert VitibrasilTableParser.parse_number(value) == expected
@@ -0,0 +1,103 @@
+import datetime
+import time
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, jsonify
+from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
+
+from src.service.token_verifier import CachingJWTManager, TokenVerifierService
+
+
+class TestTokenVerifierService(object):
+    @pytest.fixture
+    def verifier(self):
+        """Fixture to create a verifier allowing bursts of two requests per token"""
+        return TokenVerifierService(max_entries=10, rate_limit=1, burst=2)
+
+    @pytest.fixture
+    def app(self, verifier):
+        """Fixture to create a Flask app verifying tokens through the verifier"""
+        app = Flask(__name__)
+        app.config['JWT_SECRET_KEY'] = 'test-secret'
+        CachingJWTManager(app, verifier)
+        app.before_request(verifier.limit_request)
+
+        @app.route('/protected')
+        @jwt_required()
+        def protected():
+            return jsonify(get_jwt_identity())
+
+        return app
+
+    @staticmethod
+    def _get_headers(app, expires_delta=datetime.timedelta(hours=1)) -> dict:
+        with app.app_context():
+            return {'Authorization': f'Bearer {create_access_token(identity="test_user", expires_delta=expires_delta)}'}
+
+    def test_claims_cached(self, app):
+        """
+        Checks if a token verified once is accepted again without decoding it
+        """
+        client, headers = app.test_client(), self._get_headers(app)
+
+        assert client.get('/protected', headers=headers).get_json() == 'test_user'
+        with patch('flask_jwt_extended.jwt_manager.jwt.decode', side_effect=Exception('Decoded again')):
+            response = client.get('/protected', headers=headers)
+
+        assert response.status_code == 200
+        assert response.get_json() == 'test_user'
+
+    def test_invalid_token_not_cached(self, app, verifier):
+        """
+        Checks if tokens failing verification are rejected and not cached
+        """
+        response = app.test_client().get('/protected', headers={'Authorization': 'Bearer invalid'})
+
+        assert response.status_code == 422
+        assert verifier.get_claims('invalid') is None
+
+    def test_put_claims_expiration(self, verifier):
+        """
+        Checks if claims are kept until their exp and tokens without exp are not cached
+        """
+        verifier.put_claims('valid', {'sub': 'user', 'exp': time.time() + 60})
+        verifier.put_claims('expired', {'sub': 'user', 'exp': time.time() - 1})
+        verifier.put_claims('never_expires', {'sub': 'user'})
+
+        assert verifier.get_claims('valid')['sub'] == 'user'
+        assert verifier.get_claims('expired') is None
+        assert verifier.get_claims('never_expires') is None
+
+    def test_rate_limit(self, app):
+        """
+        Checks if requests beyond the burst of a token get 429 while other tokens are still served
+        """
+        client, headers = app.test_client(), self._get_headers(app)
+
+        assert [client.get('/protected', headers=headers).status_code for _ in range(2)] == [200, 200]
+        response = client.get('/protected', headers=headers)
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        assert client.get('/protected', headers=self._get_headers(app, datetime.timedelta(hours=2))).status_code == 200
+
+    def test_rate_limit_unverified_tokens_do_not_evict_verified(self, app, verifier):
+        """
+        Checks if a flood of unverified tokens does not reset the bucket of a verified token
+        """
+        client, headers = app.test_client(), self._get_headers(app)
+        for _ in range(3):
+            client.get('/protected', headers=headers)
+
+        for index in range(20):
+            verifier.acquire(f'junk-{index}')
+
+        assert client.get('/protected', headers=headers).status_code == 429
+
+    def test_rate_limit_disabled(self):
+        """
+        Checks if a rate limit of zero never limits requests
+        """
+        verifier = TokenVerifierService(max_entries=10, rate_limit=0, burst=1)
+
+        assert all(verifier.acquire('token') is None for _ in range(10))
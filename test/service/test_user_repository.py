@@ -0,0 +1,49 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.service.user_repository import UserRepository
+
+
+class TestUserRepository(object):
+    @pytest.fixture
+    def user_repository(self):
+        """Fixture to create a repository over a mocked DuckDBService"""
+        duckdb_mock = Mock()
+        duckdb_mock.fetch_user.return_value = {'id': 1, 'username': 'user', 'password': 'hash'}
+        return UserRepository(duckdb_mock, max_entries=10, ttl_seconds=60, negative_ttl_seconds=60)
+
+    def test_get_user_cached(self, user_repository):
+        """
+        Checks if a user is looked up in duckdb only once
+        """
+        assert user_repository.get_user('user') == {'id': 1, 'username': 'user', 'password': 'hash'}
+        assert user_repository.exists('user')
+        user_repository._duckdb.fetch_user.assert_called_once_with('user')
+
+    def test_get_missing_user_cached(self, user_repository):
+        """
+        Checks if unknown usernames are cached and forgotten once the user is inserted
+        """
+        user_repository._duckdb.fetch_user.return_value = None
+
+        assert user_repository.get_user('user') is None
+        assert not user_repository.exists('user')
+        assert user_repository._duckdb.fetch_user.call_count == 1
+
+        user_repository._duckdb.fetch_user.return_value = {'id': 1, 'username': 'user', 'password': 'hash'}
+        user_repository.insert('user', 'hash')
+
+        assert user_repository.exists('user')
+        user_repository._duckdb.insert_user.assert_called_once_with('user', 'hash')
+        assert user_repository._duckdb.fetch_user.call_count == 2
+
+    def test_get_user_error_not_cached(self, user_repository):
+        """
+        Checks if a failed lookup is reported as a missing user without being cached
+        """
+        user_repository._duckdb.fetch_user.side_effect = [Exception('Connection lost'),
+                                                          {'id': 1, 'username': 'user', 'password': 'hash'}]
+
+        assert user_repository.get_user('user') is None
+        assert user_repository.get_user('user') is not None
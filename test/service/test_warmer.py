@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.model.year_request import MIN_YEAR, MAX_YEAR
+from src.service.extractor import EMBRAPAExtractorService, TableScrapeError
+from src.service.warmer import CacheWarmerService
+
+
+class TestCacheWarmerService(object):
+    @pytest.fixture
+    def extractor(self):
+        return MagicMock(spec=EMBRAPAExtractorService)
+
+    @pytest.fixture
+    def warmer(self, extractor):
+        return CacheWarmerService(extractor, interval=60, workers=2, rate_limit=0)
+
+    def test_get_jobs_covers_matrix(self):
+        """
+        Checks if every resource/sub_resource pair is scheduled for the current page and every valid year
+        """
+        jobs = CacheWarmerService.get_jobs()
+
+        assert len(jobs) == 15 * (MAX_YEAR - MIN_YEAR + 2)
+        assert jobs[0] == ('production', None, None)
+        assert ('export', 'grape_juice', MIN_YEAR) in jobs
+        assert ('import', 'raisins', MAX_YEAR) in jobs
+
+    def test_run_once_records_stats(self, warmer, extractor):
+        """
+        Checks if a run scrapes only expired tables and records progress and last-run stats
+        """
+        def warm_table(resource, sub_resource, year):
+            if resource == 'production':
+                raise TableScrapeError('Could not scrape table production_2020')
+            return True
+
+        extractor.needs_refresh.side_effect = lambda resource, sub_resource, year: year == 2020
+        extractor.warm_table.side_effect = warm_table
+
+        status = warmer.run_once()
+
+        last_run = status['last_run']
+        assert last_run['state'] == 'idle'
+        assert last_run['total'] == last_run['completed'] == len(CacheWarmerService.get_jobs())
+        assert last_run['failed'] == 1
+        assert last_run['warmed'] == 14
+        assert last_run['skipped'] == last_run['total'] - 15
+        assert extractor.warm_table.call_count == 15
+
+    def test_get_status_before_first_run(self, warmer):
+        """
+        Checks if the status is idle with no last run before the warmer runs
+        """
+        status = warmer.get_status()
+
+        assert status['progress']['state'] == 'idle'
+        assert status['last_run'] is None
@@ -53,7 +53,7 @@ class TestApp(object):
         blueprint_names = set(bp.name for bp in app_instance.app.blueprints.values())
         expected_blueprints = {
             'api_auth', 'api_default', 'api_exporting',
-            'api_import', 'swagger_ui', 'api_processing'
+            'api_import', 'swagger_ui', 'api_processing', 'api_warmer'
         }
         assert blueprint_names.issuperset(expected_blueprints)
         mock_logger.remove.assert_called_once_with(0)